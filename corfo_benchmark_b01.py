@@ -0,0 +1,389 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Benchmark de Rutas Críticas
+Versión B01 - Corpus grabado, escalado sintético y comparación con una línea base
+
+Este script mide, sin red ni navegador, el rendimiento de cada etapa del proceso
+sobre un corpus de páginas de listado y fichas de detalle: limpieza del resumen
+(clean_resumen), parseo de las cajas del listado (parse_convocatoria), extracción
+de fichas con lxml y con BeautifulSoup (extract_new_page_info/extract_old_page_info)
+y guardado en la base de datos (guardar_progreso), además de la normalización de
+APERTURA y CIERRE (fila por fila frente a valores únicos con memo) y las consultas
+por rango sobre el índice de CIERRE. Para cada etapa informa el throughput
+(elementos por segundo) y el pico de memoria.
+
+El corpus puede ser un directorio grabado (listado/ con las respuestas de
+--grabar del scraper de lista y fichas/ con .html de detalle), el cache HTTP del
+scraper de detalles o páginas sintéticas; en todos los casos se replica hasta
+alcanzar la cantidad de convocatorias pedida (10.000 a 100.000 para pruebas de escala):
+
+    python corfo_benchmark_b01.py --generar-corpus fixtures            # corpus sintético en disco
+    python corfo_benchmark_b01.py --corpus fixtures --guardar-baseline
+    python corfo_benchmark_b01.py --corpus fixtures --convocatorias 100000
+    python corfo_benchmark_b01.py --corpus tests/fixtures                # corpus grabado del repositorio
+
+Si existe una línea base, la ejecución termina con código 1 cuando una etapa es más
+lenta o usa más memoria que la línea base por sobre el umbral (--umbral). Cada etapa
+toma el mejor tiempo de --repeticiones ejecuciones; para guardar o comparar una línea
+base se exigen al menos REPETICIONES_MINIMAS.
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from corfo_scraper_lista_b01 import CorfoScraper as ScraperLista
+from corfo_detalle_scraper_b01 import extraer_info_bs4, guardar_progreso
+from corfo_detalle_lxml_b01 import extraer_detalle, corpus_sintetico, corpus_directorio, corpus_cache
+from corfo_esquema_b01 import LISTADO, ESQUEMA_LISTADO, inner_html
+from corfo_db_b01 import BaseDatos, NO_DISPONIBLE
+from corfo_fechas_b01 import NOMBRES_MESES, IndiceCierre, normalizar_fechas, parsear_fecha
+
+# Configuración
+ARCHIVO_BASELINE = 'corfo_benchmark_baseline.json'
+UMBRAL_REGRESION = 0.20  # fracción de empeoramiento tolerada respecto de la línea base
+CONVOCATORIAS = 10000  # convocatorias del escalado sintético
+FICHAS = 500  # fichas de detalle por medición
+POR_PAGINA = 12  # cajas por página del listado sintético
+REPETICIONES = 5
+REPETICIONES_MINIMAS = 3  # para guardar o comparar una línea base: una sola medición es ruido
+CONSULTAS_CIERRE = 100  # consultas por rango sobre el índice de CIERRE
+
+_RESUMEN = ESQUEMA_LISTADO['campos']['RESUMEN']['xpath']
+_FECHAS = [ESQUEMA_LISTADO['campos'][campo]['xpath'] for campo in ('APERTURA', 'CIERRE')]
+
+
+# Corpus
+
+def fecha_sintetica(i: int, desplazamiento: int = 0) -> str:
+    """Fecha con los formatos del sitio: texto, dd/mm/aaaa, con hora o "No disponible"."""
+    if i % 17 == 0:
+        return NO_DISPONIBLE
+    dia, mes, anio = i % 28 + 1, (i // 28 + desplazamiento) % 12 + 1, 2023 + i % 4
+    if i % 5 == 0:
+        return f"{dia:02d}/{mes:02d}/{anio}"
+    hora = f", {i % 9 + 10}:00 hrs" if i % 7 == 0 else ''
+    return f"{dia} de {NOMBRES_MESES[mes - 1]} de {anio}{hora}"
+
+
+def caja_sintetica(i: int) -> str:
+    """Caja del listado con los campos y las variantes que trata parse_convocatoria."""
+    href = f"/sites/cpp/convocatorias/sintetica_{i}" if i % 3 else f"https://corfo.cl/sites/cpp/convocatorias/abs_{i}"
+    matchmaking = ('<span style="border: 2px solid #2fca70;padding: 20px;display: inline-block;">'
+                   'Plataforma Matchmaking</span>' if i % 4 == 0 else '')
+    return (
+        f'<div class="caja-resultados_uno col-12"><h4 class="titulo-cajas_fechas"> Convocatoria {i}\n'
+        f' <b>Programa</b></h4><div class="apertura">Apertura <span>{fecha_sintetica(i)}</span></div>'
+        f'<div class="cierre">Cierre <span>{fecha_sintetica(i + 1, 2)}</span></div>'
+        f'<div><p>Alcance: {"Nacional" if i % 2 else "Regional"}</p><span>Estado: '
+        f'{"Abierta" if i % 5 else "Cerrada"}</span></div>'
+        f'<p>Apoyo a proyectos de innovación número {i} <a href="/bases">bases</a>{matchmaking}'
+        f'<br> " - cofinanciamiento hasta $ {i}0.000.000</p>'
+        f'<div class="foot-caja_result"><a href="{href}">Más Información</a></div></div>'
+    )
+
+
+def listado_sintetico(convocatorias: int, por_pagina: int = POR_PAGINA) -> List[Tuple[str, str]]:
+    """Páginas del listado con el marcado de #listSearch y el enlace 'Siguiente'."""
+    paginas = []
+    for numero, inicio in enumerate(range(0, convocatorias, por_pagina), 1):
+        cajas = ''.join(caja_sintetica(i) for i in range(inicio, min(inicio + por_pagina, convocatorias)))
+        siguiente = (f'<li class="page-item"><a class="page-link" href="javascript:getRedirectNext(\'{numero + 1}\')">'
+                     f'Siguiente</a></li>' if inicio + por_pagina < convocatorias else '')
+        paginas.append((f'listado_{numero:04d}.html',
+                        f'<html><body><div id="listSearch">{cajas}<ul>{siguiente}</ul></div></body></html>'))
+    return paginas
+
+
+def generar_corpus(directorio: str, convocatorias: int = 240, fichas: int = 200):
+    """Escribe un corpus sintético con la estructura de un corpus grabado."""
+    for subdirectorio, paginas in (('listado', listado_sintetico(convocatorias)),
+                                   ('fichas', corpus_sintetico(fichas))):
+        ruta = os.path.join(directorio, subdirectorio)
+        os.makedirs(ruta, exist_ok=True)
+        for nombre, texto in paginas:
+            archivo = nombre if nombre.endswith('.html') else f'{nombre}.html'
+            with open(os.path.join(ruta, archivo), 'w', encoding='utf-8') as f:
+                f.write(texto)
+
+
+def leer_listado(directorio: str) -> List[Tuple[str, str]]:
+    """Lee las páginas de listado grabadas (listado_NNNN.html)."""
+    paginas = []
+    for archivo in sorted(glob.glob(os.path.join(directorio, 'listado_*.html'))):
+        with open(archivo, encoding='utf-8') as f:
+            paginas.append((os.path.basename(archivo), f.read()))
+    return paginas
+
+
+def escalar(paginas: List, cantidad: int, contar: Callable = lambda pagina: 1) -> List:
+    """Repite el corpus de forma cíclica hasta reunir `cantidad` elementos."""
+    if not paginas:
+        return []
+    resultado, total, i = [], 0, 0
+    while total < cantidad:
+        pagina = paginas[i % len(paginas)]
+        resultado.append(pagina)
+        total += max(contar(pagina), 1)
+        i += 1
+    return resultado
+
+
+class Corpus:
+    """Páginas de listado y fichas de detalle escaladas a la cantidad pedida."""
+
+    def __init__(self, listado: List[Tuple[str, str]], fichas: List[Tuple[str, str]],
+                 convocatorias: int = CONVOCATORIAS, cantidad_fichas: int = FICHAS):
+        cajas = {nombre: LISTADO.cajas(LISTADO.documento(texto)) for nombre, texto in listado}
+        escalado = escalar(listado, convocatorias, lambda pagina: len(cajas[pagina[0]]))
+        self.listado = [texto for _, texto in escalado]
+        self.convocatorias = sum(len(cajas[nombre]) for nombre, _ in escalado)
+        self.fichas = [texto for _, texto in escalar(fichas, cantidad_fichas)]
+        resumenes, fechas = [], []
+        for cajas_pagina in cajas.values():
+            for caja in cajas_pagina:
+                parrafos = caja.xpath(_RESUMEN)
+                if parrafos:
+                    resumenes.append(inner_html(parrafos[0]))
+                # (APERTURA, CIERRE) tal como los guarda parse_convocatoria
+                spans = [caja.xpath(xpath) for xpath in _FECHAS]
+                fechas.append(tuple(span[0].text_content().strip() if span else NO_DISPONIBLE for span in spans))
+        self.resumenes = escalar(resumenes, convocatorias)
+        self.fechas = escalar(fechas, convocatorias)
+
+    @classmethod
+    def cargar(cls, corpus: Optional[str] = None, cache: Optional[str] = None,
+               convocatorias: int = CONVOCATORIAS, fichas: int = FICHAS) -> 'Corpus':
+        """Corpus grabado (directorio y/o cache HTTP) o sintético si no se indica ninguno."""
+        listado = leer_listado(os.path.join(corpus, 'listado')) if corpus else []
+        paginas_fichas = corpus_directorio(os.path.join(corpus, 'fichas')) if corpus else []
+        if cache:
+            paginas_fichas += corpus_cache(cache)
+        if not listado:
+            listado = listado_sintetico(min(convocatorias, 240))
+        if not paginas_fichas:
+            paginas_fichas = corpus_sintetico(200)
+        return cls(listado, paginas_fichas, convocatorias, fichas)
+
+
+# Etapas
+
+def etapa_clean_resumen(corpus: Corpus) -> int:
+    scraper = ScraperLista()
+    for resumen in corpus.resumenes:
+        scraper.clean_resumen(resumen)
+    return len(corpus.resumenes)
+
+
+def etapa_parse_convocatoria(corpus: Corpus) -> int:
+    scraper = ScraperLista()
+    return sum(len(scraper.parse_listado_html(texto)) for texto in corpus.listado)
+
+
+def etapa_detalle_lxml(corpus: Corpus) -> int:
+    for texto in corpus.fichas:
+        extraer_detalle(texto, respaldo=extraer_info_bs4)
+    return len(corpus.fichas)
+
+
+def etapa_detalle_bs4(corpus: Corpus) -> int:
+    for texto in corpus.fichas:
+        extraer_info_bs4(texto)
+    return len(corpus.fichas)
+
+
+def etapa_guardar_progreso(corpus: Corpus) -> int:
+    extraidos = [extraer_detalle(texto, respaldo=extraer_info_bs4) for texto in corpus.fichas[:50]]
+    extraidos = [datos for datos in extraidos if datos] or [{'DETALLE': 'Sin datos'}]
+    datos = {
+        f"https://corfo.cl/sites/cpp/convocatorias/sintetica_{i}": extraidos[i % len(extraidos)]
+        for i in range(corpus.convocatorias)
+    }
+    with tempfile.TemporaryDirectory() as directorio:
+        db = BaseDatos(os.path.join(directorio, 'benchmark.sqlite'))
+        try:
+            if not guardar_progreso(db, datos):
+                raise RuntimeError("guardar_progreso no pudo guardar los datos")
+        finally:
+            db.cerrar()
+    return len(datos)
+
+
+def etapa_fechas_por_fila(corpus: Corpus) -> int:
+    for apertura, cierre in corpus.fechas:
+        parsear_fecha(apertura)
+        parsear_fecha(cierre)
+    return 2 * len(corpus.fechas)
+
+
+def etapa_fechas_vectorizadas(corpus: Corpus) -> int:
+    memo = {}  # memo vacío en cada medición: se mide también la interpretación de los únicos
+    for columna in zip(*corpus.fechas):
+        normalizar_fechas(columna, memo=memo)
+    return 2 * len(corpus.fechas)
+
+
+def etapa_indice_cierre(corpus: Corpus) -> int:
+    cierres = normalizar_fechas([cierre for _, cierre in corpus.fechas])
+    indice = IndiceCierre(cierres.to_frame('CIERRE'))
+    inicio = cierres.min()
+    for i in range(CONSULTAS_CIERRE):
+        desde = inicio + timedelta(days=7 * i)
+        indice.rango(desde, desde + timedelta(days=14))
+    return CONSULTAS_CIERRE
+
+
+ETAPAS: Dict[str, Callable[[Corpus], int]] = {
+    'clean_resumen': etapa_clean_resumen,
+    'parse_convocatoria': etapa_parse_convocatoria,
+    'detalle_lxml': etapa_detalle_lxml,
+    'detalle_bs4': etapa_detalle_bs4,
+    'guardar_progreso': etapa_guardar_progreso,
+    'fechas_por_fila': etapa_fechas_por_fila,
+    'fechas_vectorizadas': etapa_fechas_vectorizadas,
+    'indice_cierre': etapa_indice_cierre
+}
+
+
+def medir(etapa: Callable[[Corpus], int], corpus: Corpus, repeticiones: int = REPETICIONES) -> Dict:
+    """Mejor tiempo de `repeticiones` ejecuciones y pico de memoria en una ejecución aparte."""
+    mejor = None
+    elementos = 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        elementos = etapa(corpus)
+        segundos = time.perf_counter() - inicio
+        mejor = segundos if mejor is None else min(mejor, segundos)
+
+    # tracemalloc enlentece la ejecución, por eso el pico se mide por separado
+    tracemalloc.start()
+    try:
+        etapa(corpus)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'elementos': elementos,
+        'segundos': round(mejor, 4),
+        'elementos_por_segundo': round(elementos / mejor, 1) if mejor else None,
+        'pico_mb': round(pico / (1024 * 1024), 2)
+    }
+
+
+def ejecutar(corpus: Corpus, etapas: Optional[List[str]] = None, repeticiones: int = REPETICIONES) -> Dict:
+    """Mide las etapas pedidas y retorna el reporte."""
+    resultados = {}
+    for nombre in etapas or list(ETAPAS):
+        resultados[nombre] = medir(ETAPAS[nombre], corpus, repeticiones)
+    return {
+        'convocatorias': corpus.convocatorias,
+        'fichas': len(corpus.fichas),
+        'python': platform.python_version(),
+        'repeticiones': repeticiones,
+        'etapas': resultados
+    }
+
+
+# Línea base
+
+def comparar(reporte: Dict, baseline: Dict, umbral: float = UMBRAL_REGRESION) -> List[str]:
+    """Etapas cuyo throughput cayó o cuyo pico de memoria creció más que el umbral."""
+    regresiones = []
+    for nombre, actual in reporte['etapas'].items():
+        base = baseline.get('etapas', {}).get(nombre)
+        if not base:
+            continue
+        if base.get('elementos_por_segundo') and actual['elementos_por_segundo'] is not None and \
+                actual['elementos_por_segundo'] < base['elementos_por_segundo'] * (1 - umbral):
+            regresiones.append(f"{nombre}: {actual['elementos_por_segundo']} elementos/s "
+                               f"(línea base {base['elementos_por_segundo']})")
+        if base.get('pico_mb') and actual['pico_mb'] > base['pico_mb'] * (1 + umbral):
+            regresiones.append(f"{nombre}: pico de {actual['pico_mb']} MB (línea base {base['pico_mb']} MB)")
+    if baseline.get('repeticiones', REPETICIONES_MINIMAS) < REPETICIONES_MINIMAS:
+        logging.warning(f"La línea base se midió con {baseline['repeticiones']} repeticiones; "
+                        f"conviene guardarla de nuevo con al menos {REPETICIONES_MINIMAS}")
+    if baseline.get('convocatorias') not in (None, reporte['convocatorias']):
+        logging.warning(f"La línea base se midió con {baseline['convocatorias']} convocatorias "
+                        f"y esta ejecución con {reporte['convocatorias']}")
+    return regresiones
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Lee los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description='Benchmark de las etapas del scraper CORFO')
+    parser.add_argument('--corpus', metavar='DIR',
+                        help='Corpus grabado con subdirectorios listado/ y fichas/')
+    parser.add_argument('--cache', metavar='ARCHIVO', help='Cache HTTP del scraper de detalles como fuente de fichas')
+    parser.add_argument('--generar-corpus', metavar='DIR',
+                        help='Escribe un corpus sintético en DIR y termina')
+    parser.add_argument('--convocatorias', type=int, default=CONVOCATORIAS,
+                        help='Convocatorias a procesar (el corpus se replica hasta alcanzarlas)')
+    parser.add_argument('--fichas', type=int, default=FICHAS, help='Fichas de detalle por medición')
+    parser.add_argument('--etapas', nargs='+', choices=list(ETAPAS), help='Etapas a medir (todas por defecto)')
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES, help='Repeticiones por etapa')
+    parser.add_argument('--baseline', default=ARCHIVO_BASELINE, metavar='ARCHIVO',
+                        help='Archivo JSON con la línea base')
+    parser.add_argument('--guardar-baseline', action='store_true',
+                        help='Guarda el resultado como nueva línea base')
+    parser.add_argument('--umbral', type=float, default=UMBRAL_REGRESION,
+                        help='Empeoramiento tolerado respecto de la línea base (0.2 = 20%%)')
+    parser.add_argument('--reporte', metavar='ARCHIVO', help='Guarda el resultado en formato JSON')
+    args = parser.parse_args(argv)
+    compara = args.guardar_baseline or (os.path.exists(args.baseline) and not args.generar_corpus)
+    if compara and args.repeticiones < REPETICIONES_MINIMAS:
+        parser.error(f"--repeticiones debe ser al menos {REPETICIONES_MINIMAS} para guardar o "
+                     f"comparar una línea base (el mejor de una sola ejecución es ruido)")
+    return args
+
+
+def main():
+    args = parse_args()
+    logging.getLogger().setLevel(logging.WARNING)  # el log de cada etapa no es parte de la medición
+
+    if args.generar_corpus:
+        generar_corpus(args.generar_corpus)
+        print(f"Corpus sintético escrito en {args.generar_corpus}")
+        return
+
+    corpus = Corpus.cargar(args.corpus, args.cache, args.convocatorias, args.fichas)
+    print(f"Corpus: {len(corpus.listado)} páginas de listado ({corpus.convocatorias} convocatorias), "
+          f"{len(corpus.fichas)} fichas")
+    reporte = ejecutar(corpus, args.etapas, args.repeticiones)
+    for nombre, resultado in reporte['etapas'].items():
+        print(f"  {nombre:<20} {resultado['elementos_por_segundo']:>10} elementos/s  "
+              f"{resultado['segundos']:>8} s  pico {resultado['pico_mb']} MB")
+
+    if args.reporte:
+        with open(args.reporte, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+
+    if args.guardar_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        print(f"Línea base guardada en {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            regresiones = comparar(reporte, json.load(f), args.umbral)
+        if regresiones:
+            print(f"Regresiones respecto de {args.baseline} (umbral {args.umbral:.0%}):")
+            for regresion in regresiones:
+                print(f"  {regresion}")
+            sys.exit(1)
+        print(f"Sin regresiones respecto de {args.baseline} (umbral {args.umbral:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Cache HTTP en Disco
+Versión B01 - GET condicional para fichas de convocatorias
+
+Este módulo mantiene un cache persistente indexado por URL que guarda ETag,
+Last-Modified, un hash del contenido y los datos ya extraídos de cada ficha.
+Permite enviar If-None-Match/If-Modified-Since y evitar el parseo cuando el
+servidor responde 304 o el contenido no cambió. Las entradas menos usadas
+recientemente se eliminan cuando el cache supera su tamaño máximo.
+"""
+
+import json
+import time
+import zlib
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuración por defecto
+ARCHIVO_CACHE = 'corfo_cache_http.sqlite'
+TAMANO_MAXIMO = 200 * 1024 * 1024  # bytes
+
+
+def hash_contenido(contenido: bytes) -> str:
+    """Calcula el hash SHA-256 del cuerpo de una respuesta."""
+    return hashlib.sha256(contenido).hexdigest()
+
+
+class CacheHTTP:
+    """Cache HTTP persistente en SQLite con política de eviction LRU."""
+
+    def __init__(self, ruta: str = ARCHIVO_CACHE, tamano_maximo: int = TAMANO_MAXIMO):
+        self.ruta = ruta
+        self.tamano_maximo = tamano_maximo
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(ruta, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                hash TEXT NOT NULL,
+                cuerpo BLOB,
+                datos TEXT,
+                tamano INTEGER NOT NULL,
+                ultimo_acceso REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_acceso ON cache (ultimo_acceso)")
+        self.conn.commit()
+        # Total acumulado: guardar() no recorre la tabla para decidir si hay que evictar
+        self.tamano = self.conn.execute("SELECT COALESCE(SUM(tamano), 0) FROM cache").fetchone()[0]
+
+    def obtener(self, url: str) -> Optional[Dict[str, Any]]:
+        """Retorna la entrada de una URL o None si no está en el cache."""
+        with self.lock:
+            fila = self.conn.execute(
+                "SELECT etag, last_modified, hash, datos FROM cache WHERE url = ?", (url,)
+            ).fetchone()
+        if fila is None:
+            return None
+        etag, last_modified, hash_, datos = fila
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'hash': hash_,
+            'datos': json.loads(datos) if datos is not None else None
+        }
+
+    def cuerpo(self, url: str) -> Optional[bytes]:
+        """Retorna el cuerpo almacenado de una URL."""
+        with self.lock:
+            fila = self.conn.execute("SELECT cuerpo FROM cache WHERE url = ?", (url,)).fetchone()
+        return zlib.decompress(fila[0]) if fila and fila[0] is not None else None
+
+    def urls(self) -> List[str]:
+        """Retorna las URLs guardadas en el cache."""
+        with self.lock:
+            return [fila[0] for fila in self.conn.execute("SELECT url FROM cache ORDER BY url")]
+
+    def cabeceras_condicionales(self, entrada: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Construye las cabeceras If-None-Match/If-Modified-Since de una entrada."""
+        cabeceras = {}
+        if entrada:
+            if entrada['etag']:
+                cabeceras['If-None-Match'] = entrada['etag']
+            if entrada['last_modified']:
+                cabeceras['If-Modified-Since'] = entrada['last_modified']
+        return cabeceras
+
+    def tocar(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        Actualiza la fecha de último acceso de una entrada sin cambios y, si la respuesta
+        trae validadores nuevos (ETag/Last-Modified), los guarda para el próximo GET condicional.
+        """
+        with self.lock:
+            self.conn.execute(
+                "UPDATE cache SET ultimo_acceso = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (time.time(), etag, last_modified, url)
+            )
+            self.conn.commit()
+
+    def guardar(self, url: str, cuerpo: bytes, etag: Optional[str], last_modified: Optional[str],
+                datos: Any = None):
+        """Guarda o reemplaza la entrada de una URL y aplica la eviction si corresponde."""
+        comprimido = zlib.compress(cuerpo)
+        datos_json = json.dumps(datos, ensure_ascii=False) if datos is not None else None
+        tamano = len(comprimido) + len(datos_json or '')
+        with self.lock:
+            anterior = self.conn.execute("SELECT tamano FROM cache WHERE url = ?", (url,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, hash_contenido(cuerpo), comprimido, datos_json,
+                 tamano, time.time())
+            )
+            self.conn.commit()
+            self.tamano += tamano - (anterior[0] if anterior else 0)
+        if self.tamano > self.tamano_maximo:
+            self.evictar()
+
+    def tamano_total(self) -> int:
+        """Retorna el tamaño ocupado por las entradas en bytes."""
+        with self.lock:
+            return self.tamano
+
+    def evictar(self) -> int:
+        """Elimina las entradas menos usadas hasta respetar el tamaño máximo."""
+        eliminadas = 0
+        with self.lock:
+            exceso = self.tamano - self.tamano_maximo
+            if exceso <= 0:
+                return 0
+            filas = self.conn.execute(
+                "SELECT url, tamano FROM cache ORDER BY ultimo_acceso"
+            ).fetchall()
+            for url, tamano in filas:
+                if exceso <= 0:
+                    break
+                self.conn.execute("DELETE FROM cache WHERE url = ?", (url,))
+                exceso -= tamano
+                self.tamano -= tamano
+                eliminadas += 1
+            self.conn.commit()
+        logger.info(f"Cache: {eliminadas} entradas eliminadas por tamaño máximo")
+        return eliminadas
+
+    def cerrar(self):
+        """Cierra la conexión al archivo del cache."""
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,444 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Base de Datos SQLite
+Versión B01 - Almacenamiento compartido entre las etapas del pipeline
+
+Este módulo reemplaza el traspaso de CSV completos entre los scrapers por una única
+base SQLite en modo WAL con tres tablas de datos, una cola de fallidos y los cursores
+de recorrido:
+
+- convocatorias: datos del listado, una fila por URL canónica
+- filtros: pertenencia (URL, FILTRO) encontrada por el scraper de filtros
+- detalles: campos extraídos de la ficha de cada convocatoria
+- fallidos: páginas del listado y fichas que agotaron sus reintentos, por etapa
+- cursores: última página completada del listado y de cada filtro, para --resume
+
+Las escrituras usan upsert por URL. La exportación a CSV se hace bajo demanda:
+
+    python corfo_db_b01.py --exportar lista
+    python corfo_db_b01.py --exportar enriquecido
+    python corfo_db_b01.py --exportar completo
+    python corfo_db_b01.py --exportar completo --parquet  # ver corfo_parquet_b01
+    python corfo_db_b01.py --fallidos
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+import numpy as np
+import pandas as pd
+
+from corfo_filtros_bits_b01 import COLUMNA_BITS, codificar_matriz
+
+logger = logging.getLogger(__name__)
+
+# Configuración
+ARCHIVO_DB = 'corfo_convocatorias.sqlite'
+URL_BASE = 'https://corfo.cl'
+NO_DISPONIBLE = 'No disponible'
+COLUMNAS_CONVOCATORIA = ['ID', 'NOMBRE', 'APERTURA', 'CIERRE', 'ALCANCE', 'ESTADO', 'RESUMEN', 'URL']
+COLUMNAS_CONTENIDO = COLUMNAS_CONVOCATORIA[1:-1]  # campos que entran en el HASH de una fila
+COLUMNAS_DETALLE = ['DETALLE', 'BENEFICIO', 'QUIENES', 'RESULTADOS']
+ARCHIVOS_CSV = {
+    'lista': 'corfo_convocatorias.csv',
+    'enriquecido': 'corfo_convocatorias_enriched.csv',
+    'completo': 'corfo_convocatorias_full.csv'
+}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS convocatorias (
+    URL TEXT PRIMARY KEY,
+    ID INTEGER UNIQUE,
+    NOMBRE TEXT,
+    APERTURA TEXT,
+    CIERRE TEXT,
+    ALCANCE TEXT,
+    ESTADO TEXT,
+    RESUMEN TEXT,
+    HASH TEXT,
+    ACTUALIZADO TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_convocatorias_estado ON convocatorias (ESTADO);
+CREATE INDEX IF NOT EXISTS idx_convocatorias_cierre ON convocatorias (CIERRE);
+
+CREATE TABLE IF NOT EXISTS filtros (
+    URL TEXT NOT NULL,
+    FILTRO TEXT NOT NULL,
+    PRIMARY KEY (URL, FILTRO)
+);
+CREATE INDEX IF NOT EXISTS idx_filtros_filtro ON filtros (FILTRO);
+
+CREATE TABLE IF NOT EXISTS detalles (
+    URL TEXT PRIMARY KEY,
+    DETALLE TEXT,
+    BENEFICIO TEXT,
+    QUIENES TEXT,
+    RESULTADOS TEXT,
+    ACTUALIZADO TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS fallidos (
+    ETAPA TEXT NOT NULL,
+    CLAVE TEXT NOT NULL,
+    CATEGORIA TEXT,
+    ERROR TEXT,
+    INTENTOS INTEGER DEFAULT 0,
+    ACTUALIZADO TEXT DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (ETAPA, CLAVE)
+);
+
+CREATE TABLE IF NOT EXISTS cursores (
+    ETAPA TEXT NOT NULL,
+    FILTRO TEXT NOT NULL DEFAULT '',
+    PAGINA INTEGER NOT NULL,
+    ULTIMA_URL TEXT,
+    COMPLETADO INTEGER DEFAULT 0,
+    ACTUALIZADO TEXT DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (ETAPA, FILTRO)
+);
+"""
+
+
+def canonizar_url(url: str) -> str:
+    """Normaliza una URL de convocatoria: absoluta, esquema/host en minúsculas y sin fragmento."""
+    if not isinstance(url, str) or url == NO_DISPONIBLE:
+        return url
+    url = urljoin(URL_BASE + '/', str(url).strip())
+    partes = urlsplit(url)
+    return urlunsplit((partes.scheme.lower(), partes.netloc.lower(), partes.path, partes.query, ''))
+
+
+def hash_fila(fila: Dict) -> str:
+    """Hash del contenido de una fila del listado (sin ID ni URL)."""
+    contenido = '\x1f'.join('' if fila.get(c) is None else str(fila.get(c)) for c in COLUMNAS_CONTENIDO)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:16]
+
+
+class BaseDatos:
+    """Acceso a la base SQLite compartida por los tres scrapers."""
+
+    def __init__(self, ruta: str = ARCHIVO_DB):
+        self.ruta = ruta
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(ruta, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(ESQUEMA)
+        self._migrar()
+        self.conn.commit()
+
+    def _migrar(self):
+        """
+        Agrega las columnas que no existían en bases creadas por versiones anteriores y
+        calcula el HASH de las filas guardadas sin él.
+        """
+        columnas = {fila[1] for fila in self.conn.execute("PRAGMA table_info(convocatorias)")}
+        if 'HASH' not in columnas:
+            self.conn.execute("ALTER TABLE convocatorias ADD COLUMN HASH TEXT")
+        filas = self.conn.execute(
+            f"SELECT URL, {', '.join(COLUMNAS_CONTENIDO)} FROM convocatorias WHERE HASH IS NULL"
+        ).fetchall()
+        if filas:
+            self.conn.executemany("UPDATE convocatorias SET HASH = ? WHERE URL = ?", [
+                (hash_fila(dict(zip(COLUMNAS_CONTENIDO, fila[1:]))), fila[0]) for fila in filas
+            ])
+            logger.info(f"HASH calculado para {len(filas)} convocatorias guardadas sin él")
+
+    # Convocatorias
+
+    def urls_convocatorias(self) -> Set[str]:
+        """Retorna el conjunto de URLs guardadas."""
+        with self.lock:
+            return {fila[0] for fila in self.conn.execute("SELECT URL FROM convocatorias")}
+
+    def hashes_convocatorias(self) -> Dict[str, Optional[str]]:
+        """Retorna URL -> HASH del contenido guardado de cada convocatoria."""
+        with self.lock:
+            return dict(self.conn.execute("SELECT URL, HASH FROM convocatorias"))
+
+    def urls_sin_detalle(self) -> List[str]:
+        """Retorna, en orden de ID, las URLs de convocatorias que aún no tienen fila en detalles."""
+        with self.lock:
+            return [fila[0] for fila in self.conn.execute("""
+                SELECT c.URL FROM convocatorias c LEFT JOIN detalles d ON d.URL = c.URL
+                WHERE d.URL IS NULL ORDER BY c.ID
+            """)]
+
+    def ultimo_id(self) -> int:
+        """Retorna el mayor ID asignado, o 0 si no hay convocatorias."""
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(MAX(ID), 0) FROM convocatorias").fetchone()[0]
+
+    def existe_nombre(self, nombre: str) -> bool:
+        """Indica si existe una convocatoria con el nombre dado."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT 1 FROM convocatorias WHERE NOMBRE = ? LIMIT 1", (nombre,)
+            ).fetchone() is not None
+
+    def upsert_convocatorias(self, filas: Iterable[Dict]) -> int:
+        """
+        Inserta o actualiza convocatorias por URL; el ID de una fila existente se conserva.
+
+        Las filas cuyo HASH no cambió no se reescriben, por lo que ACTUALIZADO indica
+        la última vez que el contenido cambió.
+        """
+        registros = [
+            tuple(fila.get(c) for c in COLUMNAS_CONVOCATORIA[:-1])
+            + (canonizar_url(fila['URL']), hash_fila(fila))
+            for fila in filas
+        ]
+        with self.lock:
+            self.conn.executemany("""
+                INSERT INTO convocatorias (ID, NOMBRE, APERTURA, CIERRE, ALCANCE, ESTADO, RESUMEN, URL, HASH)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (URL) DO UPDATE SET
+                    NOMBRE = excluded.NOMBRE,
+                    APERTURA = excluded.APERTURA,
+                    CIERRE = excluded.CIERRE,
+                    ALCANCE = excluded.ALCANCE,
+                    ESTADO = excluded.ESTADO,
+                    RESUMEN = excluded.RESUMEN,
+                    HASH = excluded.HASH,
+                    ACTUALIZADO = CURRENT_TIMESTAMP
+                WHERE convocatorias.HASH IS NOT excluded.HASH
+            """, registros)
+            self.conn.commit()
+        return len(registros)
+
+    def leer_convocatorias(self) -> pd.DataFrame:
+        """Retorna las convocatorias ordenadas por ID con las columnas del listado."""
+        with self.lock:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(COLUMNAS_CONVOCATORIA)} FROM convocatorias ORDER BY ID", self.conn
+            )
+
+    # Filtros
+
+    def limpiar_filtros(self):
+        """Elimina la pertenencia a filtros de una ejecución anterior."""
+        with self.lock:
+            self.conn.execute("DELETE FROM filtros")
+            self.conn.commit()
+
+    def guardar_filtros(self, pares: Iterable[Tuple[str, str]]):
+        """Registra pares (URL, FILTRO); los pares ya existentes se ignoran."""
+        with self.lock:
+            self.conn.executemany("INSERT OR IGNORE INTO filtros (URL, FILTRO) VALUES (?, ?)", pares)
+            self.conn.commit()
+
+    def guardar_matriz_filtros(self, urls: List[str], columnas: List[str], matriz: np.ndarray,
+                               cursores: Optional[Dict[str, Tuple[int, Optional[str], bool]]] = None,
+                               pares: Optional[Iterable[Tuple[str, str]]] = None):
+        """
+        Registra la pertenencia marcada en una matriz filas x filtros, más los pares
+        (URL, FILTRO) que no tienen fila en la matriz.
+
+        Los cursores (FILTRO -> (página, última URL, completado)) se guardan en la misma
+        transacción, de modo que nunca apuntan más allá de la pertenencia guardada.
+        """
+        filas, cols = np.nonzero(matriz)
+        with self.lock:
+            with self.conn:
+                self.conn.executemany("INSERT OR IGNORE INTO filtros (URL, FILTRO) VALUES (?, ?)",
+                                      ((urls[i], columnas[j]) for i, j in zip(filas, cols)))
+                if pares:
+                    self.conn.executemany("INSERT OR IGNORE INTO filtros (URL, FILTRO) VALUES (?, ?)", pares)
+                for filtro, (pagina, ultima_url, completado) in (cursores or {}).items():
+                    self._upsert_cursor('filtros', filtro, pagina, ultima_url, completado)
+
+    # Detalles
+
+    def upsert_detalles(self, datos: Dict[str, Dict[str, str]]):
+        """Inserta o actualiza detalles por URL; los campos ausentes conservan su valor previo."""
+        registros = [
+            (canonizar_url(url),) + tuple(campos.get(c) for c in COLUMNAS_DETALLE)
+            for url, campos in datos.items()
+        ]
+        with self.lock:
+            self.conn.executemany("""
+                INSERT INTO detalles (URL, DETALLE, BENEFICIO, QUIENES, RESULTADOS)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (URL) DO UPDATE SET
+                    DETALLE = COALESCE(excluded.DETALLE, DETALLE),
+                    BENEFICIO = COALESCE(excluded.BENEFICIO, BENEFICIO),
+                    QUIENES = COALESCE(excluded.QUIENES, QUIENES),
+                    RESULTADOS = COALESCE(excluded.RESULTADOS, RESULTADOS),
+                    ACTUALIZADO = CURRENT_TIMESTAMP
+            """, registros)
+            self.conn.commit()
+
+    # Cola de fallidos
+
+    def registrar_fallido(self, etapa: str, clave: str, categoria: str, error: str, intentos: int):
+        """Agrega un ítem a la cola de fallidos; si ya estaba, suma los intentos y guarda el último error."""
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO fallidos (ETAPA, CLAVE, CATEGORIA, ERROR, INTENTOS)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (ETAPA, CLAVE) DO UPDATE SET
+                    CATEGORIA = excluded.CATEGORIA,
+                    ERROR = excluded.ERROR,
+                    INTENTOS = INTENTOS + excluded.INTENTOS,
+                    ACTUALIZADO = CURRENT_TIMESTAMP
+            """, (etapa, str(clave), categoria, error[:500], intentos))
+            self.conn.commit()
+
+    def leer_fallidos(self, etapa: Optional[str] = None) -> pd.DataFrame:
+        """Retorna la cola de fallidos, completa o de una etapa, del más antiguo al más reciente."""
+        consulta = "SELECT ETAPA, CLAVE, CATEGORIA, ERROR, INTENTOS, ACTUALIZADO FROM fallidos"
+        parametros = ()
+        if etapa:
+            consulta += " WHERE ETAPA = ?"
+            parametros = (etapa,)
+        with self.lock:
+            return pd.read_sql_query(consulta + " ORDER BY ACTUALIZADO", self.conn, params=parametros)
+
+    def quitar_fallidos(self, etapa: str, claves: Iterable[str]):
+        """Quita de la cola los ítems de una etapa que ya se procesaron."""
+        with self.lock:
+            self.conn.executemany("DELETE FROM fallidos WHERE ETAPA = ? AND CLAVE = ?",
+                                  [(etapa, str(clave)) for clave in claves])
+            self.conn.commit()
+
+    # Cursores de recorrido
+
+    def _upsert_cursor(self, etapa: str, filtro: str, pagina: int, ultima_url: Optional[str], completado: bool):
+        self.conn.execute("""
+            INSERT INTO cursores (ETAPA, FILTRO, PAGINA, ULTIMA_URL, COMPLETADO)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (ETAPA, FILTRO) DO UPDATE SET
+                PAGINA = excluded.PAGINA,
+                ULTIMA_URL = excluded.ULTIMA_URL,
+                COMPLETADO = excluded.COMPLETADO,
+                ACTUALIZADO = CURRENT_TIMESTAMP
+        """, (etapa, filtro, pagina, ultima_url, int(completado)))
+
+    def guardar_cursor(self, etapa: str, pagina: int, ultima_url: Optional[str] = None, filtro: str = '',
+                       completado: bool = False):
+        """Registra la última página completada de un recorrido en una transacción atómica."""
+        with self.lock:
+            with self.conn:
+                self._upsert_cursor(etapa, filtro, pagina, ultima_url, completado)
+
+    def leer_cursores(self, etapa: str) -> Dict[str, Dict]:
+        """Retorna los cursores de una etapa: FILTRO -> {PAGINA, ULTIMA_URL, COMPLETADO}."""
+        with self.lock:
+            filas = self.conn.execute(
+                "SELECT FILTRO, PAGINA, ULTIMA_URL, COMPLETADO FROM cursores WHERE ETAPA = ?", (etapa,)
+            ).fetchall()
+        return {filtro: {'PAGINA': pagina, 'ULTIMA_URL': ultima_url, 'COMPLETADO': bool(completado)}
+                for filtro, pagina, ultima_url, completado in filas}
+
+    def borrar_cursores(self, etapa: str):
+        """Elimina los cursores de una etapa al terminar su recorrido o al empezar uno nuevo."""
+        with self.lock:
+            self.conn.execute("DELETE FROM cursores WHERE ETAPA = ?", (etapa,))
+            self.conn.commit()
+
+    # Lectura combinada y exportación
+
+    def leer_enriquecido(self, columnas_filtro: List[str]) -> pd.DataFrame:
+        """Retorna las convocatorias con una columna 0/1 por filtro y la columna FILTROS_BITS."""
+        df = self.leer_convocatorias()
+        with self.lock:
+            filtros = pd.read_sql_query("SELECT URL, FILTRO FROM filtros", self.conn)
+        posicion = {url: i for i, url in enumerate(df['URL'])}
+        matriz = np.zeros((len(df), len(columnas_filtro)), dtype=np.int64)
+        for j, columna in enumerate(columnas_filtro):
+            filas = [posicion[url] for url in filtros.loc[filtros['FILTRO'] == columna, 'URL'] if url in posicion]
+            matriz[filas, j] = 1
+        for j, columna in enumerate(columnas_filtro):
+            df[columna] = matriz[:, j]
+        df[COLUMNA_BITS] = codificar_matriz(matriz, columnas_filtro)
+        return df
+
+    def leer_completo(self, columnas_filtro: List[str]) -> pd.DataFrame:
+        """Retorna las convocatorias enriquecidas con los campos de detalle."""
+        df = self.leer_enriquecido(columnas_filtro)
+        with self.lock:
+            detalles = pd.read_sql_query(
+                f"SELECT URL, {', '.join(COLUMNAS_DETALLE)} FROM detalles", self.conn
+            ).set_index('URL')
+        for columna in COLUMNAS_DETALLE:
+            df[columna] = df['URL'].map(detalles[columna]).fillna(NO_DISPONIBLE)
+        return df
+
+    def exportar_csv(self, etapa: str, archivo: Optional[str] = None,
+                     columnas_filtro: Optional[List[str]] = None) -> str:
+        """Exporta la vista de una etapa (lista, enriquecido o completo) a CSV."""
+        archivo = archivo or ARCHIVOS_CSV[etapa]
+        if etapa == 'lista':
+            df = self.leer_convocatorias()
+            df.to_csv(archivo, index=False, encoding='utf-8-sig')
+        elif etapa == 'enriquecido':
+            self.leer_enriquecido(columnas_filtro or []).to_csv(archivo, index=False)
+        elif etapa == 'completo':
+            self.leer_completo(columnas_filtro or []).to_csv(archivo, index=False, encoding='utf-8')
+        else:
+            raise ValueError(f"Etapa desconocida: {etapa}")
+        logger.info(f"Exportado {etapa} a {archivo}")
+        return archivo
+
+    def importar_csv(self, archivo: str) -> int:
+        """Importa un CSV de listado existente (migración desde el formato anterior)."""
+        df = pd.read_csv(archivo)
+        df = df[[c for c in COLUMNAS_CONVOCATORIA if c in df.columns]]
+        filas = df.astype(object).where(df.notna(), None).to_dict('records')
+        return self.upsert_convocatorias(filas)
+
+    def cerrar(self):
+        """Cierra la conexión a la base de datos."""
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    from corfo_esquema_b01 import FILTROS
+
+    parser = argparse.ArgumentParser(description='Base de datos de convocatorias CORFO')
+    parser.add_argument('--db', default=ARCHIVO_DB, help='Archivo SQLite')
+    parser.add_argument('--exportar', choices=list(ARCHIVOS_CSV), help='Exporta una etapa a CSV')
+    parser.add_argument('--archivo', help='Archivo CSV de salida o de entrada')
+    parser.add_argument('--parquet', action='store_true',
+                        help='Con --exportar, escribe Parquet tipado en lugar de CSV (requiere pyarrow)')
+    parser.add_argument('--importar', action='store_true',
+                        help='Importa el CSV de listado indicado en --archivo')
+    parser.add_argument('--fallidos', action='store_true',
+                        help='Muestra la cola de fallidos por etapa y categoría')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db = BaseDatos(args.db)
+    try:
+        if args.importar:
+            archivo = args.archivo or ARCHIVOS_CSV['lista']
+            if not os.path.exists(archivo):
+                parser.error(f"No se encontró el archivo {archivo}")
+            logger.info(f"Importadas {db.importar_csv(archivo)} convocatorias desde {archivo}")
+        if args.exportar and args.parquet:
+            from corfo_parquet_b01 import exportar_parquet
+            exportar_parquet(db, args.exportar, args.archivo)
+        elif args.exportar:
+            columnas = [c for grupo in FILTROS.values() for c in grupo['filtros']]
+            db.exportar_csv(args.exportar, args.archivo, columnas)
+        if args.fallidos:
+            fallidos = db.leer_fallidos()
+            if fallidos.empty:
+                logger.info("La cola de fallidos está vacía")
+            for (etapa, categoria), grupo in fallidos.groupby(['ETAPA', 'CATEGORIA']):
+                logger.info(f"{etapa} / {categoria}: {len(grupo)} ítems, por ejemplo {grupo['CLAVE'].iloc[-1]} "
+                            f"({grupo['ERROR'].iloc[-1]})")
+    finally:
+        db.cerrar()
+
+
+if __name__ == "__main__":
+    main()
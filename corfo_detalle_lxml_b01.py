@@ -0,0 +1,354 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Extractor de Detalles con lxml
+Versión B01 - Detección de formato y extracción en una sola pasada
+
+Este módulo reemplaza, en la ruta rápida del scraper de detalles, el árbol de
+BeautifulSoup con html.parser y los ~8 recorridos de soup.select por ficha. Los
+formatos y sus campos vienen de ESQUEMA_DETALLE (corfo_esquema_b01.py); una
+sonda XPath precompilada clasifica la ficha (formato antiguo, nuevo, ambos o
+ninguno) y el extractor elegido reúne todos los campos en un solo recorrido del
+documento parseado con lxml. El resultado es el mismo de procesar_respuesta_bs4:
+las fichas que libxml2 interpreta distinto que html.parser (etiquetas mal cerradas o
+cerradas implícitamente, entidades desconocidas, marcado dentro de textarea o iframe)
+se detectan comparando ambos árboles y se derivan al extractor de respaldo (BeautifulSoup):
+
+    python corfo_detalle_lxml_b01.py --cache corfo_cache_detalles.sqlite
+    python corfo_detalle_lxml_b01.py --corpus fichas/ --repeticiones 5
+
+Ejecutado como script, compara ambos extractores sobre un corpus (fichas grabadas
+en el cache HTTP, un directorio de .html o fichas sintéticas) e informa las
+diferencias y el tiempo de parseo por página.
+"""
+
+import argparse
+import glob
+import html
+import os
+import re
+import time
+from html.entities import name2codepoint
+from typing import Callable, Dict, List, Optional, Tuple
+
+from lxml import etree
+from lxml import html as lxml_html
+
+from corfo_esquema_b01 import DETALLE
+
+# BeautifulSoup no incluye en get_text() el texto de estas etiquetas
+ETIQUETAS_SIN_TEXTO = {'script', 'style', 'template'}
+
+# libxml2 convierte \r\n en \n; html.parser los conserva
+MARCA_CR = '\ue000'
+
+# libxml2 descarta las secciones <![CDATA[...]]> fuera de <script>/<style>; html.parser las
+# conserva como texto y get_text() las incluye. Se reescriben como un elemento propio para
+# que su texto llegue al resultado como una cadena aparte (strip se aplica a cada una).
+PATRON_CDATA = re.compile(r'<!\[CDATA\[(.*?)\]\]>', re.DOTALL)
+ETIQUETA_CDATA = 'corfo-cdata'
+
+# Árbol que arma html.parser, que nunca cierra etiquetas de forma implícita: libxml2 sí
+# lo hace (<p>uno<p>dos, <p>a<div>), trata como texto el contenido de textarea, iframe o
+# xmp y decodifica entidades desconocidas o sin ';'. Si el árbol de lxml no coincide con
+# este (etiqueta y profundidad de cada elemento, en orden) la ficha va al respaldo.
+PATRON_MARCADO = re.compile(
+    r'<!--.*?(?:-->|\Z)'
+    r'|<(script|style)\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*>.*?(?:</\1\s*>|\Z)'
+    r'|<([a-zA-Z][^\s/>]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>'
+    r'|</([a-zA-Z][^\s/>]*)[^>]*>',
+    re.DOTALL | re.IGNORECASE
+)
+PATRON_ENTIDAD = re.compile(r'&([A-Za-z][A-Za-z0-9]*)(;?)')
+PATRON_FIN_TEXTO_PLANO = re.compile(r'[^<&]*</([a-zA-Z]+)\s*>')
+# libxml2 lee como texto el contenido de estas etiquetas; html.parser lo parsea como marcado
+ETIQUETAS_TEXTO_CRUDO = {'textarea', 'title', 'iframe', 'xmp', 'noembed', 'noframes', 'plaintext'}
+ETIQUETAS_IMPLICITAS = {'html', 'head', 'body'}  # libxml2 las agrega si faltan
+ETIQUETAS_VACIAS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+                    'meta', 'param', 'source', 'track', 'wbr'}
+
+# Resultado de la sonda: un bit por formato del esquema (antiguo = 1, nuevo = 2)
+FORMATO_NINGUNO = 0
+FORMATO_ANTIGUO = DETALLE.bits['antiguo']
+FORMATO_NUEVO = DETALLE.bits['nuevo']
+FORMATO_AMBOS = FORMATO_ANTIGUO | FORMATO_NUEVO
+
+_TIENE_SIN_TEXTO = etree.XPath(' or '.join(f'boolean(.//{etiqueta})' for etiqueta in ETIQUETAS_SIN_TEXTO))
+
+
+def _textos(nodo):
+    """Textos de un subárbol en orden del documento, omitiendo script/style/template y comentarios."""
+    if isinstance(nodo.tag, str):
+        if nodo.tag in ETIQUETAS_SIN_TEXTO:
+            return
+        if nodo.text:
+            yield nodo.text
+    for hijo in nodo:
+        yield from _textos(hijo)
+        if hijo.tail:
+            yield hijo.tail
+
+
+def texto_elemento(elemento) -> str:
+    """Equivalente lxml de Tag.get_text(strip=True) de BeautifulSoup."""
+    textos = _textos(elemento) if _TIENE_SIN_TEXTO(elemento) else elemento.itertext()
+    return ''.join(t.replace(MARCA_CR, '\r').strip() for t in textos)
+
+
+def clasificar_formato(documento) -> int:
+    """Retorna FORMATO_NINGUNO, FORMATO_ANTIGUO, FORMATO_NUEVO o FORMATO_AMBOS."""
+    return int(DETALLE.sonda(documento))
+
+
+def _unir(elementos: List, solo_primero: bool) -> str:
+    if not elementos:
+        return DETALLE.defecto
+    if solo_primero:
+        return texto_elemento(elementos[0])
+    return ' '.join(texto_elemento(el) for el in elementos)
+
+
+def extraer_formato(documento, nombre: str) -> Dict[str, str]:
+    """Campos de un formato del esquema, reunidos en un solo recorrido del documento."""
+    formato = DETALLE.formatos[nombre]
+    encontrados = formato.elementos(documento)
+    if encontrados is None:
+        return {}
+    info = {campo: _unir(elementos, campo in formato.solo_primero) for campo, elementos in encontrados.items()}
+    return {k: v for k, v in info.items() if v != DETALLE.defecto}
+
+
+def extraer_nuevo(documento) -> Dict[str, str]:
+    """Formato nuevo: un solo recorrido del documento reúne los elementos de los cuatro campos."""
+    return extraer_formato(documento, 'nuevo')
+
+
+def extraer_antiguo(documento) -> Dict[str, str]:
+    """Formato antiguo: un solo recorrido de los descendientes del primer .col-sm-8."""
+    return extraer_formato(documento, 'antiguo')
+
+
+def _entidad_ambigua(texto: str) -> bool:
+    """Indica si un texto tiene entidades que libxml2 y html.parser decodifican distinto."""
+    return any(not punto_coma or nombre not in name2codepoint
+               for nombre, punto_coma in PATRON_ENTIDAD.findall(texto))
+
+
+def arbol_html_parser(texto: str) -> Optional[List[Tuple[str, int]]]:
+    """
+    (etiqueta, profundidad) de cada elemento en orden del documento, como los anida
+    html.parser; None si el texto tiene entidades o comentarios que libxml2 lee distinto.
+    """
+    if '--!>' in texto:
+        return None
+    elementos, abiertas, fin = [], [], 0
+    for marca in PATRON_MARCADO.finditer(texto):
+        if '&' in texto[fin:marca.start()] and _entidad_ambigua(texto[fin:marca.start()]):
+            return None
+        fin = marca.end()
+        crudo, apertura, atributos, cierre = marca.groups()
+        if crudo:
+            elementos.append((crudo.lower(), len(abiertas)))
+        elif apertura:
+            nombre = apertura.lower()
+            if nombre in ETIQUETAS_IMPLICITAS:
+                continue
+            if nombre in ETIQUETAS_TEXTO_CRUDO:
+                # Solo coinciden si el contenido es texto plano hasta su cierre
+                plano = PATRON_FIN_TEXTO_PLANO.match(texto, marca.end())
+                if plano is None or plano.group(1).lower() != nombre:
+                    return None
+            elementos.append((nombre, len(abiertas)))
+            if nombre not in ETIQUETAS_VACIAS and not atributos.rstrip().endswith('/'):
+                abiertas.append(nombre)
+        elif cierre and cierre.lower() in abiertas:
+            # Cierra la apertura más reciente del mismo nombre y las que quedaron dentro
+            del abiertas[len(abiertas) - 1 - abiertas[::-1].index(cierre.lower()):]
+    if '&' in texto[fin:] and _entidad_ambigua(texto[fin:]):
+        return None
+    return elementos
+
+
+def arbol_lxml(documento) -> List[Tuple[str, int]]:
+    """(etiqueta, profundidad) de cada elemento del documento de lxml, sin html/head/body."""
+    elementos = []
+
+    def recorrer(nodo, profundidad):
+        for hijo in nodo:
+            if not isinstance(hijo.tag, str):
+                continue
+            if hijo.tag in ETIQUETAS_IMPLICITAS:
+                recorrer(hijo, profundidad)
+                continue
+            elementos.append((hijo.tag, profundidad))
+            recorrer(hijo, profundidad + 1)
+
+    raiz = documento.getroottree().getroot()
+    if raiz.tag in ETIQUETAS_IMPLICITAS:
+        recorrer(raiz, 0)
+    else:
+        elementos.append((raiz.tag, 0))
+        recorrer(raiz, 1)
+    return elementos
+
+
+def parsear_documento(texto: str) -> Tuple[object, bool]:
+    """
+    Parsea el HTML de una ficha con lxml (el texto ya decodificado, como response.text).
+
+    Retorna el documento y si libxml2 lo interpretó distinto que html.parser: reparó
+    etiquetas de cierre sin pareja o el árbol no coincide con el de arbol_html_parser().
+    """
+    texto = texto.replace('\r', MARCA_CR)
+    if '<![CDATA[' in texto:
+        texto = PATRON_CDATA.sub(
+            lambda m: f'<{ETIQUETA_CDATA}>{html.escape(m.group(1), quote=False)}</{ETIQUETA_CDATA}>', texto)
+    parser = lxml_html.HTMLParser(encoding='utf-8')
+    documento = lxml_html.fromstring(texto.encode('utf-8'), parser=parser)
+    reparado = (any(error.type_name == 'ERR_TAG_NAME_MISMATCH' for error in parser.error_log)
+                or arbol_html_parser(texto) != arbol_lxml(documento))
+    return documento, reparado
+
+
+def extraer_detalle(texto: str, respaldo: Optional[Callable[[str], Dict[str, str]]] = None
+                    ) -> Dict[str, str]:
+    """
+    Extrae los campos de una ficha; mismo resultado que el extractor con BeautifulSoup.
+
+    `respaldo` recibe las fichas en las que el árbol de lxml difiere del de html.parser
+    (etiquetas mal cerradas o cerradas implícitamente, entidades ambiguas, etc.).
+    """
+    if not texto or not texto.strip():
+        return {}
+    try:
+        documento, reparado = parsear_documento(texto)
+    except etree.ParserError:
+        return {}  # documento sin elementos (por ejemplo, solo comentarios)
+    if reparado and respaldo is not None:
+        return respaldo(texto)
+    formato = clasificar_formato(documento)
+    if formato == FORMATO_NUEVO:
+        return extraer_nuevo(documento)
+    if formato == FORMATO_ANTIGUO:
+        return extraer_antiguo(documento)
+    if formato == FORMATO_AMBOS:
+        # Caso poco común: se conserva la regla de usar el formato con más campos
+        info_new = extraer_nuevo(documento)
+        info_old = extraer_antiguo(documento)
+        return info_new if len(info_new) >= len(info_old) else info_old
+    return {}
+
+
+# Corpus y benchmark
+
+def corpus_directorio(directorio: str) -> List[Tuple[str, str]]:
+    """Lee las fichas .html de un directorio."""
+    paginas = []
+    for archivo in sorted(glob.glob(os.path.join(directorio, '*.html'))):
+        with open(archivo, encoding='utf-8', errors='replace') as f:
+            paginas.append((os.path.basename(archivo), f.read()))
+    return paginas
+
+
+def corpus_cache(ruta: str) -> List[Tuple[str, str]]:
+    """Lee las fichas grabadas en el cache HTTP del scraper de detalles."""
+    from corfo_cache_b01 import CacheHTTP
+
+    cache = CacheHTTP(ruta)
+    try:
+        return [(url, cache.cuerpo(url).decode('utf-8', errors='replace')) for url in cache.urls()]
+    finally:
+        cache.cerrar()
+
+
+def corpus_sintetico(paginas: int = 200) -> List[Tuple[str, str]]:
+    """Genera fichas con los formatos nuevo, antiguo, ambos y ninguno."""
+    relleno = ''.join(
+        f'<div class="row"><div class="col-md-4"><a href="/menu/{i}">Menú {i}</a>'
+        f'<img src="/img/{i}.png"></div></div>' for i in range(60)
+    )
+    plantillas = [
+        '<div class="marcoque_fase2"><h3>¿Qué es?</h3><p>Programa {n} de apoyo &amp; cofinanciamiento.</p></div>'
+        '<div class="postula_fase2-cuerpodos_fase2_bloque_q_entrega"><ul><li>Hasta $ {n}0.000.000</li>'
+        '<li>Asesoría <b>técnica</b></li></ul></div>'
+        '<div class="postula_fase2-der_fase2"><p>Empresas con ventas<br>sobre UF {n}</p><!-- nota --></div>'
+        '<div class="diviPuntoTexto_fase2">Resultado {n}</div><div class="diviPuntoTexto_fase2">Otro</div>',
+        '<div class="col-sm-8"><p>¿Qué es? Convocatoria {n}</p><p>Segundo <i>párrafo</i></p>'
+        '<div class="beneficios"><p>Beneficio {n}</p></div><div class="requisitos">Requisito {n}'
+        '<script>var x = {n};</script></div><div class="resultados_esperados">Resultado {n}</div></div>'
+        '<div class="col-sm-8"><p>Barra lateral</p></div>',
+        '<div class="col-sm-8"><p>Antiguo {n}</p><div class="beneficios">B</div></div>'
+        '<div class="marcoque_fase2">Nuevo {n}</div>',
+        '<div class="contenido"><p>Ficha {n} sin formato conocido</p></div>'
+    ]
+    return [
+        (f'sintetica_{n}',
+         f'<!DOCTYPE html><html><head><title>Ficha {n}</title><style>.x{{}}</style></head>'
+         f'<body>{relleno}{plantillas[n % len(plantillas)].format(n=n)}{relleno}</body></html>')
+        for n in range(paginas)
+    ]
+
+
+def benchmark(paginas: List[Tuple[str, str]], repeticiones: int = 3) -> Dict:
+    """Compara el extractor lxml con el de BeautifulSoup: diferencias y ms por página."""
+    from corfo_detalle_scraper_b01 import extraer_info_bs4
+
+    def extraer_lxml(texto):
+        return extraer_detalle(texto, respaldo=extraer_info_bs4)
+
+    diferencias = []
+    respaldos = 0
+    for nombre, texto in paginas:
+        esperado = extraer_info_bs4(texto)
+        obtenido = extraer_lxml(texto)
+        try:
+            respaldos += parsear_documento(texto)[1] if texto.strip() else 0
+        except etree.ParserError:
+            pass
+        if esperado != obtenido:
+            diferencias.append({'pagina': nombre, 'bs4': esperado, 'lxml': obtenido})
+
+    tiempos = {}
+    for nombre_extractor, extractor in (('bs4', extraer_info_bs4), ('lxml', extraer_lxml)):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            for _, texto in paginas:
+                extractor(texto)
+        tiempos[nombre_extractor] = (time.perf_counter() - inicio) / (repeticiones * max(len(paginas), 1))
+
+    return {
+        'paginas': len(paginas),
+        'diferencias': diferencias,
+        'respaldos': respaldos,
+        'ms_bs4': round(tiempos['bs4'] * 1000, 3),
+        'ms_lxml': round(tiempos['lxml'] * 1000, 3),
+        'aceleracion': round(tiempos['bs4'] / tiempos['lxml'], 1) if tiempos['lxml'] else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara el extractor lxml con el de BeautifulSoup')
+    parser.add_argument('--corpus', metavar='DIR', help='Directorio con fichas .html')
+    parser.add_argument('--cache', metavar='ARCHIVO', help='Cache HTTP del scraper de detalles')
+    parser.add_argument('--sinteticas', type=int, default=200, help='Fichas sintéticas si no hay corpus')
+    parser.add_argument('--repeticiones', type=int, default=3, help='Repeticiones por ficha')
+    args = parser.parse_args()
+
+    if args.corpus:
+        paginas = corpus_directorio(args.corpus)
+    elif args.cache:
+        paginas = corpus_cache(args.cache)
+    else:
+        paginas = corpus_sintetico(args.sinteticas)
+
+    resultado = benchmark(paginas, args.repeticiones)
+    print(f"Fichas: {resultado['paginas']}, diferencias: {len(resultado['diferencias'])}, "
+          f"derivadas a BeautifulSoup: {resultado['respaldos']}")
+    for diferencia in resultado['diferencias'][:10]:
+        print(f"  {diferencia['pagina']}:\n    bs4:  {diferencia['bs4']}\n    lxml: {diferencia['lxml']}")
+    print(f"BeautifulSoup: {resultado['ms_bs4']} ms por ficha")
+    print(f"lxml:          {resultado['ms_lxml']} ms por ficha ({resultado['aceleracion']}x)")
+
+
+if __name__ == "__main__":
+    main()
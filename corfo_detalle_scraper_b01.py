@@ -4,35 +4,43 @@
 CORFO Web Scraper - Extractor de Detalles de Convocatorias
 Versión B01 - Enriquecimiento de datos de convocatorias
 
-Este script toma el archivo corfo_convocatorias_enriched.csv y agrega información
-detallada de cada convocatoria, manteniendo todos los datos originales.
+Este script toma las convocatorias de la base de datos corfo_convocatorias.sqlite y
+agrega información detallada de cada convocatoria en la tabla de detalles.
+
+Las fichas que fallan se reintentan con backoff exponencial y jitter; las que agotan
+sus intentos quedan en la tabla de fallidos y se procesan solas con --reintentar-fallidos.
 """
 
-import pandas as pd
 import requests
 from bs4 import BeautifulSoup
-import time
-import re
+import argparse
+import json
+import os
 import sys
 import logging
 from typing import Dict, Optional
 from datetime import datetime
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('corfo_scraper_detalles.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from corfo_http_b01 import MotorDescarga, WORKERS, TASA_POR_HOST, CONCURRENCIA_TOPE, TASA_TOPE
+from corfo_cache_b01 import CacheHTTP
+from corfo_db_b01 import BaseDatos, ARCHIVO_DB
+from corfo_filtros_bits_b01 import COLUMNAS_FILTRO
+from corfo_detalle_lxml_b01 import extraer_detalle
+from corfo_esquema_b01 import DETALLE
+from corfo_metricas_b01 import METRICAS
+from corfo_reintentos_b01 import PoliticaReintentos, INTENTOS, clasificar
+
 logger = logging.getLogger(__name__)
 
 # Configuración
-ARCHIVO_ENTRADA = 'corfo_convocatorias_enriched.csv'
-ARCHIVO_SALIDA = 'corfo_convocatorias_full.csv'
-TIEMPO_ESPERA = 2  # segundos entre requests
+ARCHIVO_LOG = 'corfo_scraper_detalles.log'
+ARCHIVO_SALIDA = 'corfo_convocatorias_full.csv'  # exportación bajo demanda
+ARCHIVO_JOURNAL = 'corfo_convocatorias_full.jsonl'  # progreso de la ejecución en curso
+COLUMNAS_DETALLE = ['DETALLE', 'BENEFICIO', 'QUIENES', 'RESULTADOS']
+WORKERS_DESCARGA = WORKERS  # descargas simultáneas
+TASA_MAXIMA = TASA_POR_HOST  # requests por segundo hacia corfo.cl
+ARCHIVO_CACHE = 'corfo_cache_detalles.sqlite'
+TAMANO_MAXIMO_CACHE = 200  # MB
 
 def extract_text(soup: BeautifulSoup, selector: str, default: str = "No disponible", get_all: bool = False) -> str:
     """Extrae texto de manera segura desde elementos HTML."""
@@ -49,15 +57,14 @@ def extract_text(soup: BeautifulSoup, selector: str, default: str = "No disponib
 def extract_old_page_info(soup: BeautifulSoup) -> Dict[str, str]:
     """Extrae información de páginas con formato antiguo."""
     try:
-        detalle = soup.select_one('.col-sm-8')
+        formato = DETALLE.formatos['antiguo']
+        detalle = soup.select_one(f'.{formato.contenedor}')
         if not detalle:
             return {}
 
         info = {
-            'DETALLE': extract_text(detalle, 'p', get_all=True),
-            'BENEFICIO': extract_text(detalle, '.beneficios', get_all=True),
-            'QUIENES': extract_text(detalle, '.requisitos', get_all=True),
-            'RESULTADOS': extract_text(detalle, '.resultados_esperados', get_all=True)
+            campo: extract_text(detalle, selector, get_all=campo not in formato.solo_primero)
+            for campo, selector in formato.selectores_css.items()
         }
         
         return {k: v for k, v in info.items() if v != "No disponible"}
@@ -68,11 +75,10 @@ def extract_old_page_info(soup: BeautifulSoup) -> Dict[str, str]:
 def extract_new_page_info(soup: BeautifulSoup) -> Dict[str, str]:
     """Extrae información de páginas con formato nuevo."""
     try:
+        formato = DETALLE.formatos['nuevo']
         info = {
-            'DETALLE': extract_text(soup, '.marcoque_fase2', get_all=True),
-            'BENEFICIO': extract_text(soup, '.postula_fase2-cuerpodos_fase2_bloque_q_entrega', get_all=True),
-            'QUIENES': extract_text(soup, '.postula_fase2-der_fase2', get_all=True),
-            'RESULTADOS': extract_text(soup, '.diviPuntoTexto_fase2')
+            campo: extract_text(soup, selector, get_all=campo not in formato.solo_primero)
+            for campo, selector in formato.selectores_css.items()
         }
         
         return {k: v for k, v in info.items() if v != "No disponible"}
@@ -80,96 +86,212 @@ def extract_new_page_info(soup: BeautifulSoup) -> Dict[str, str]:
         logger.error(f"Error al procesar página nueva: {str(e)}")
         return {}
 
-def guardar_progreso(df_original: pd.DataFrame, datos_nuevos: Dict[str, Dict], archivo: str):
-    """Guarda el progreso combinando datos originales con nuevos."""
+def extraer_info_bs4(texto: str) -> Dict[str, str]:
+    """Parsea una ficha con BeautifulSoup y retorna el formato con más campos."""
+    soup = BeautifulSoup(texto, 'html.parser')
+
+    # Intentar ambos formatos
+    info_new = extract_new_page_info(soup)
+    info_old = extract_old_page_info(soup)
+
+    # Usar la información que tenga más campos
+    return info_new if len(info_new) >= len(info_old) else info_old
+
+def procesar_respuesta_bs4(url: str, response: requests.Response) -> Dict[str, str]:
+    """Parsea una ficha descargada con el extractor de referencia (BeautifulSoup)."""
+    with METRICAS.cronometrar('corfo_parseo_segundos', etapa='detalle', parser='bs4'):
+        return extraer_info_bs4(response.text)
+
+def procesar_respuesta(url: str, response: requests.Response) -> Dict[str, str]:
+    """Parsea una ficha descargada con el extractor lxml de una sola pasada."""
+    with METRICAS.cronometrar('corfo_parseo_segundos', etapa='detalle', parser='lxml'):
+        return extraer_detalle(response.text, respaldo=extraer_info_bs4)
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Lee los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description='Extractor de detalles de convocatorias CORFO')
+    parser.add_argument('--workers', type=int, default=WORKERS_DESCARGA,
+                        help='Número de descargas simultáneas')
+    parser.add_argument('--tasa', type=float, default=TASA_MAXIMA,
+                        help='Máximo de requests por segundo hacia corfo.cl')
+    parser.add_argument('--adaptativo', action='store_true',
+                        help='Ajusta concurrencia y tasa según la respuesta del sitio (AIMD); '
+                             '--workers y --tasa pasan a ser los valores iniciales')
+    parser.add_argument('--max-workers', type=int, default=CONCURRENCIA_TOPE,
+                        help='(modo adaptativo) máximo de descargas simultáneas')
+    parser.add_argument('--tasa-maxima', type=float, default=TASA_TOPE,
+                        help='(modo adaptativo) máximo de requests por segundo')
+    parser.add_argument('--intentos', type=int, default=INTENTOS,
+                        help='Intentos por ficha ante fallos de red o del servidor antes de darla por fallida')
+    parser.add_argument('--reintentar-fallidos', action='store_true',
+                        help='Procesa solo las fichas de la tabla de fallidos')
+    parser.add_argument('--sin-cache', action='store_true',
+                        help='Descarga y parsea todas las fichas sin usar el cache HTTP')
+    parser.add_argument('--cache-mb', type=int, default=TAMANO_MAXIMO_CACHE,
+                        help='Tamaño máximo del cache HTTP en MB')
+    parser.add_argument('--parser', choices=['lxml', 'bs4'], default='lxml',
+                        help='Extractor de fichas: lxml (una pasada) o bs4 (referencia)')
+    parser.add_argument('--base-url', metavar='URL',
+                        help='Descarga las fichas desde otro sitio (por ejemplo, corfo_mock_b01.py) '
+                             'manteniendo las URLs de corfo.cl en la base de datos')
+    parser.add_argument('--solo-exportar', action='store_true',
+                        help='Guarda el journal en la base de datos y exporta el CSV sin descargar fichas')
+    parser.add_argument('--exportar-csv', action='store_true',
+                        help='Exporta corfo_convocatorias_full.csv desde la base de datos al finalizar')
+    parser.add_argument('--metricas', metavar='ARCHIVO',
+                        help='Guarda el reporte de métricas en ARCHIVO (JSON) y en formato Prometheus (.prom)')
+    return parser.parse_args(argv)
+
+def limpiar_datos(datos: Dict[str, str]) -> Dict[str, str]:
+    """Aplica la limpieza final a los campos extraídos de una ficha."""
+    # Posprocesos del esquema, por ejemplo limpiar "¿Qué es?" del inicio de DETALLE
+    return DETALLE.posprocesar(datos)
+
+def cargar_journal(archivo: str) -> Dict[str, Dict]:
+    """Lee el journal de progreso; el último registro de cada URL prevalece."""
+    datos = {}
+    if not os.path.exists(archivo):
+        return datos
+    with open(archivo, encoding='utf-8') as f:
+        for linea in f:
+            try:
+                registro = json.loads(linea)
+            except json.JSONDecodeError:
+                # Línea truncada por una interrupción durante la escritura
+                logger.warning(f"Se ignoró un registro incompleto en {archivo}")
+                continue
+            datos[registro['URL']] = registro['DATOS']
+    return datos
+
+def abrir_journal(archivo: str):
+    """Abre el journal en modo append, cerrando una posible línea truncada."""
+    journal = open(archivo, 'a+', encoding='utf-8')
+    if journal.tell() > 0:
+        journal.seek(journal.tell() - 1)
+        if journal.read(1) != '\n':
+            journal.write('\n')
+    return journal
+
+def registrar_en_journal(journal, url: str, datos: Dict[str, str]):
+    """Agrega el resultado de una URL al journal abierto en modo append."""
+    journal.write(json.dumps({'URL': url, 'DATOS': datos}, ensure_ascii=False) + '\n')
+    journal.flush()
+
+def guardar_progreso(db: BaseDatos, datos_nuevos: Dict[str, Dict]) -> bool:
+    """Guarda los datos extraídos en la tabla de detalles con un único upsert por lote."""
     try:
-        # Crear un DataFrame con los nuevos datos
-        df_nuevos = pd.DataFrame.from_dict(datos_nuevos, orient='index')
-        
-        # Combinar con el DataFrame original
-        df_combinado = df_original.copy()
-        for columna in ['DETALLE', 'BENEFICIO', 'QUIENES', 'RESULTADOS']:
-            if columna not in df_combinado.columns:
-                df_combinado[columna] = 'No disponible'
-        
-        # Actualizar con los nuevos datos
-        for url, datos in datos_nuevos.items():
-            mask = df_combinado['URL'] == url
-            for campo, valor in datos.items():
-                # Limpiar "¿Qué es?" del inicio de DETALLE
-                if campo == 'DETALLE' and isinstance(valor, str):
-                    valor = re.sub(r'^¿Qué es\?[\s:]*', '', valor.strip())
-                df_combinado.loc[mask, campo] = valor
-        
-        # Guardar
-        df_combinado.to_csv(archivo, index=False, encoding='utf-8')
-        logger.info(f"Progreso guardado en {archivo}")
+        db.upsert_detalles({url: limpiar_datos(datos) for url, datos in datos_nuevos.items()})
+        logger.info(f"Progreso guardado en {db.ruta}: {len(datos_nuevos)} fichas")
+        return True
         
     except Exception as e:
         logger.error(f"Error al guardar progreso: {str(e)}")
+        return False
 
 def main():
     """Función principal de ejecución."""
+    args = parse_args()
+    # El log a archivo se configura aquí y no al importar, para que el pipeline,
+    # el benchmark y las pruebas no creen el archivo en el directorio actual
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(ARCHIVO_LOG),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
     try:
-        # Leer archivo de entrada
-        logger.info(f"Leyendo archivo {ARCHIVO_ENTRADA}")
-        try:
-            df = pd.read_csv(ARCHIVO_ENTRADA)
-            logger.info(f"Archivo cargado exitosamente. Total de registros: {len(df)}")
-            logger.info(f"Columnas disponibles: {df.columns.tolist()}")
-        except FileNotFoundError:
-            logger.error(f"No se encontró el archivo {ARCHIVO_ENTRADA}")
-            sys.exit(1)
-        except Exception as e:
-            logger.error(f"Error al leer el archivo: {str(e)}")
+        # Leer convocatorias desde la base de datos
+        logger.info(f"Leyendo convocatorias desde {ARCHIVO_DB}")
+        db = BaseDatos(ARCHIVO_DB)
+        df = db.leer_convocatorias()
+        if df.empty:
+            logger.error(f"No hay convocatorias en {ARCHIVO_DB}; ejecute primero el scraper de lista")
             sys.exit(1)
+        logger.info(f"Convocatorias cargadas exitosamente. Total de registros: {len(df)}")
 
-        # Verificar columna URL
-        if 'URL' not in df.columns:
-            logger.error("El archivo no contiene la columna 'URL' requerida")
-            sys.exit(1)
+        # Retomar desde el journal de una ejecución interrumpida
+        datos_nuevos = cargar_journal(ARCHIVO_JOURNAL)
+        if args.solo_exportar:
+            guardar_progreso(db, {url: d for url, d in datos_nuevos.items() if d})
+            db.exportar_csv('completo', ARCHIVO_SALIDA, COLUMNAS_FILTRO)
+            return
+        if args.reintentar_fallidos:
+            pendientes = [url for url in db.leer_fallidos('detalle')['CLAVE'].tolist() if url not in datos_nuevos]
+            logger.info(f"Reintentando {len(pendientes)} fichas de la tabla de fallidos")
+        else:
+            pendientes = [url for url in df['URL'].tolist()
+                          if url not in datos_nuevos and str(url).startswith('http')]
+        if datos_nuevos:
+            logger.info(f"Retomando desde {ARCHIVO_JOURNAL}: {len(datos_nuevos)} URLs ya procesadas")
+        total = len(pendientes)
+        cache = None if args.sin_cache else CacheHTTP(ARCHIVO_CACHE, args.cache_mb * 1024 * 1024)
+        motor = MotorDescarga(workers=args.workers, tasa_por_host=args.tasa, cache=cache,
+                              base_url=args.base_url, adaptativo=args.adaptativo,
+                              concurrencia_maxima=args.max_workers, tasa_maxima=args.tasa_maxima,
+                              politica=PoliticaReintentos(intentos=args.intentos))
+        if args.adaptativo:
+            logger.info(f"Descargando en modo adaptativo desde {args.workers} workers y {args.tasa} requests/s "
+                        f"(máximo {args.max_workers} workers y {args.tasa_maxima} requests/s)")
+        else:
+            logger.info(f"Descargando con {args.workers} workers a máximo {args.tasa} requests/s")
+
+        # Procesar cada URL a medida que se completan las descargas
+        recuperadas = []
+        try:
+            with abrir_journal(ARCHIVO_JOURNAL) as journal:
+                procesar = procesar_respuesta if args.parser == 'lxml' else procesar_respuesta_bs4
+                for i, (url, info, error) in enumerate(motor.procesar(pendientes, procesar), 1):
+                    if error is not None:
+                        # Reintentos agotados o fallo no reintentable: queda en la tabla de fallidos
+                        categoria = clasificar(error)
+                        logger.error(f"Error procesando {url} ({categoria}): {str(error)}")
+                        db.registrar_fallido('detalle', url, categoria, str(error), motor.intentos.get(url, 1))
+                        METRICAS.incrementar('corfo_fallidos_total', etapa='detalle', categoria=categoria)
+                        continue
 
-        # Diccionario para almacenar los nuevos datos
-        datos_nuevos = {}
-        total = len(df)
-        
-        # Procesar cada URL
-        for i, (index, row) in enumerate(df.iterrows(), 1):
-            url = row['URL']
-            logger.info(f"Procesando {i}/{total}: {url}")
-            
-            try:
-                response = requests.get(url, timeout=30)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Intentar ambos formatos
-                info_new = extract_new_page_info(soup)
-                info_old = extract_old_page_info(soup)
-                
-                # Usar la información que tenga más campos
-                info = info_new if len(info_new) >= len(info_old) else info_old
-                
-                if info:
                     datos_nuevos[url] = info
-                    logger.info(f"Información extraída exitosamente de {url}")
-                else:
-                    logger.warning(f"No se pudo extraer información de {url}")
-                
-                # Guardar progreso cada 10 registros o al final
-                if i % 10 == 0 or i == total:
-                    guardar_progreso(df, datos_nuevos, ARCHIVO_SALIDA)
-                    logger.info(f"Progreso: {i}/{total} URLs procesadas")
-                
-                time.sleep(TIEMPO_ESPERA)
-                
-            except Exception as e:
-                logger.error(f"Error procesando {url}: {str(e)}")
-                continue
+                    registrar_en_journal(journal, url, info)
+                    recuperadas.append(url)
+                    METRICAS.incrementar('corfo_fichas_total', resultado='extraida' if info else 'vacia')
+                    if info:
+                        logger.info(f"Procesado {i}/{total}: información extraída exitosamente de {url}")
+                    else:
+                        logger.warning(f"Procesado {i}/{total}: no se pudo extraer información de {url}")
+
+                    if i % 10 == 0:
+                        stats = motor.estadisticas()
+                        adaptativo = (f", concurrencia {stats['concurrencia']}, {stats['tasa']} requests/s"
+                                      if 'concurrencia' in stats else '')
+                        logger.info(f"Progreso: {i}/{total} URLs procesadas "
+                                    f"({stats['paginas_por_segundo']} páginas/s{adaptativo})")
+        finally:
+            motor.cerrar()
+
+        stats = motor.estadisticas()
+        logger.info(f"Descarga finalizada: {stats['paginas']} páginas en {stats['segundos']} s "
+                    f"({stats['paginas_por_segundo']} páginas/s, {stats['sin_cambios']} sin cambios, "
+                    f"{stats['reintentos']} reintentos, {stats['errores']} errores)")
+
+        # Guardar el journal en la base de datos y cerrar la ejecución; las fichas
+        # fallidas ya quedaron en la tabla de fallidos, así que el journal se descarta
+        datos_nuevos = {url: d for url, d in datos_nuevos.items() if d}
+        if guardar_progreso(db, datos_nuevos):
+            db.quitar_fallidos('detalle', recuperadas)
+            os.remove(ARCHIVO_JOURNAL)
+        if stats['errores']:
+            logger.warning(f"{stats['errores']} fichas quedaron en la tabla de fallidos; "
+                           f"use --reintentar-fallidos para procesarlas")
+        if args.exportar_csv:
+            db.exportar_csv('completo', ARCHIVO_SALIDA, COLUMNAS_FILTRO)
         
         logger.info("Proceso completado")
-        logger.info(f"Total de URLs procesadas: {total}")
+        logger.info(f"Total de URLs procesadas: {len(df)}")
         logger.info(f"Total de URLs con información extraída: {len(datos_nuevos)}")
+        if args.metricas:
+            METRICAS.guardar(args.metricas)
+            logger.info(f"Métricas guardadas en {args.metricas}")
         
     except Exception as e:
         logger.critical(f"Error crítico en la ejecución: {str(e)}")
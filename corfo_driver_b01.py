@@ -0,0 +1,412 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Chrome Liviano
+Versión B01 - Bloqueo de recursos por DevTools y perfil reutilizable
+
+Este módulo reduce lo que descarga Chrome en cada página del listado. Los scrapers
+con Selenium solo leen el HTML de #listSearch, por lo que imágenes, media, fuentes y
+scripts de terceros (analítica, redes sociales) se bloquean con el comando de
+DevTools `Network.setBlockedURLs` según perfiles configurables. Además se usa un
+directorio de perfil de Chrome persistente y liviano (sin extensiones, sincronización
+ni tareas en segundo plano) que conserva el cache de disco entre ejecuciones.
+
+MedidorPaginas usa la API de performance del navegador para registrar los bytes
+transferidos y el tiempo de carga de cada página, de modo que el ahorro se puede
+comparar ejecutando el mismo recorrido con y sin bloqueo (`--bloqueo ninguno`).
+
+GestorDrivers mantiene navegadores de reserva ya iniciados, verifica que el navegador
+activo responda y lo recicla de forma preventiva después de N páginas o cuando su
+memoria (RSS, si psutil está instalado) supera un límite.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+try:
+    import psutil
+except ImportError:  # sin psutil solo se recicla por cantidad de páginas
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Patrones por perfil de bloqueo (sintaxis de comodines de Network.setBlockedURLs)
+BLOQUEOS = {
+    'imagenes': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp'],
+    'media': ['*.mp4', '*.webm', '*.ogg', '*.mp3', '*.wav', '*.m4a', '*.avi'],
+    'fuentes': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot', '*fonts.googleapis.com*',
+                '*fonts.gstatic.com*', '*use.fontawesome.com*'],
+    'terceros': ['*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+                 '*googlesyndication.com*', '*facebook.net*', '*facebook.com/tr*', '*connect.facebook.net*',
+                 '*hotjar.com*', '*clarity.ms*', '*twitter.com*', '*platform.twitter.com*',
+                 '*linkedin.com*', '*youtube.com*', '*ytimg.com*', '*addthis.com*', '*sharethis.com*'],
+    # Las hojas de estilo no se bloquean por defecto: las esperas usan visibilidad y clics
+    'estilos': ['*.css']
+}
+PERFIL_BLOQUEO = ['imagenes', 'media', 'fuentes', 'terceros']
+DIRECTORIO_PERFIL = 'chrome_perfil_corfo'  # un subdirectorio por navegador simultáneo
+
+# Reciclaje de navegadores
+RESERVAS = 1  # navegadores iniciados de antemano, por gestor (cada worker de filtros tiene el suyo)
+MAX_PAGINAS = 100  # páginas por navegador antes de reciclarlo
+MAX_RSS_MB = 1500  # memoria de Chrome y chromedriver antes de reciclar
+ESPERA_CIERRE = 30  # segundos que cerrar() espera a los navegadores que se están cerrando o iniciando
+
+ARGUMENTOS_LIVIANOS = [
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-sync',
+    '--disable-default-apps',
+    '--disable-translate',
+    '--disable-component-update',
+    '--no-first-run',
+    '--mute-audio'
+]
+PREFERENCIAS_LIVIANAS = {
+    'profile.default_content_setting_values.notifications': 2,
+    'profile.default_content_setting_values.geolocation': 2,
+    'credentials_enable_service': False,
+    'profile.password_manager_enabled': False
+}
+# Solo con el perfil 'imagenes': Chrome tampoco decodifica imágenes que no calzan con los patrones
+ARGUMENTOS_SIN_IMAGENES = ['--blink-settings=imagesEnabled=false']
+PREFERENCIAS_SIN_IMAGENES = {'profile.managed_default_content_settings.images': 2}
+
+JS_MEDIR_PAGINA = """
+var nav = performance.getEntriesByType('navigation')[0];
+var recursos = performance.getEntriesByType('resource');
+var medido = window.__corfoNavegacionMedida === true;
+var bytes = 0, inicio = null, fin = 0;
+recursos.forEach(function(r) {
+    bytes += r.transferSize || 0;
+    inicio = inicio === null ? r.startTime : Math.min(inicio, r.startTime);
+    fin = Math.max(fin, r.responseEnd);
+});
+var ms = 0;
+if (nav && !medido) {
+    bytes += nav.transferSize || 0;
+    ms = (nav.loadEventEnd || nav.domContentLoadedEventEnd || nav.responseEnd) - nav.startTime;
+    window.__corfoNavegacionMedida = true;
+} else if (recursos.length) {
+    ms = fin - inicio;
+}
+performance.clearResourceTimings();
+return {bytes: bytes, recursos: recursos.length, ms: ms, navegacion: !!nav && !medido};
+"""
+
+
+def patrones_bloqueo(perfiles: Optional[Iterable[str]]) -> List[str]:
+    """Retorna los patrones de URL de los perfiles de bloqueo indicados."""
+    patrones = []
+    for perfil in perfiles or ():
+        if perfil not in BLOQUEOS:
+            raise ValueError(f"Perfil de bloqueo desconocido: {perfil}")
+        patrones.extend(BLOQUEOS[perfil])
+    return patrones
+
+
+def leer_perfiles(texto: str) -> List[str]:
+    """Convierte el argumento --bloqueo ('imagenes,fuentes', 'ninguno') en una lista de perfiles."""
+    if not texto or texto == 'ninguno':
+        return []
+    perfiles = [perfil.strip() for perfil in texto.split(',') if perfil.strip()]
+    patrones_bloqueo(perfiles)  # valida los nombres
+    return perfiles
+
+
+def directorio_perfil(nombre: str, base: str = DIRECTORIO_PERFIL) -> str:
+    """Retorna (y crea) el directorio de perfil de un navegador; Chrome no permite compartirlo."""
+    ruta = os.path.abspath(os.path.join(base, nombre))
+    os.makedirs(ruta, exist_ok=True)
+    return ruta
+
+
+def configurar_opciones(options, perfil_dir: Optional[str] = None,
+                        perfiles: Optional[Iterable[str]] = PERFIL_BLOQUEO):
+    """
+    Agrega a ChromeOptions los argumentos y preferencias del perfil liviano. Las imágenes
+    se desactivan solo si los perfiles de bloqueo incluyen 'imagenes'.
+    """
+    sin_imagenes = 'imagenes' in (perfiles or ())
+    for argumento in ARGUMENTOS_LIVIANOS + (ARGUMENTOS_SIN_IMAGENES if sin_imagenes else []):
+        options.add_argument(argumento)
+    preferencias = dict(PREFERENCIAS_LIVIANAS, **(PREFERENCIAS_SIN_IMAGENES if sin_imagenes else {}))
+    options.add_experimental_option('prefs', preferencias)
+    if perfil_dir:
+        options.add_argument(f'--user-data-dir={perfil_dir}')
+    return options
+
+
+def aplicar_bloqueo(driver, perfiles: Optional[Iterable[str]] = PERFIL_BLOQUEO) -> int:
+    """Bloquea por DevTools las URLs de los perfiles indicados; retorna la cantidad de patrones."""
+    patrones = patrones_bloqueo(perfiles)
+    if not patrones:
+        return 0
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patrones})
+    except (WebDriverException, AttributeError) as e:
+        # Navegador sin soporte de DevTools: se continúa sin bloqueo
+        logger.warning(f"No se pudo aplicar el bloqueo de recursos: {e}")
+        return 0
+    logger.info(f"Bloqueo de recursos activo: {', '.join(perfiles)} ({len(patrones)} patrones)")
+    return len(patrones)
+
+
+class MedidorPaginas:
+    """Acumula los bytes transferidos y el tiempo de carga de cada página visitada."""
+
+    def __init__(self):
+        self.paginas: List[Dict[str, float]] = []
+        self.lock = threading.Lock()
+
+    def medir(self, driver, nombre: str) -> Optional[Dict[str, float]]:
+        """Lee la API de performance desde la última medición y registra la página."""
+        try:
+            datos = driver.execute_script(JS_MEDIR_PAGINA)
+        except WebDriverException as e:
+            logger.debug(f"No se pudo medir la página {nombre}: {e}")
+            return None
+        registro = {
+            'nombre': nombre,
+            'kb': round(datos['bytes'] / 1024, 1),
+            'recursos': datos['recursos'],
+            'ms': round(datos['ms'], 1)
+        }
+        with self.lock:
+            self.paginas.append(registro)
+        logger.info(f"Transferencia {nombre}: {registro['kb']} KB en {registro['recursos']} recursos, "
+                    f"{registro['ms']} ms")
+        return registro
+
+    def resumen(self) -> Dict[str, float]:
+        """Retorna páginas medidas, KB totales, KB promedio y milisegundos promedio por página."""
+        with self.lock:
+            paginas = list(self.paginas)
+        if not paginas:
+            return {'paginas': 0, 'kb_total': 0.0, 'kb_promedio': 0.0, 'ms_promedio': 0.0}
+        kb_total = sum(p['kb'] for p in paginas)
+        return {
+            'paginas': len(paginas),
+            'kb_total': round(kb_total, 1),
+            'kb_promedio': round(kb_total / len(paginas), 1),
+            'ms_promedio': round(sum(p['ms'] for p in paginas) / len(paginas), 1)
+        }
+
+    def log_resumen(self):
+        """Escribe en el log el resumen de transferencia."""
+        datos = self.resumen()
+        if datos['paginas']:
+            logger.info(f"Transferencia total: {datos['kb_total']} KB en {datos['paginas']} páginas "
+                        f"(promedio {datos['kb_promedio']} KB, {datos['ms_promedio']} ms por página)")
+
+
+def rss_mb(driver) -> Optional[float]:
+    """Memoria residente de chromedriver y sus procesos de Chrome en MB; None sin psutil."""
+    if psutil is None:
+        return None
+    try:
+        proceso = psutil.Process(driver.service.process.pid)
+        procesos = [proceso] + proceso.children(recursive=True)
+        total = 0
+        for p in procesos:
+            try:
+                total += p.memory_info().rss
+            except psutil.NoSuchProcess:
+                continue
+        return total / 2**20
+    except (AttributeError, psutil.Error):
+        return None
+
+
+def driver_sano(driver) -> bool:
+    """Prueba de vida barata: el proceso sigue corriendo y el navegador ejecuta JavaScript."""
+    try:
+        proceso = getattr(getattr(driver, 'service', None), 'process', None)
+        if proceso is not None and proceso.poll() is not None:
+            return False
+        return driver.execute_script("return document.readyState") is not None
+    except Exception:
+        return False
+
+
+def cerrar_driver(driver):
+    """Cierra un navegador ignorando errores (puede estar colgado o ya cerrado)."""
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class GestorDrivers:
+    """
+    Administra el navegador activo de un scraper y sus reservas.
+
+    `fabrica(ranura)` crea un navegador listo para usar; la ranura identifica un
+    directorio de perfil que no está en uso por otro navegador del gestor.
+    """
+
+    def __init__(self, fabrica: Callable[[int], object], reservas: int = RESERVAS,
+                 max_paginas: int = MAX_PAGINAS, max_rss_mb: Optional[float] = MAX_RSS_MB):
+        self.fabrica = fabrica
+        self.reservas = reservas
+        self.max_paginas = max_paginas
+        self.max_rss_mb = max_rss_mb
+        self.lock = threading.Lock()
+        self.ranuras_libres = list(range(reservas + 2))  # activo, reservas y uno cerrándose
+        self.siguiente_ranura = reservas + 2
+        self.listos: List = []  # (driver, ranura) iniciados de antemano
+        self.preparando = 0
+        self.activo = None
+        self.ranura_activa = None
+        self.paginas = 0
+        self.reciclajes: Dict[str, int] = {}
+        self.arranques = 0
+        self.segundos_arranque = 0.0
+        self.cerrado = False
+        self.hilos: List[threading.Thread] = []  # cierres y reservas en segundo plano
+
+    def _en_segundo_plano(self, funcion):
+        """Ejecuta `funcion` en un hilo que cerrar() espera antes de terminar."""
+        hilo = threading.Thread(target=funcion, daemon=True)
+        with self.lock:
+            self.hilos = [h for h in self.hilos if h.is_alive()]
+            self.hilos.append(hilo)
+        hilo.start()
+
+    def _crear(self):
+        with self.lock:
+            if self.ranuras_libres:
+                ranura = self.ranuras_libres.pop(0)
+            else:
+                ranura = self.siguiente_ranura
+                self.siguiente_ranura += 1
+        inicio = time.monotonic()
+        try:
+            driver = self.fabrica(ranura)
+        except Exception:
+            with self.lock:
+                self.ranuras_libres.append(ranura)
+            raise
+        with self.lock:
+            self.arranques += 1
+            self.segundos_arranque += time.monotonic() - inicio
+        return driver, ranura
+
+    def _preparar_reserva(self):
+        try:
+            driver, ranura = self._crear()
+        except Exception as e:
+            logger.warning(f"No se pudo iniciar un navegador de reserva: {e}")
+            with self.lock:
+                self.preparando -= 1
+            return
+        with self.lock:
+            self.preparando -= 1
+            if not self.cerrado:
+                self.listos.append((driver, ranura))
+                return
+        cerrar_driver(driver)
+
+    def _completar_reservas(self):
+        """Inicia en segundo plano los navegadores que faltan para completar las reservas."""
+        with self.lock:
+            faltan = self.reservas - len(self.listos) - self.preparando
+            self.preparando += max(faltan, 0)
+        for _ in range(max(faltan, 0)):
+            self._en_segundo_plano(self._preparar_reserva)
+
+    def _liberar(self, driver, ranura):
+        """Cierra un navegador en segundo plano y devuelve su ranura al terminar."""
+        def cerrar():
+            cerrar_driver(driver)
+            with self.lock:
+                self.ranuras_libres.append(ranura)
+        self._en_segundo_plano(cerrar)
+
+    def _tomar_reserva(self):
+        """Retorna una reserva que pase la prueba de vida, o crea un navegador nuevo."""
+        while True:
+            with self.lock:
+                candidato = self.listos.pop(0) if self.listos else None
+            if candidato is None:
+                return self._crear()
+            if driver_sano(candidato[0]):
+                return candidato
+            logger.warning("Navegador de reserva sin respuesta; se descarta")
+            self._liberar(*candidato)
+
+    def obtener(self):
+        """Retorna el navegador activo, iniciándolo si no existe."""
+        if self.activo is None:
+            self.activo, self.ranura_activa = self._tomar_reserva()
+            self.paginas = 0
+            self._completar_reservas()
+        return self.activo
+
+    def pagina_procesada(self):
+        """Registra una página procesada por el navegador activo."""
+        self.paginas += 1
+
+    def motivo_reciclaje(self) -> Optional[str]:
+        """Indica por qué conviene reciclar el navegador activo, o None si está en buen estado."""
+        if self.activo is None:
+            return None
+        if self.max_paginas and self.paginas >= self.max_paginas:
+            return 'paginas'
+        if self.max_rss_mb:
+            memoria = rss_mb(self.activo)
+            if memoria is not None and memoria > self.max_rss_mb:
+                return 'memoria'
+        if not driver_sano(self.activo):
+            return 'sin_respuesta'
+        return None
+
+    def reciclar(self, motivo: str = 'error'):
+        """Reemplaza el navegador activo por una reserva y cierra el anterior en segundo plano."""
+        with self.lock:
+            self.reciclajes[motivo] = self.reciclajes.get(motivo, 0) + 1
+        anterior = (self.activo, self.ranura_activa)
+        self.activo = None
+        if anterior[0] is not None:
+            logger.info(f"Reciclando navegador ({motivo}) después de {self.paginas} páginas")
+            self._liberar(*anterior)
+        return self.obtener()
+
+    def estadisticas(self) -> Dict:
+        """Retorna arranques, tiempo promedio de arranque y reciclajes por motivo."""
+        with self.lock:
+            return {
+                'arranques': self.arranques,
+                'segundos_arranque': round(self.segundos_arranque / self.arranques, 2) if self.arranques else 0.0,
+                'reciclajes': dict(self.reciclajes)
+            }
+
+    def cerrar(self, espera: float = ESPERA_CIERRE):
+        """
+        Cierra el navegador activo y las reservas, y espera hasta `espera` segundos a los
+        navegadores reciclados que se siguen cerrando (y a las reservas que se están
+        iniciando, que se cierran al terminar) para no dejar procesos de Chrome huérfanos.
+        """
+        with self.lock:
+            self.cerrado = True
+            listos, self.listos = self.listos, []
+        for driver, _ in listos:
+            cerrar_driver(driver)
+        if self.activo is not None:
+            cerrar_driver(self.activo)
+            self.activo = None
+        limite = time.monotonic() + espera
+        with self.lock:
+            hilos, self.hilos = self.hilos, []
+        for hilo in hilos:
+            hilo.join(max(limite - time.monotonic(), 0))
+        pendientes = sum(hilo.is_alive() for hilo in hilos)
+        if pendientes:
+            logger.warning(f"{pendientes} navegadores no terminaron de cerrarse en {espera} s")
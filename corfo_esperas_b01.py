@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Esperas por Eventos
+Versión B01 - Esperas que terminan cuando el listado realmente se actualiza
+
+Este módulo reemplaza las esperas fijas (time.sleep) de los scrapers con Selenium.
+Antes de una acción que recarga el listado se instala un MutationObserver sobre
+#listSearch; la espera termina cuando el nodo anterior quedó obsoleto (staleness)
+o cuando el observador registró cambios y el DOM se mantuvo estable por un breve
+intervalo. Cada espera queda registrada con su duración real, también en METRICAS.
+"""
+
+import time
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from corfo_metricas_b01 import METRICAS
+
+logger = logging.getLogger(__name__)
+
+# Configuración por defecto
+TIMEOUT_LISTADO = 20  # segundos
+ESTABILIDAD_MS = 250  # milisegundos sin mutaciones para considerar el listado cargado
+INTERVALO_SONDEO = 0.1  # segundos entre verificaciones
+
+JS_INSTALAR_OBSERVADOR = """
+var objetivo = document.getElementById('listSearch');
+if (window.__corfoObservador) { window.__corfoObservador.disconnect(); }
+window.__corfoMutaciones = 0;
+window.__corfoUltimaMutacion = 0;
+if (!objetivo) { return false; }
+window.__corfoObservador = new MutationObserver(function(mutaciones) {
+    window.__corfoMutaciones += mutaciones.length;
+    window.__corfoUltimaMutacion = Date.now();
+});
+window.__corfoObservador.observe(objetivo.parentNode || objetivo, {childList: true, subtree: true});
+return true;
+"""
+
+JS_LISTADO_ESTABLE = """
+return !!document.getElementById('listSearch')
+    && window.__corfoMutaciones > 0
+    && (Date.now() - window.__corfoUltimaMutacion) >= arguments[0];
+"""
+
+JS_LISTADO_PRESENTE = "return !!document.getElementById('listSearch');"
+
+
+class RegistroEsperas:
+    """Acumula la duración real de cada espera, agrupada por nombre."""
+
+    def __init__(self):
+        self.esperas: Dict[str, Dict[str, float]] = {}
+        self.lock = threading.Lock()
+
+    def registrar(self, nombre: str, segundos: float, exitosa: bool = True):
+        METRICAS.observar('corfo_espera_segundos', segundos, espera=nombre,
+                          resultado='ok' if exitosa else 'timeout')
+        with self.lock:
+            datos = self.esperas.setdefault(
+                nombre, {'cantidad': 0, 'total': 0.0, 'maximo': 0.0, 'timeouts': 0}
+            )
+            datos['cantidad'] += 1
+            datos['total'] += segundos
+            datos['maximo'] = max(datos['maximo'], segundos)
+            if not exitosa:
+                datos['timeouts'] += 1
+
+    def resumen(self) -> Dict[str, Dict[str, float]]:
+        """Retorna cantidad, total, promedio, máximo y timeouts por tipo de espera."""
+        with self.lock:
+            return {
+                nombre: {
+                    'cantidad': datos['cantidad'],
+                    'total': round(datos['total'], 3),
+                    'promedio': round(datos['total'] / datos['cantidad'], 3),
+                    'maximo': round(datos['maximo'], 3),
+                    'timeouts': datos['timeouts']
+                }
+                for nombre, datos in self.esperas.items()
+            }
+
+    def log_resumen(self):
+        """Escribe en el log el resumen de las esperas."""
+        for nombre, datos in self.resumen().items():
+            logger.info(f"Espera '{nombre}': {datos['cantidad']} veces, total {datos['total']} s, "
+                        f"promedio {datos['promedio']} s, máximo {datos['maximo']} s, "
+                        f"{datos['timeouts']} timeouts")
+
+
+def esperar(driver, condicion: Callable, nombre: str, registro: Optional[RegistroEsperas] = None,
+            timeout: float = TIMEOUT_LISTADO):
+    """WebDriverWait que registra cuánto tardó la condición; lanza TimeoutException si vence."""
+    inicio = time.monotonic()
+    try:
+        resultado = WebDriverWait(driver, timeout, poll_frequency=INTERVALO_SONDEO).until(condicion)
+    except TimeoutException:
+        if registro:
+            registro.registrar(nombre, time.monotonic() - inicio, exitosa=False)
+        raise
+    if registro:
+        registro.registrar(nombre, time.monotonic() - inicio)
+    return resultado
+
+
+class EsperaListado:
+    """
+    Espera a que #listSearch se actualice después de una acción.
+
+    Uso: llamar a preparar() antes de la acción (clic en filtros o paginación)
+    y a esperar() después de ella.
+    """
+
+    def __init__(self, driver, registro: Optional[RegistroEsperas] = None,
+                 timeout: float = TIMEOUT_LISTADO, estabilidad_ms: int = ESTABILIDAD_MS):
+        self.driver = driver
+        self.registro = registro
+        self.timeout = timeout
+        self.estabilidad_ms = estabilidad_ms
+        self.anterior = None
+
+    def preparar(self):
+        """Guarda el nodo actual del listado e instala el observador de mutaciones."""
+        self.anterior = None
+        try:
+            if self.driver.execute_script(JS_INSTALAR_OBSERVADOR):
+                self.anterior = self.driver.execute_script("return document.getElementById('listSearch');")
+        except WebDriverException as e:
+            logger.debug(f"No se pudo instalar el observador del listado: {e}")
+
+    def _refrescado(self, driver) -> bool:
+        if self.anterior is not None and EC.staleness_of(self.anterior)(driver):
+            # El nodo fue reemplazado o la página se recargó
+            return driver.execute_script(JS_LISTADO_PRESENTE)
+        return driver.execute_script(JS_LISTADO_ESTABLE, self.estabilidad_ms)
+
+    def esperar(self, nombre: str = 'listado') -> bool:
+        """Bloquea hasta que el listado se actualice; retorna False si se agotó el timeout."""
+        try:
+            esperar(self.driver, self._refrescado, nombre, self.registro, self.timeout)
+            return True
+        except TimeoutException:
+            logger.warning(f"Timeout esperando actualización del listado ({nombre})")
+            return False
+        finally:
+            self.anterior = None
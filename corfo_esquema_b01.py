@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Esquema de Extracción
+Versión B01 - Selectores declarativos compilados una sola vez
+
+Este módulo reúne en un solo lugar lo que los tres scrapers leen del sitio: los
+campos de cada tarjeta del listado, la paginación, los enlaces que recorre el
+scraper de filtros, los formatos de ficha del scraper de detalles y los IDs de
+los checkboxes de FILTROS. Cada campo declara su selector, su valor por defecto
+y su posproceso (por ejemplo, quitar "¿Qué es?" del inicio de DETALLE).
+
+Los esquemas se compilan al importar el módulo en objetos etree.XPath que se
+reutilizan en cada documento, de modo que la extracción no vuelve a parsear
+selectores y un cambio de marcado en corfo.cl se resuelve editando el esquema.
+"""
+
+import re
+from typing import Callable, Dict, Iterable, List, Optional
+
+from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
+
+URL_BASE = "https://corfo.cl"
+NO_DISPONIBLE = "No disponible"
+NO_ESPECIFICADO = "No especificado"
+
+
+def clase(nombre: str) -> str:
+    """Condición XPath equivalente al selector CSS .nombre"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {nombre} ')"
+
+
+# Posprocesos
+
+def limpiar_resumen(html_content: str) -> str:
+    """Limpia el contenido del resumen según las reglas especificadas"""
+    if not html_content:
+        return NO_DISPONIBLE
+
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    for span in soup.find_all('span', style="border: 2px solid #2fca70;padding: 20px;display: inline-block;"):
+        if "Plataforma Matchmaking" in span.text:
+            span.decompose()
+
+    for a in soup.find_all('a'):
+        a.decompose()
+
+    text = soup.get_text()
+    text = text.replace('<br> " -', '')
+    text = text.replace('" -', '')
+
+    return text.strip() or NO_DISPONIBLE
+
+
+def quitar(etiqueta: str) -> Callable[[str], str]:
+    """Posproceso que elimina una etiqueta fija del texto (por ejemplo 'Estado:')"""
+    return lambda texto: texto.replace(etiqueta, "").strip()
+
+
+def url_absoluta(url: str) -> str:
+    """Completa las URLs relativas con el dominio de corfo.cl"""
+    return f"{URL_BASE}{url}" if not url.startswith(URL_BASE) else url
+
+
+_QUE_ES = re.compile(r'^¿Qué es\?[\s:]*')
+
+
+def quitar_que_es(texto: str) -> str:
+    """Limpia "¿Qué es?" del inicio de DETALLE"""
+    return _QUE_ES.sub('', texto.strip())
+
+
+# Esquemas declarativos
+
+# Tarjetas del listado. 'valor': texto (espacios normalizados), html (innerHTML) o @atributo
+ESQUEMA_LISTADO = {
+    'caja': f"//*[{clase('caja-resultados_uno')}]",
+    'campos': {
+        'NOMBRE': {'xpath': f".//*[{clase('titulo-cajas_fechas')}]", 'defecto': '', 'requerido': True},
+        'APERTURA': {'xpath': f".//*[{clase('apertura')}]//span", 'defecto': NO_DISPONIBLE},
+        'CIERRE': {'xpath': f".//*[{clase('cierre')}]//span", 'defecto': NO_DISPONIBLE},
+        'ALCANCE': {'xpath': ".//*[contains(text(), 'Alcance:')]", 'defecto': NO_ESPECIFICADO,
+                    'post': [quitar('Alcance:')]},
+        'ESTADO': {'xpath': ".//*[contains(text(), 'Estado:')]", 'defecto': NO_ESPECIFICADO,
+                   'post': [quitar('Estado:')]},
+        'RESUMEN': {'xpath': ".//p", 'valor': 'html', 'defecto': NO_DISPONIBLE, 'post': [limpiar_resumen]},
+        'URL': {'xpath': f".//*[{clase('foot-caja_result')}]//a[@href]", 'valor': '@href',
+                'defecto': NO_DISPONIBLE, 'post': [url_absoluta]}
+    },
+    # Enlaces "Más Información" que recorre el scraper de filtros (div.foot-caja_result a)
+    'enlaces': f"//div[{clase('foot-caja_result')}]//a/@href",
+    'siguiente': "//a[contains(@class, 'page-link') and contains(text(), 'Siguiente')]"
+}
+
+# Fichas de detalle. Cada formato se reconoce por su contenedor (primer elemento con
+# esa clase) o, si no tiene, por la presencia de alguna de las clases de sus campos.
+# Los campos se ubican por clase o por etiqueta; varios elementos se unen con espacios.
+ESQUEMA_DETALLE = {
+    'formatos': {
+        'antiguo': {
+            'contenedor': 'col-sm-8',
+            'campos': {
+                'DETALLE': {'etiqueta': 'p'},
+                'BENEFICIO': {'clase': 'beneficios'},
+                'QUIENES': {'clase': 'requisitos'},
+                'RESULTADOS': {'clase': 'resultados_esperados'}
+            }
+        },
+        'nuevo': {
+            'contenedor': None,
+            'campos': {
+                'DETALLE': {'clase': 'marcoque_fase2'},
+                'BENEFICIO': {'clase': 'postula_fase2-cuerpodos_fase2_bloque_q_entrega'},
+                'QUIENES': {'clase': 'postula_fase2-der_fase2'},
+                'RESULTADOS': {'clase': 'diviPuntoTexto_fase2', 'solo_primero': True}
+            }
+        }
+    },
+    'defecto': NO_DISPONIBLE,  # los campos sin valor se omiten
+    'post': {'DETALLE': [quitar_que_es]}  # se aplica al guardar (limpiar_datos)
+}
+
+# IDs de los checkboxes de filtro del sitio, agrupados por menú
+FILTROS = {
+    'perfil': {
+        'menu_id': 'collapse5',
+        'menu_button': '//a[@data-target="#collapse5"]',
+        'filtros': {
+            'PERSONA': 'asPerfilQuienSoy-persona-checkbox',
+            'EMPRESA': 'asPerfilQuienSoy-empresa-checkbox',
+            'ORGANIZACIÓN': 'asPerfilQuienSoy-organizacion-checkbox',
+            'INTERMEDIARIO': 'asPerfilQuienSoy-intermediario-checkbox',
+            'INSTITUCION': 'asPerfilQuienSoy-institucion-checkbox',
+            'EXTRANJERO': 'asPerfilQuienSoy-extranjero-checkbox'
+        }
+    },
+    'etapa': {
+        'menu_id': 'collapse4',
+        'menu_button': '//a[@data-target="#collapse4"]',
+        'filtros': {
+            'EMPRENDER': 'asEtapaQueBusco-emprender-checkbox',
+            'IDEA': 'asEtapaQueBusco-ideaNegocio-checkbox',
+            'VENTAS': 'asEtapaQueBusco-aumentarVentas-checkbox',
+            'ESCALAR': 'asEtapaQueBusco-escalar-checkbox',
+            'INNOVAR': 'asEtapaQueBusco-innovar-checkbox',
+            'I+D': 'asEtapaQueBusco-desarrollandoID-checkbox',
+            'SERVICIOS': 'asEtapaQueBusco-entregarServicios-checkbox',
+            'ECOSISTEMA': 'asEtapaQueBusco-fortalecerEcosistema-checkbox'
+        }
+    },
+    'genero': {
+        'menu_id': 'collapse3',
+        'menu_button': '//a[@data-target="#collapse3"]',
+        'filtros': {
+            'GENERO': 'asQueNecesito-incentivoMujeres-checkbox'
+        }
+    }
+}
+
+
+# Compilación
+
+def texto_normalizado(elemento) -> str:
+    """Texto visible de un elemento lxml con espacios normalizados"""
+    return ' '.join(elemento.text_content().split())
+
+
+def inner_html(elemento) -> str:
+    """Equivalente lxml de get_attribute('innerHTML')"""
+    return (elemento.text or '') + ''.join(
+        lxml_html.tostring(hijo, encoding='unicode') for hijo in elemento
+    )
+
+
+def _lector(valor: str) -> Callable:
+    if valor == 'texto':
+        return texto_normalizado
+    if valor == 'html':
+        return inner_html
+    if valor.startswith('@'):
+        atributo = valor[1:]
+        return lambda elemento: elemento.get(atributo)
+    raise ValueError(f"Tipo de valor desconocido en el esquema: {valor}")
+
+
+class EsquemaListado:
+    """Esquema de tarjetas del listado con sus XPath compilados una sola vez."""
+
+    def __init__(self, esquema: Dict):
+        self.cajas = etree.XPath(esquema['caja'])
+        self.enlaces = etree.XPath(esquema['enlaces'])
+        self.siguiente = etree.XPath(esquema['siguiente'])
+        self.campos = [
+            (nombre, etree.XPath(campo['xpath']), _lector(campo.get('valor', 'texto')),
+             campo.get('defecto', NO_DISPONIBLE), campo.get('requerido', False), tuple(campo.get('post', ())))
+            for nombre, campo in esquema['campos'].items()
+        ]
+
+    def extraer(self, caja) -> Optional[Dict[str, str]]:
+        """Campos de una tarjeta; None si falta un campo requerido"""
+        data = {}
+        for nombre, xpath, lector, defecto, requerido, post in self.campos:
+            encontrados = xpath(caja)
+            if not encontrados:
+                if requerido:
+                    return None
+                data[nombre] = defecto
+                continue
+            valor = lector(encontrados[0])
+            for funcion in post:
+                valor = funcion(valor)
+            data[nombre] = valor
+        return data
+
+    def documento(self, contenido: str):
+        """Parsea un HTML de listado (página completa o fragmento)"""
+        return lxml_html.fromstring(contenido)
+
+    def extraer_documento(self, documento) -> List[Optional[Dict[str, str]]]:
+        """Aplica el esquema a todas las tarjetas de un documento ya parseado"""
+        return [self.extraer(caja) for caja in self.cajas(documento)]
+
+    def extraer_lote(self, contenidos: Iterable[str]) -> List[Dict[str, str]]:
+        """Aplica el esquema a muchos HTML de listado y retorna las tarjetas válidas"""
+        return [
+            fila for contenido in contenidos
+            for fila in self.extraer_documento(self.documento(contenido)) if fila
+        ]
+
+    def urls_enlaces(self, documento) -> List[str]:
+        """URLs absolutas de los enlaces "Más Información" del documento"""
+        return [url_absoluta(href) if not href.startswith('http') else href
+                for href in self.enlaces(documento) if href]
+
+
+class FormatoDetalle:
+    """Formato de ficha compilado: búsqueda de campos por clase o etiqueta en un solo recorrido."""
+
+    def __init__(self, nombre: str, formato: Dict):
+        self.nombre = nombre
+        self.contenedor = formato.get('contenedor')
+        self.primer_contenedor = (etree.XPath(f"(//*[{clase(self.contenedor)}])[1]")
+                                  if self.contenedor else None)
+        self.campos = list(formato['campos'])
+        self.por_clase = {c['clase']: nombre_campo for nombre_campo, c in formato['campos'].items() if 'clase' in c}
+        self.por_etiqueta = {c['etiqueta']: nombre_campo
+                             for nombre_campo, c in formato['campos'].items() if 'etiqueta' in c}
+        self.solo_primero = {nombre_campo for nombre_campo, c in formato['campos'].items()
+                             if c.get('solo_primero')}
+        self.selectores_css = {nombre_campo: f".{c['clase']}" if 'clase' in c else c['etiqueta']
+                               for nombre_campo, c in formato['campos'].items()}
+
+    def condicion(self) -> str:
+        """Condición XPath que indica si un documento tiene este formato"""
+        if self.contenedor:
+            return f"boolean(//*[{clase(self.contenedor)}])"
+        return f"boolean(//*[{' or '.join(clase(c) for c in self.por_clase)}])"
+
+    def raiz(self, documento):
+        """Elemento bajo el cual se buscan los campos, o None si el formato no aplica"""
+        if self.primer_contenedor is None:
+            return documento
+        contenedor = self.primer_contenedor(documento)
+        return contenedor[0] if contenedor else None
+
+    def elementos(self, documento) -> Optional[Dict[str, List]]:
+        """Elementos de cada campo en orden del documento, con un solo recorrido"""
+        raiz = self.raiz(documento)
+        if raiz is None:
+            return None
+        encontrados = {campo: [] for campo in self.campos}
+        recorrido = raiz.iter(tag=etree.Element) if self.primer_contenedor is None \
+            else raiz.iterdescendants(tag=etree.Element)
+        for elemento in recorrido:
+            campo = self.por_etiqueta.get(elemento.tag)
+            if campo is not None:
+                encontrados[campo].append(elemento)
+            clases = elemento.get('class')
+            if not clases:
+                continue
+            for nombre_clase in clases.split():
+                campo = self.por_clase.get(nombre_clase)
+                if campo is not None and (not encontrados[campo] or encontrados[campo][-1] is not elemento):
+                    encontrados[campo].append(elemento)
+        return encontrados
+
+
+class EsquemaDetalle:
+    """Formatos de ficha compilados y sonda de formato en una sola expresión XPath."""
+
+    def __init__(self, esquema: Dict):
+        self.formatos = {nombre: FormatoDetalle(nombre, formato)
+                         for nombre, formato in esquema['formatos'].items()}
+        self.defecto = esquema.get('defecto', NO_DISPONIBLE)
+        self.post = {campo: tuple(funciones) for campo, funciones in esquema.get('post', {}).items()}
+        # Bit i encendido si el documento tiene el formato i (en el orden del esquema)
+        self.sonda = etree.XPath(' + '.join(
+            f"{2 ** i} * number({formato.condicion()})" for i, formato in enumerate(self.formatos.values())
+        ))
+        self.bits = {nombre: 2 ** i for i, nombre in enumerate(self.formatos)}
+
+    def posprocesar(self, datos: Dict[str, str]) -> Dict[str, str]:
+        """Aplica los posprocesos del esquema a los campos extraídos de una ficha"""
+        datos = dict(datos)
+        for campo, funciones in self.post.items():
+            if isinstance(datos.get(campo), str):
+                for funcion in funciones:
+                    datos[campo] = funcion(datos[campo])
+        return datos
+
+
+LISTADO = EsquemaListado(ESQUEMA_LISTADO)
+DETALLE = EsquemaDetalle(ESQUEMA_DETALLE)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Normalización de Fechas
+Versión B01 - APERTURA y CIERRE como datetime64 con búsqueda por rango
+
+El listado guarda APERTURA y CIERRE tal como aparecen en el sitio: "15 de marzo de
+2024", "15/03/2024", a veces con hora ("15 de marzo de 2024, 15:00 hrs") y "No
+disponible" cuando no hay fecha. Este módulo las convierte a datetime64 con NaT para
+los valores que no son fechas:
+
+- normalizar_fechas(): interpreta cada texto distinto una sola vez (pd.factorize),
+  con expresiones regulares vectorizadas sobre los valores únicos, y recuerda los
+  resultados en un memo compartido entre llamadas; luego los reparte a todas las
+  filas con una indexación de NumPy
+- IndiceCierre: posiciones ordenadas por CIERRE para consultas por rango con
+  búsqueda binaria ("cierran en los próximos 14 días")
+
+    python corfo_fechas_b01.py --cierran-en 14
+    python corfo_fechas_b01.py --desde 2025-03-01 --hasta 2025-03-31
+"""
+
+import argparse
+import logging
+import re
+import unicodedata
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Configuración
+COLUMNAS_FECHA = ['APERTURA', 'CIERRE']
+TAMANO_MEMO = 200000  # textos recordados antes de vaciar el memo
+
+NOMBRES_MESES = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio', 'agosto',
+                 'septiembre', 'octubre', 'noviembre', 'diciembre']
+MESES = {nombre: numero for numero, nombre in enumerate(NOMBRES_MESES, 1)}
+MESES.update({nombre[:3]: numero for nombre, numero in list(MESES.items())})  # ene, feb, mar...
+MESES.update({'setiembre': 9, 'sept': 9, 'set': 9})
+
+# Formatos del sitio, sobre el texto en minúsculas y sin tildes
+PATRON_TEXTO = r'(?P<dia>\d{1,2})\s*(?:de\s+)?(?P<mes>[a-z]{3,10})\.?\s*(?:del?\s+)?(?P<anio>\d{4})'
+PATRON_NUMERICO = r'(?P<dia>\d{1,2})[/.-](?P<mes>\d{1,2})[/.-](?P<anio>\d{4})'
+PATRON_ISO = r'(?P<anio>\d{4})-(?P<mes>\d{1,2})-(?P<dia>\d{1,2})'
+PATRON_HORA = r'(?P<hora>\d{1,2}):(?P<minuto>\d{2})'
+_TEXTO, _NUMERICO, _ISO, _HORA = (re.compile(patron) for patron in
+                                  (PATRON_TEXTO, PATRON_NUMERICO, PATRON_ISO, PATRON_HORA))
+
+MEMO: Dict[str, np.datetime64] = {}  # texto -> fecha ya interpretada (NaT si no es fecha)
+NAT = np.datetime64('NaT', 'ns')
+
+
+def sin_tildes(texto: str) -> str:
+    """Minúsculas y sin tildes, para comparar nombres de meses."""
+    return unicodedata.normalize('NFKD', texto.lower()).encode('ascii', 'ignore').decode('ascii')
+
+
+def parsear_fecha(texto) -> Optional[datetime]:
+    """Interpreta un solo texto con los formatos del sitio; None si no es una fecha."""
+    if not isinstance(texto, str):
+        return None
+    texto = sin_tildes(texto)
+    coincidencia = _TEXTO.search(texto)
+    if coincidencia and coincidencia.group('mes') in MESES:
+        mes = MESES[coincidencia.group('mes')]
+    else:
+        coincidencia = _NUMERICO.search(texto) or _ISO.search(texto)
+        if not coincidencia:
+            return None
+        mes = int(coincidencia.group('mes'))
+    hora = _HORA.search(texto)
+    try:
+        return datetime(int(coincidencia.group('anio')), mes, int(coincidencia.group('dia')),
+                        *((int(hora.group('hora')), int(hora.group('minuto'))) if hora else ()))
+    except ValueError:
+        return None
+
+
+def _parsear_unicos(textos: Iterable[str]) -> np.ndarray:
+    """Interpreta textos distintos con expresiones regulares vectorizadas de pandas."""
+    serie = pd.Series(list(textos), dtype=object).astype(str)
+    normalizado = serie.str.lower().str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+    texto = normalizado.str.extract(PATRON_TEXTO)
+    texto['mes'] = texto['mes'].map(MESES)
+    numerico = normalizado.str.extract(PATRON_NUMERICO)
+    iso = normalizado.str.extract(PATRON_ISO)
+    # Prioridad: mes con nombre, luego dd/mm/aaaa, luego aaaa-mm-dd
+    partes = {}
+    usar_texto = texto['mes'].notna()
+    usar_numerico = ~usar_texto & numerico['dia'].notna()
+    for campo in ('dia', 'mes', 'anio'):
+        partes[campo] = pd.to_numeric(
+            texto[campo].where(usar_texto, numerico[campo].where(usar_numerico, iso[campo])), errors='coerce')
+    hora = normalizado.str.extract(PATRON_HORA).apply(pd.to_numeric, errors='coerce')
+    # to_datetime pasa 24:00 o 25:99 al día siguiente; parsear_fecha las rechaza, aquí quedan NaT
+    partes['anio'] = partes['anio'].mask((hora['hora'] > 23) | (hora['minuto'] > 59))
+    # Fuera del rango de datetime64[ns] la fecha da la vuelta (1500 -> 2084) en vez de
+    # fallar; esas fechas quedan NaT
+    partes['anio'] = partes['anio'].mask((partes['anio'] < pd.Timestamp.min.year) |
+                                         (partes['anio'] > pd.Timestamp.max.year))
+    fechas = pd.to_datetime(pd.DataFrame({'year': partes['anio'], 'month': partes['mes'], 'day': partes['dia'],
+                                          'hour': hora['hora'].fillna(0), 'minute': hora['minuto'].fillna(0)}),
+                            errors='coerce')
+    # En 1677 y 2262 solo parte del año cabe en el rango
+    fechas = fechas.where((fechas >= pd.Timestamp.min) & (fechas <= pd.Timestamp.max))
+    return fechas.to_numpy(dtype='datetime64[ns]')
+
+
+def normalizar_fechas(valores: Union[pd.Series, Iterable], memo: Optional[Dict] = None) -> pd.Series:
+    """
+    Convierte una columna de fechas en texto a datetime64[ns] con NaT para lo que no es fecha.
+
+    Cada texto distinto se interpreta una sola vez y se recuerda en `memo` (por defecto
+    el memo del módulo, compartido entre llamadas).
+    """
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(list(valores), dtype=object)
+    memo = MEMO if memo is None else memo
+    codigos, unicos = pd.factorize(serie)
+    nuevos = [texto for texto in unicos if texto not in memo]
+    if nuevos:
+        if memo is MEMO and len(MEMO) + len(nuevos) > TAMANO_MEMO:
+            MEMO.clear()
+        memo.update(zip(nuevos, _parsear_unicos(nuevos)))
+    fechas_unicas = np.array([memo[texto] for texto in unicos], dtype='datetime64[ns]')
+    resultado = np.full(len(serie), NAT)
+    validos = codigos >= 0
+    resultado[validos] = fechas_unicas[codigos[validos]]
+    return pd.Series(resultado, index=serie.index, name=serie.name)
+
+
+def normalizar_convocatorias(df: pd.DataFrame, columnas=COLUMNAS_FECHA) -> pd.DataFrame:
+    """Copia de las convocatorias con APERTURA y CIERRE como datetime64."""
+    df = df.copy()
+    for columna in columnas:
+        if columna in df and not pd.api.types.is_datetime64_any_dtype(df[columna]):
+            df[columna] = normalizar_fechas(df[columna])
+    return df
+
+
+class IndiceCierre:
+    """Convocatorias ordenadas por CIERRE para consultas por rango con búsqueda binaria."""
+
+    def __init__(self, df: pd.DataFrame, columna: str = 'CIERRE'):
+        fechas = df[columna]
+        if not pd.api.types.is_datetime64_any_dtype(fechas):
+            fechas = normalizar_fechas(fechas)
+        fechas = fechas.to_numpy(dtype='datetime64[ns]')
+        validas = np.flatnonzero(~np.isnat(fechas))  # las convocatorias sin cierre no entran al índice
+        orden = np.argsort(fechas[validas], kind='stable')
+        self.df = df
+        self.fechas = fechas[validas][orden]
+        self.posiciones = validas[orden]
+
+    def __len__(self) -> int:
+        return len(self.fechas)
+
+    def rango(self, desde=None, hasta=None) -> pd.DataFrame:
+        """Convocatorias con CIERRE entre `desde` y `hasta` (ambos incluidos; None no limita)."""
+        inicio = 0 if desde is None else np.searchsorted(self.fechas, np.datetime64(pd.Timestamp(desde)), 'left')
+        fin = len(self.fechas) if hasta is None else \
+            np.searchsorted(self.fechas, np.datetime64(pd.Timestamp(hasta)), 'right')
+        return self.df.iloc[self.posiciones[inicio:fin]]
+
+    def cierran_en(self, dias: int, hoy: Optional[date] = None) -> pd.DataFrame:
+        """Convocatorias que cierran entre hoy y dentro de `dias` días."""
+        hoy = pd.Timestamp(hoy or date.today()).normalize()
+        return self.rango(hoy, hoy + pd.Timedelta(days=dias + 1) - pd.Timedelta(1, 'ns'))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Lee los argumentos de línea de comandos."""
+    from corfo_db_b01 import ARCHIVO_DB
+
+    parser = argparse.ArgumentParser(description='Consultas por fecha de cierre de convocatorias CORFO')
+    parser.add_argument('--db', default=ARCHIVO_DB, help='Archivo SQLite')
+    parser.add_argument('--cierran-en', type=int, metavar='DIAS',
+                        help='Convocatorias que cierran entre hoy y dentro de DIAS días')
+    parser.add_argument('--desde', help='Cierre desde esta fecha (AAAA-MM-DD)')
+    parser.add_argument('--hasta', help='Cierre hasta esta fecha (AAAA-MM-DD)')
+    return parser.parse_args(argv)
+
+
+def main():
+    from corfo_db_b01 import BaseDatos
+
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db = BaseDatos(args.db)
+    try:
+        df = normalizar_convocatorias(db.leer_convocatorias())
+    finally:
+        db.cerrar()
+    indice = IndiceCierre(df)
+    logger.info(f"{len(df)} convocatorias, {len(indice)} con fecha de cierre "
+                f"({df['APERTURA'].notna().sum()} con fecha de apertura)")
+    if args.cierran_en is not None:
+        resultado = indice.cierran_en(args.cierran_en)
+    else:
+        resultado = indice.rango(args.desde, args.hasta)
+    print(resultado[['NOMBRE', 'ESTADO', 'APERTURA', 'CIERRE', 'URL']].to_string(max_rows=50))
+
+
+if __name__ == "__main__":
+    main()
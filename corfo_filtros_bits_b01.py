@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Codificación de Filtros en Bits
+Versión B01 - Columna FILTROS_BITS y consultas vectorizadas
+
+Este módulo empaqueta las 15 columnas de filtros (PERSONA ... GENERO) en una sola
+columna entera de 16 bits, construida a partir del mapeo FILTROS, y permite consultar
+el dataset completo con operaciones bit a bit de NumPy:
+
+    from corfo_filtros_bits_b01 import match
+    df[match(df, all_of=['EMPRESA', 'INNOVAR'], any_of=['I+D', 'ESCALAR'])]
+
+Ejecutado como script, mide el tiempo de consulta sobre filas sintéticas.
+"""
+
+import argparse
+import time
+from typing import Dict, Iterable, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from corfo_esquema_b01 import FILTROS
+
+COLUMNA_BITS = 'FILTROS_BITS'
+COLUMNAS_FILTRO = [columna for grupo in FILTROS.values() for columna in grupo['filtros']]
+BITS: Dict[str, int] = {columna: 1 << i for i, columna in enumerate(COLUMNAS_FILTRO)}
+PESOS = np.array([BITS[columna] for columna in COLUMNAS_FILTRO], dtype=np.uint16)
+
+
+def mascara(columnas: Optional[Iterable[str]]) -> int:
+    """Retorna la máscara de bits de un conjunto de filtros."""
+    resultado = 0
+    for columna in columnas or ():
+        if columna not in BITS:
+            raise ValueError(f"Filtro desconocido: {columna}")
+        resultado |= BITS[columna]
+    return resultado
+
+
+def codificar_matriz(matriz: np.ndarray, columnas: Optional[Sequence[str]] = None) -> np.ndarray:
+    """
+    Convierte una matriz de pertenencia (filas x filtros, 0/1) en un vector uint16. Por
+    defecto las columnas de la matriz son COLUMNAS_FILTRO; si se indican otras, cada una
+    conserva su bit.
+    """
+    pesos = PESOS if columnas is None else np.array([mascara([c]) for c in columnas], dtype=np.uint16)
+    return (np.asarray(matriz, dtype=np.uint16) * pesos).sum(axis=1, dtype=np.uint16)
+
+
+def empaquetar(df: pd.DataFrame, eliminar: bool = True) -> pd.DataFrame:
+    """Agrega la columna FILTROS_BITS desde las columnas anchas y, opcionalmente, las elimina."""
+    resultado = df.copy()
+    resultado[COLUMNA_BITS] = codificar_matriz(df[COLUMNAS_FILTRO].fillna(0).to_numpy() != 0)
+    if eliminar:
+        resultado = resultado.drop(columns=COLUMNAS_FILTRO)
+    return resultado
+
+
+def desempaquetar(df: pd.DataFrame, eliminar: bool = True) -> pd.DataFrame:
+    """Reconstruye las 15 columnas 0/1 desde FILTROS_BITS."""
+    resultado = df.copy()
+    bits = df[COLUMNA_BITS].to_numpy(dtype=np.uint16)
+    matriz = ((bits[:, None] & PESOS) != 0).astype(np.int64)
+    for j, columna in enumerate(COLUMNAS_FILTRO):
+        resultado[columna] = matriz[:, j]
+    if eliminar:
+        resultado = resultado.drop(columns=[COLUMNA_BITS])
+    return resultado
+
+
+def match(datos: Union[pd.DataFrame, pd.Series, np.ndarray],
+          all_of: Optional[Iterable[str]] = None,
+          any_of: Optional[Iterable[str]] = None,
+          none_of: Optional[Iterable[str]] = None) -> np.ndarray:
+    """
+    Retorna una máscara booleana con las filas que cumplen la consulta.
+
+    all_of: filtros que deben estar todos presentes.
+    any_of: filtros de los que al menos uno debe estar presente.
+    none_of: filtros que no deben estar presentes.
+    """
+    if isinstance(datos, pd.DataFrame):
+        datos = datos[COLUMNA_BITS]
+    bits = np.asarray(datos, dtype=np.uint16)
+    resultado = np.ones(len(bits), dtype=bool)
+
+    m_all = mascara(all_of)
+    if m_all:
+        resultado &= (bits & m_all) == m_all
+    m_any = mascara(any_of)
+    if m_any:
+        resultado &= (bits & m_any) != 0
+    m_none = mascara(none_of)
+    if m_none:
+        resultado &= (bits & m_none) == 0
+    return resultado
+
+
+def generar_sintetico(filas: int, semilla: int = 0) -> pd.DataFrame:
+    """Genera un DataFrame ancho con filtros aleatorios para pruebas de rendimiento."""
+    rng = np.random.default_rng(semilla)
+    matriz = (rng.random((filas, len(COLUMNAS_FILTRO))) < 0.3).astype(np.int64)
+    df = pd.DataFrame(matriz, columns=COLUMNAS_FILTRO)
+    df.insert(0, 'URL', [f"https://corfo.cl/sites/cpp/convocatorias/sintetica_{i}" for i in range(filas)])
+    return df
+
+
+def benchmark(filas: int = 100_000, repeticiones: int = 20) -> Dict[str, float]:
+    """Compara la consulta columna a columna con la consulta sobre FILTROS_BITS."""
+    ancho = generar_sintetico(filas)
+    empaquetado = empaquetar(ancho)
+    consulta = {'all_of': ['EMPRESA', 'INNOVAR'], 'any_of': ['I+D', 'ESCALAR'], 'none_of': ['EXTRANJERO']}
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        esperado = ((ancho['EMPRESA'] == 1) & (ancho['INNOVAR'] == 1)
+                    & ((ancho['I+D'] == 1) | (ancho['ESCALAR'] == 1))
+                    & (ancho['EXTRANJERO'] == 0)).to_numpy()
+    t_ancho = (time.perf_counter() - inicio) / repeticiones
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        obtenido = match(empaquetado, **consulta)
+    t_bits = (time.perf_counter() - inicio) / repeticiones
+
+    if not np.array_equal(esperado, obtenido):
+        raise AssertionError("La consulta sobre FILTROS_BITS no coincide con las columnas anchas")
+    if not desempaquetar(empaquetado)[COLUMNAS_FILTRO].equals(ancho[COLUMNAS_FILTRO]):
+        raise AssertionError("El round-trip ancho -> bits -> ancho no conserva los datos")
+
+    return {
+        'filas': filas,
+        'coincidencias': int(obtenido.sum()),
+        'ms_columnas': round(t_ancho * 1000, 3),
+        'ms_bits': round(t_bits * 1000, 3),
+        'memoria_columnas_mb': round(ancho[COLUMNAS_FILTRO].memory_usage(index=False).sum() / 2**20, 2),
+        'memoria_bits_mb': round(empaquetado[COLUMNA_BITS].memory_usage(index=False) / 2**20, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de consultas sobre FILTROS_BITS')
+    parser.add_argument('--filas', type=int, default=100_000, help='Filas sintéticas a generar')
+    parser.add_argument('--repeticiones', type=int, default=20, help='Repeticiones por consulta')
+    args = parser.parse_args()
+
+    resultado = benchmark(args.filas, args.repeticiones)
+    print(f"Filas: {resultado['filas']} ({resultado['coincidencias']} coincidencias)")
+    print(f"Columnas anchas: {resultado['ms_columnas']} ms por consulta, "
+          f"{resultado['memoria_columnas_mb']} MB")
+    print(f"FILTROS_BITS:    {resultado['ms_bits']} ms por consulta, "
+          f"{resultado['memoria_bits_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,488 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Motor de Descarga HTTP
+Versión B01 - Descarga concurrente con sesión compartida
+
+Este módulo entrega un motor de descarga con concurrencia acotada (pool de hilos),
+una sesión HTTP keep-alive con pool de conexiones y un limitador de tasa tipo
+token bucket por host, que reemplaza la espera fija entre requests. Opcionalmente
+usa un CacheHTTP para hacer GET condicionales y reutilizar los datos ya extraídos.
+Cada request registra su latencia, código de estado y bytes en METRICAS.
+
+Con adaptativo=True un ControladorAIMD ajusta la concurrencia y la tasa según la
+respuesta del sitio: las aumenta de a un paso mientras la latencia se mantiene sana
+y las reduce a la mitad ante errores, 429/5xx o picos del p95 de la latencia. Los
+Retry-After de las respuestas 429/503 pausan el host en cualquier modo.
+
+Los fallos se reintentan por URL con backoff exponencial y jitter (PoliticaReintentos)
+sin ocupar un worker durante la espera, y un Cortacircuito pausa todas las descargas
+cuando el sitio deja de responder (ver corfo_reintentos_b01).
+"""
+
+import time
+import heapq
+import itertools
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from corfo_cache_b01 import CacheHTTP, hash_contenido
+from corfo_metricas_b01 import METRICAS
+from corfo_reintentos_b01 import Cortacircuito, PoliticaReintentos, clasificar
+
+logger = logging.getLogger(__name__)
+
+# Configuración por defecto
+WORKERS = 4
+TASA_POR_HOST = 2.0  # requests por segundo por host
+RAFAGA = 4  # requests que se pueden emitir seguidas antes de limitar
+TIMEOUT = 30
+USER_AGENT = 'Mozilla/5.0 (compatible; CORFO-scraper/B01)'
+URL_SITIO = 'https://corfo.cl'
+RETRY_AFTER_MAXIMO = 120  # segundos; un Retry-After mayor se acota
+# Control adaptativo (AIMD)
+CONCURRENCIA_TOPE = 16
+TASA_TOPE = 10.0  # requests por segundo por host
+INCREMENTO_TASA = 1.0  # aumento aditivo de la tasa por ventana sana
+FACTOR_REDUCCION = 0.5  # reducción multiplicativa ante errores o picos de latencia
+VENTANA_MINIMA = 10  # respuestas mínimas por ventana de evaluación
+FACTOR_PICO = 3.0  # p95 sobre FACTOR_PICO veces la latencia base se considera un pico
+LATENCIA_MINIMA_PICO = 0.25  # segundos; un p95 menor nunca se considera pico
+USO_TASA = 0.8  # fracción de la tasa que debe alcanzar una ventana para considerarla limitada por tasa
+ESTADOS_SATURACION = (429, 500, 502, 503, 504)
+RUTA_LISTADO = '/sites/cpp/programasyconvocatorias'
+
+
+def redirigir(url: str, base_url: Optional[str] = None) -> str:
+    """Reemplaza el dominio de corfo.cl por base_url (por ejemplo, el sitio simulado de corfo_mock_b01)."""
+    if base_url and url.startswith(URL_SITIO):
+        return base_url.rstrip('/') + url[len(URL_SITIO):]
+    return url
+
+
+def url_listado(base_url: Optional[str] = None) -> str:
+    """URL del listado de convocatorias en corfo.cl o en base_url."""
+    return (base_url.rstrip('/') if base_url else URL_SITIO) + RUTA_LISTADO
+
+
+def leer_retry_after(valor: Optional[str]) -> Optional[float]:
+    """Segundos indicados por una cabecera Retry-After (segundos o fecha HTTP), acotados."""
+    if not valor:
+        return None
+    try:
+        segundos = float(valor)
+    except ValueError:
+        try:
+            segundos = parsedate_to_datetime(valor).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(segundos, 0.0), RETRY_AFTER_MAXIMO)
+
+
+class TokenBucket:
+    """Limitador de tasa tipo token bucket, seguro para múltiples hilos."""
+
+    def __init__(self, tasa: float, capacidad: float):
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self.tokens = capacidad
+        self.ultimo = time.monotonic()
+        self.pausa_hasta = 0.0  # Retry-After: no se entregan tokens antes de este instante
+        self.lock = threading.Lock()
+
+    def pausar(self, segundos: float):
+        """Detiene la entrega de tokens durante `segundos` y descarta la ráfaga acumulada."""
+        with self.lock:
+            self.pausa_hasta = max(self.pausa_hasta, time.monotonic() + segundos)
+            self.tokens = 0.0
+
+    def adquirir(self) -> float:
+        """Bloquea hasta obtener un token y retorna los segundos esperados."""
+        esperado = 0.0
+        while True:
+            with self.lock:
+                ahora = time.monotonic()
+                if ahora < self.pausa_hasta:
+                    faltante = self.pausa_hasta - ahora
+                    self.ultimo = self.pausa_hasta
+                else:
+                    self.tokens = min(self.capacidad, self.tokens + (ahora - self.ultimo) * self.tasa)
+                    self.ultimo = ahora
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return esperado
+                    faltante = (1 - self.tokens) / self.tasa
+            time.sleep(faltante)
+            esperado += faltante
+
+
+class LimitadorPorHost:
+    """Mantiene un token bucket independiente para cada host."""
+
+    def __init__(self, tasa: float = TASA_POR_HOST, capacidad: float = RAFAGA):
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def esperar(self, url: str) -> float:
+        """Espera el turno del host de la URL y retorna los segundos esperados."""
+        esperado = self._bucket(url).adquirir()
+        if esperado:
+            METRICAS.incrementar('corfo_dormido_segundos_total', esperado, motivo='limite_tasa')
+        return esperado
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.tasa, self.capacidad)
+        return bucket
+
+    def pausar(self, url: str, segundos: float):
+        """Pausa el host de la URL (por ejemplo, por un Retry-After)."""
+        logger.info(f"{urlparse(url).netloc} pidió esperar {segundos:.1f} s (Retry-After)")
+        self._bucket(url).pausar(segundos)
+
+    def fijar_tasa(self, tasa: float):
+        """Cambia la tasa de todos los hosts, actuales y futuros."""
+        with self.lock:
+            self.tasa = tasa
+            buckets = list(self.buckets.values())
+        for bucket in buckets:
+            with bucket.lock:
+                bucket.tasa = tasa
+
+
+class ControladorAIMD:
+    """
+    Concurrencia y tasa adaptativas (aumento aditivo, reducción multiplicativa).
+
+    Cada ventana de respuestas sin errores y con el p95 de la latencia bajo el umbral
+    suma un request simultáneo y INCREMENTO_TASA a la tasa, pero solo al límite que
+    efectivamente frenó a los workers en esa ventana: la concurrencia si algún request
+    esperó un cupo, la tasa si las respuestas llegaron a USO_TASA de ella. Un error de red, un 429/5xx o un
+    p95 sobre el umbral reducen ambos a la mitad, una vez por ventana. El umbral es
+    latencia_objetivo o, si no se indica, FACTOR_PICO veces la latencia base (el menor
+    p50 observado por ventana).
+    """
+
+    def __init__(self, limitador: LimitadorPorHost, concurrencia: int, tasa: float,
+                 concurrencia_maxima: int = CONCURRENCIA_TOPE, tasa_maxima: float = TASA_TOPE,
+                 latencia_objetivo: Optional[float] = None, etapa: str = 'detalle'):
+        self.limitador = limitador
+        self.concurrencia_maxima = max(1, concurrencia_maxima)
+        self.concurrencia = min(max(1, concurrencia), self.concurrencia_maxima)
+        self.tasa_minima = min(tasa, 0.5)
+        self.tasa_maxima = max(tasa, tasa_maxima)
+        self.tasa = tasa
+        self.latencia_objetivo = latencia_objetivo
+        self.latencia_base = None
+        self.etapa = etapa
+        self.en_vuelo = 0
+        self.respuestas = 0  # respuestas de la ventana actual, incluidos los errores
+        self.latencias: List[float] = []  # latencias de las respuestas sanas de la ventana
+        self.redujo = False  # la ventana actual ya redujo la concurrencia
+        self.limitada_concurrencia = False  # algún request esperó por la concurrencia en la ventana
+        self.inicio_ventana = time.monotonic()
+        self.condicion = threading.Condition()
+        self.limitador.fijar_tasa(self.tasa)
+        self._publicar()
+
+    def _publicar(self):
+        METRICAS.fijar('corfo_concurrencia', self.concurrencia, etapa=self.etapa)
+        METRICAS.fijar('corfo_tasa_requests', self.tasa, etapa=self.etapa)
+
+    def adquirir(self):
+        """Bloquea mientras haya tantos requests en curso como la concurrencia actual."""
+        with self.condicion:
+            while self.en_vuelo >= self.concurrencia:
+                self.limitada_concurrencia = True
+                self.condicion.wait()
+            self.en_vuelo += 1
+
+    def liberar(self):
+        with self.condicion:
+            self.en_vuelo -= 1
+            self.condicion.notify_all()
+
+    def umbral(self) -> Optional[float]:
+        """p95 de latencia sobre el cual se reduce la concurrencia."""
+        if self.latencia_objetivo is not None:
+            return self.latencia_objetivo
+        if self.latencia_base is None:
+            return None
+        return max(FACTOR_PICO * self.latencia_base, LATENCIA_MINIMA_PICO)
+
+    def registrar(self, segundos: Optional[float], estado: Optional[int]):
+        """Registra una respuesta (estado None para errores de red) y ajusta al cerrar la ventana."""
+        with self.condicion:
+            self.respuestas += 1
+            if estado is None or estado in ESTADOS_SATURACION:
+                if not self.redujo:
+                    self._ajustar('baja', f'estado {estado}' if estado else 'error de red')
+                    self.redujo = True
+            else:
+                self.latencias.append(segundos)
+            if self.respuestas < max(self.concurrencia, VENTANA_MINIMA):
+                return
+
+            ahora = time.monotonic()
+            if self.latencias and not self.redujo:
+                p50, p95 = np.percentile(self.latencias, [50, 95])
+                umbral = self.umbral()
+                limitada_tasa = self.respuestas / max(ahora - self.inicio_ventana, 1e-6) >= USO_TASA * self.tasa
+                if umbral is not None and p95 > umbral:
+                    self._ajustar('baja', f'p95 {p95:.3f} s sobre {umbral:.3f} s')
+                elif self.limitada_concurrencia or limitada_tasa:
+                    self._ajustar('sube', f'p95 {p95:.3f} s', self.limitada_concurrencia, limitada_tasa)
+                self.latencia_base = p50 if self.latencia_base is None else min(self.latencia_base, p50)
+            self.respuestas = 0
+            self.latencias = []
+            self.redujo = False
+            self.limitada_concurrencia = False
+            self.inicio_ventana = ahora
+
+    def _ajustar(self, direccion: str, motivo: str, subir_concurrencia: bool = True, subir_tasa: bool = True):
+        if direccion == 'sube':
+            concurrencia, tasa = self.concurrencia, self.tasa
+            if subir_concurrencia:
+                concurrencia = min(concurrencia + 1, self.concurrencia_maxima)
+            if subir_tasa:
+                tasa = min(tasa + INCREMENTO_TASA, self.tasa_maxima)
+        else:
+            concurrencia = max(1, int(self.concurrencia * FACTOR_REDUCCION))
+            tasa = max(self.tasa * FACTOR_REDUCCION, self.tasa_minima)
+        if (concurrencia, tasa) == (self.concurrencia, self.tasa):
+            return
+        logger.info(f"Control adaptativo ({motivo}): concurrencia {self.concurrencia} -> {concurrencia}, "
+                    f"tasa {self.tasa:.1f} -> {tasa:.1f} requests/s")
+        self.concurrencia, self.tasa = concurrencia, tasa
+        self.limitador.fijar_tasa(tasa)
+        METRICAS.incrementar('corfo_ajustes_total', etapa=self.etapa, direccion=direccion)
+        self._publicar()
+        self.condicion.notify_all()
+
+
+def registrar_request(etapa: str, response: requests.Response, segundos: float):
+    """Registra en METRICAS la latencia, el código de estado y los bytes de una respuesta."""
+    METRICAS.incrementar('corfo_requests_total', etapa=etapa, estado=response.status_code)
+    METRICAS.observar('corfo_request_segundos', segundos, etapa=etapa)
+    METRICAS.incrementar('corfo_bytes_total', len(response.content), etapa=etapa)
+
+
+def crear_sesion(pool_size: int = WORKERS) -> requests.Session:
+    """Crea una sesión keep-alive con un pool de conexiones del tamaño indicado."""
+    sesion = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    sesion.mount('http://', adaptador)
+    sesion.mount('https://', adaptador)
+    sesion.headers.update({'User-Agent': USER_AGENT})
+    return sesion
+
+
+class MotorDescarga:
+    """Descarga URLs en paralelo respetando un límite de tasa por host."""
+
+    def __init__(self, workers: int = WORKERS, tasa_por_host: float = TASA_POR_HOST,
+                 rafaga: float = RAFAGA, timeout: int = TIMEOUT,
+                 sesion: Optional[requests.Session] = None, cache: Optional[CacheHTTP] = None,
+                 base_url: Optional[str] = None, etapa: str = 'detalle', adaptativo: bool = False,
+                 concurrencia_maxima: int = CONCURRENCIA_TOPE, tasa_maxima: float = TASA_TOPE,
+                 politica: Optional[PoliticaReintentos] = None, cortacircuito: Optional[Cortacircuito] = None):
+        # En modo adaptativo workers y tasa_por_host son los valores iniciales del controlador
+        self.workers = max(workers, concurrencia_maxima) if adaptativo else workers
+        self.etapa = etapa  # etiqueta de las métricas
+        self.base_url = base_url  # las URLs se siguen identificando por su dirección en corfo.cl
+        self.cache = cache
+        self.timeout = timeout
+        self.sesion = sesion or crear_sesion(self.workers)
+        self.limitador = LimitadorPorHost(tasa_por_host, rafaga)
+        self.control = ControladorAIMD(self.limitador, workers, tasa_por_host, concurrencia_maxima,
+                                       tasa_maxima, etapa=etapa) if adaptativo else None
+        self.politica = politica or PoliticaReintentos()
+        self.cortacircuito = cortacircuito or Cortacircuito(etapa=etapa)
+        self.intentos: Dict[str, int] = {}  # URL -> intentos de esta ejecución que terminaron en error
+        self.paginas = 0
+        self.errores = 0  # URLs que agotaron sus reintentos
+        self.reintentos = 0
+        self.sin_cambios = 0
+        self.inicio = None
+        self.lock = threading.Lock()
+
+    def descargar(self, url: str, cabeceras: Optional[Dict[str, str]] = None) -> requests.Response:
+        """Descarga una URL esperando su turno en el limitador del host."""
+        url = redirigir(url, self.base_url)
+        self.limitador.esperar(url)
+        if self.control is not None:
+            # El cupo de concurrencia se toma después del token: solo cuenta requests en curso
+            self.control.adquirir()
+        try:
+            inicio = time.perf_counter()
+            try:
+                response = self.sesion.get(url, headers=cabeceras, timeout=self.timeout)
+            except requests.RequestException as e:
+                METRICAS.incrementar('corfo_requests_total', etapa=self.etapa, estado=type(e).__name__)
+                if self.control is not None:
+                    self.control.registrar(None, None)
+                raise
+            segundos = time.perf_counter() - inicio
+            registrar_request(self.etapa, response, segundos)
+            if self.control is not None:
+                self.control.registrar(segundos, response.status_code)
+        finally:
+            if self.control is not None:
+                self.control.liberar()
+
+        espera = leer_retry_after(response.headers.get('Retry-After'))
+        if espera and response.status_code in (429, 503):
+            self.limitador.pausar(url, espera)
+            METRICAS.incrementar('corfo_dormido_segundos_total', espera, motivo='retry_after')
+        response.raise_for_status()
+        return response
+
+    def _tarea(self, url: str, procesar: Callable[[str, requests.Response], Any]) -> Any:
+        if self.cache is None:
+            return procesar(url, self.descargar(url))
+
+        # Solo se puede omitir el parseo si hay datos extraídos previamente
+        entrada = self.cache.obtener(url)
+        if entrada is not None and entrada['datos'] is None:
+            entrada = None
+        response = self.descargar(url, self.cache.cabeceras_condicionales(entrada))
+
+        if entrada is not None and (response.status_code == 304
+                                    or hash_contenido(response.content) == entrada['hash']):
+            # Un 200 con el mismo contenido (o un 304) puede traer validadores nuevos
+            self.cache.tocar(url, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            with self.lock:
+                self.sin_cambios += 1
+            METRICAS.incrementar('corfo_cache_total', etapa=self.etapa, resultado='sin_cambios')
+            return entrada['datos']
+
+        METRICAS.incrementar('corfo_cache_total', etapa=self.etapa,
+                             resultado='modificada' if entrada is not None else 'nueva')
+        resultado = procesar(url, response)
+        self.cache.guardar(url, response.content, response.headers.get('ETag'),
+                           response.headers.get('Last-Modified'), resultado)
+        return resultado
+
+    def procesar_url(self, url: str, procesar: Callable[[str, requests.Response], Any]
+                     ) -> Tuple[Any, Optional[Exception]]:
+        """Hace un intento de descargar y procesar una URL; retorna (resultado, error)."""
+        with self.lock:
+            if self.inicio is None:
+                self.inicio = time.monotonic()
+        self.cortacircuito.esperar()
+        try:
+            resultado = self._tarea(url, procesar)
+        except Exception as e:
+            self.cortacircuito.fallo(e)
+            with self.lock:
+                self.intentos[url] = self.intentos.get(url, 0) + 1
+            return None, e
+        self.cortacircuito.exito()
+        with self.lock:
+            self.paginas += 1
+            self.intentos.pop(url, None)
+        METRICAS.incrementar('corfo_paginas_total', etapa=self.etapa)
+        return resultado, None
+
+    def reintentar(self, url: str, error: Exception) -> Optional[float]:
+        """
+        Decide si una URL fallida se reintenta: retorna los segundos de backoff, o None si
+        agotó sus intentos o el fallo no es reintentable (queda contada como error).
+        """
+        categoria = clasificar(error)
+        intento = self.intentos.get(url, 1)
+        if self.politica.reintentar(error, intento):
+            espera = self.politica.espera(intento)
+            with self.lock:
+                self.reintentos += 1
+            METRICAS.incrementar('corfo_reintentos_total', etapa=self.etapa, tipo=categoria)
+            logger.warning(f"Intento {intento} de {url} falló ({categoria}: {error}); "
+                           f"se reintenta en {espera:.1f} s")
+            return espera
+        with self.lock:
+            self.errores += 1
+        METRICAS.incrementar('corfo_errores_total', etapa=self.etapa, tipo=categoria)
+        return None
+
+    def procesar_con_reintentos(self, url: str, procesar: Callable[[str, requests.Response], Any]
+                                ) -> Tuple[Any, Optional[Exception]]:
+        """Como procesar_url, pero reintenta en el mismo hilo hasta agotar la política."""
+        while True:
+            resultado, error = self.procesar_url(url, procesar)
+            if error is None:
+                return resultado, None
+            espera = self.reintentar(url, error)
+            if espera is None:
+                return None, error
+            METRICAS.dormir(espera, 'reintento')
+
+    def procesar(self, urls: Iterable[str], procesar: Callable[[str, requests.Response], Any]
+                 ) -> Iterator[Tuple[str, Any, Optional[Exception]]]:
+        """
+        Descarga las URLs con concurrencia acotada y aplica `procesar` a cada respuesta.
+
+        Retorna tuplas (url, resultado, error) a medida que se completan; `error`
+        es None cuando la descarga y el procesamiento fueron exitosos, y en otro caso
+        el último error de la URL tras agotar sus reintentos. Las URLs a reintentar
+        esperan su backoff en una cola ordenada por instante, sin ocupar un worker.
+        """
+        self.inicio = time.monotonic()
+        programados = []  # heap (instante, orden, url) de reintentos pendientes
+        orden = itertools.count()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futuros = {executor.submit(self.procesar_url, url, procesar): url for url in urls}
+            while futuros or programados:
+                ahora = time.monotonic()
+                while programados and programados[0][0] <= ahora:
+                    url = heapq.heappop(programados)[2]
+                    futuros[executor.submit(self.procesar_url, url, procesar)] = url
+                espera = programados[0][0] - ahora if programados else None
+                if not futuros:
+                    time.sleep(espera)
+                    continue
+                listos, _ = wait(futuros, timeout=espera, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    url = futuros.pop(futuro)
+                    resultado, error = futuro.result()
+                    if error is not None:
+                        backoff = self.reintentar(url, error)
+                        if backoff is not None:
+                            heapq.heappush(programados, (time.monotonic() + backoff, next(orden), url))
+                            continue
+                    yield url, resultado, error
+
+    def estadisticas(self) -> Dict[str, float]:
+        """Retorna páginas descargadas, sin cambios, errores, páginas/s y la concurrencia y tasa adaptativas."""
+        segundos = time.monotonic() - self.inicio if self.inicio else 0.0
+        stats = {
+            'paginas': self.paginas,
+            'errores': self.errores,
+            'reintentos': self.reintentos,
+            'sin_cambios': self.sin_cambios,
+            'segundos': round(segundos, 2),
+            'paginas_por_segundo': round(self.paginas / segundos, 2) if segundos else 0.0
+        }
+        if self.control is not None:
+            stats['concurrencia'] = self.control.concurrencia
+            stats['tasa'] = round(self.control.tasa, 2)
+        return stats
+
+    def cerrar(self):
+        """Cierra la sesión HTTP y el cache, si existe."""
+        self.sesion.close()
+        if self.cache is not None:
+            self.cache.cerrar()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Métricas de Ejecución
+Versión B01 - Contadores, histogramas y reporte legible por máquinas
+
+Este módulo reemplaza el análisis de líneas de log por métricas numéricas de cada
+etapa: páginas procesadas, latencia de los requests, comandos WebDriver por página,
+reintentos, bytes transferidos y tiempo dormido (reintentos, límite de tasa y
+esperas del listado). Todas las etapas registran en METRICAS, un registro seguro
+entre hilos, que al finalizar se exporta como reporte JSON y en el formato de texto
+de Prometheus:
+
+    python corfo_scraper_lista_b01.py --metricas metricas_lista.json
+    # genera metricas_lista.json y metricas_lista.prom
+
+Los histogramas usan cubetas fijas, como los de Prometheus; los percentiles del
+reporte JSON se estiman interpolando dentro de la cubeta correspondiente.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Cubetas por defecto
+CUBETAS_SEGUNDOS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+CUBETAS_COMANDOS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Métricas conocidas: nombre -> (tipo, ayuda, cubetas)
+DEFINICIONES = {
+    'corfo_paginas_total': ('counter', 'Páginas procesadas por etapa', None),
+    'corfo_pagina_segundos': ('histogram', 'Duración del procesamiento de una página', CUBETAS_SEGUNDOS),
+    'corfo_requests_total': ('counter', 'Requests HTTP por etapa y código de estado', None),
+    'corfo_request_segundos': ('histogram', 'Latencia de los requests HTTP', CUBETAS_SEGUNDOS),
+    'corfo_bytes_total': ('counter', 'Bytes transferidos por etapa', None),
+    'corfo_webdriver_comandos_total': ('counter', 'Comandos WebDriver enviados', None),
+    'corfo_webdriver_comandos_por_pagina': ('histogram', 'Comandos WebDriver por página', CUBETAS_COMANDOS),
+    'corfo_reintentos_total': ('counter', 'Reintentos por etapa y tipo de error', None),
+    'corfo_errores_total': ('counter', 'Errores por etapa y tipo', None),
+    'corfo_dormido_segundos_total': ('counter', 'Segundos dormidos por motivo', None),
+    'corfo_espera_segundos': ('histogram', 'Duración de las esperas del listado', CUBETAS_SEGUNDOS),
+    'corfo_parseo_segundos': ('histogram', 'Tiempo de parseo de una página', CUBETAS_SEGUNDOS),
+    'corfo_cache_total': ('counter', 'Consultas al cache HTTP por resultado', None),
+    'corfo_fichas_total': ('counter', 'Fichas de detalle procesadas por resultado de la extracción', None),
+    'corfo_concurrencia': ('gauge', 'Requests simultáneos permitidos por el control adaptativo', None),
+    'corfo_tasa_requests': ('gauge', 'Requests por segundo por host permitidos por el control adaptativo', None),
+    'corfo_ajustes_total': ('counter', 'Ajustes del control adaptativo por dirección', None),
+    'corfo_cortacircuito_abierto': ('gauge', 'Cortacircuito abierto (1) o cerrado (0) por etapa', None),
+    'corfo_cortacircuito_aperturas_total': ('counter', 'Veces que se abrió el cortacircuito por etapa', None),
+    'corfo_fallidos_total': ('counter', 'Ítems enviados a la tabla de fallidos por etapa y categoría', None)
+}
+
+Etiquetas = Tuple[Tuple[str, str], ...]
+
+
+def _etiquetas(etiquetas: Dict[str, object]) -> Etiquetas:
+    return tuple(sorted((clave, str(valor)) for clave, valor in etiquetas.items()))
+
+
+def _formato_etiquetas(etiquetas: Etiquetas, extra: Optional[Tuple[str, str]] = None) -> str:
+    pares = list(etiquetas) + ([extra] if extra else [])
+    if not pares:
+        return ''
+    texto = ','.join(f'{clave}="{valor}"'.replace('\n', ' ') for clave, valor in pares)
+    return '{' + texto + '}'
+
+
+class Histograma:
+    """Histograma de cubetas fijas con suma, cantidad, mínimo y máximo."""
+
+    def __init__(self, cubetas: Sequence[float]):
+        self.cubetas = tuple(cubetas)
+        self.cuentas = [0] * (len(self.cubetas) + 1)  # la última cubeta es +Inf
+        self.suma = 0.0
+        self.cantidad = 0
+        self.minimo = None
+        self.maximo = None
+
+    def observar(self, valor: float):
+        self.cuentas[bisect.bisect_left(self.cubetas, valor)] += 1
+        self.suma += valor
+        self.cantidad += 1
+        self.minimo = valor if self.minimo is None else min(self.minimo, valor)
+        self.maximo = valor if self.maximo is None else max(self.maximo, valor)
+
+    def cuantil(self, q: float) -> Optional[float]:
+        """Estimación del cuantil q interpolando dentro de la cubeta, como histogram_quantile."""
+        if not self.cantidad:
+            return None
+        objetivo = q * self.cantidad
+        acumulado = 0
+        for i, cuenta in enumerate(self.cuentas):
+            if acumulado + cuenta >= objetivo and cuenta:
+                inferior = self.cubetas[i - 1] if i > 0 else min(self.minimo, self.cubetas[0])
+                superior = self.cubetas[i] if i < len(self.cubetas) else self.maximo
+                estimado = inferior + (superior - inferior) * (objetivo - acumulado) / cuenta
+                return min(max(estimado, self.minimo), self.maximo)
+            acumulado += cuenta
+        return self.maximo
+
+    def resumen(self) -> Dict:
+        return {
+            'cantidad': self.cantidad,
+            'suma': round(self.suma, 6),
+            'promedio': round(self.suma / self.cantidad, 6) if self.cantidad else None,
+            'min': self._redondear(self.minimo),
+            'max': self._redondear(self.maximo),
+            'p50': self._redondear(self.cuantil(0.5)),
+            'p95': self._redondear(self.cuantil(0.95)),
+            'p99': self._redondear(self.cuantil(0.99))
+        }
+
+    @staticmethod
+    def _redondear(valor: Optional[float]) -> Optional[float]:
+        return round(valor, 6) if valor is not None else None
+
+
+class RegistroMetricas:
+    """Contadores, medidores e histogramas con etiquetas, seguros entre hilos."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.inicio = time.time()
+        self.tipos: Dict[str, str] = {}
+        self.ayudas: Dict[str, str] = {}
+        self.cubetas: Dict[str, Sequence[float]] = {}
+        self.valores: Dict[str, Dict[Etiquetas, object]] = {}
+
+    def _serie(self, nombre: str, tipo: str):
+        if nombre not in self.tipos:
+            definido, ayuda, cubetas = DEFINICIONES.get(nombre, (tipo, '', None))
+            self.tipos[nombre] = definido
+            self.ayudas[nombre] = ayuda
+            self.cubetas[nombre] = cubetas or CUBETAS_SEGUNDOS
+            self.valores[nombre] = {}
+        if self.tipos[nombre] != tipo:
+            raise ValueError(f"La métrica {nombre} es de tipo {self.tipos[nombre]}, no {tipo}")
+        return self.valores[nombre]
+
+    def incrementar(self, nombre: str, valor: float = 1, **etiquetas):
+        """Suma `valor` a un contador."""
+        clave = _etiquetas(etiquetas)
+        with self.lock:
+            serie = self._serie(nombre, 'counter')
+            serie[clave] = serie.get(clave, 0) + valor
+
+    def fijar(self, nombre: str, valor: float, **etiquetas):
+        """Fija el valor actual de un medidor (gauge)."""
+        with self.lock:
+            self._serie(nombre, 'gauge')[_etiquetas(etiquetas)] = valor
+
+    def observar(self, nombre: str, valor: float, **etiquetas):
+        """Agrega una observación a un histograma."""
+        clave = _etiquetas(etiquetas)
+        with self.lock:
+            serie = self._serie(nombre, 'histogram')
+            if clave not in serie:
+                serie[clave] = Histograma(self.cubetas[nombre])
+            serie[clave].observar(valor)
+
+    @contextmanager
+    def cronometrar(self, nombre: str, **etiquetas):
+        """Observa en un histograma la duración del bloque."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nombre, time.perf_counter() - inicio, **etiquetas)
+
+    def dormir(self, segundos: float, motivo: str):
+        """time.sleep que registra el tiempo dormido."""
+        time.sleep(segundos)
+        self.incrementar('corfo_dormido_segundos_total', segundos, motivo=motivo)
+
+    def valor(self, nombre: str, **etiquetas) -> float:
+        """Valor actual de un contador o medidor (0 si no existe)."""
+        with self.lock:
+            return self.valores.get(nombre, {}).get(_etiquetas(etiquetas), 0)
+
+    def reiniciar(self):
+        """Descarta todas las series (por ejemplo, entre ejecuciones de un mismo proceso)."""
+        with self.lock:
+            self.inicio = time.time()
+            for serie in self.valores.values():
+                serie.clear()
+
+    def reporte(self) -> Dict:
+        """Reporte JSON: cada serie con sus etiquetas; los contadores incluyen su tasa por segundo."""
+        with self.lock:
+            duracion = time.time() - self.inicio
+            metricas = {}
+            for nombre, serie in sorted(self.valores.items()):
+                tipo = self.tipos[nombre]
+                series = []
+                for etiquetas, valor in sorted(serie.items()):
+                    entrada = {'etiquetas': dict(etiquetas)}
+                    if tipo == 'histogram':
+                        entrada.update(valor.resumen())
+                    else:
+                        entrada['valor'] = round(valor, 6)
+                        if tipo == 'counter' and duracion > 0:
+                            entrada['por_segundo'] = round(valor / duracion, 3)
+                    series.append(entrada)
+                metricas[nombre] = {'tipo': tipo, 'ayuda': self.ayudas[nombre], 'series': series}
+        return {
+            'inicio': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.inicio)),
+            'duracion_s': round(duracion, 3),
+            'metricas': metricas
+        }
+
+    def prometheus(self) -> str:
+        """Métricas en el formato de texto de Prometheus (versión 0.0.4)."""
+        lineas: List[str] = []
+        with self.lock:
+            for nombre, serie in sorted(self.valores.items()):
+                tipo = self.tipos[nombre]
+                if self.ayudas[nombre]:
+                    lineas.append(f'# HELP {nombre} {self.ayudas[nombre]}')
+                lineas.append(f'# TYPE {nombre} {tipo}')
+                for etiquetas, valor in sorted(serie.items()):
+                    if tipo != 'histogram':
+                        lineas.append(f'{nombre}{_formato_etiquetas(etiquetas)} {valor}')
+                        continue
+                    acumulado = 0
+                    for limite, cuenta in zip(list(valor.cubetas) + ['+Inf'], valor.cuentas):
+                        acumulado += cuenta
+                        lineas.append(f'{nombre}_bucket{_formato_etiquetas(etiquetas, ("le", str(limite)))} '
+                                      f'{acumulado}')
+                    lineas.append(f'{nombre}_sum{_formato_etiquetas(etiquetas)} {valor.suma}')
+                    lineas.append(f'{nombre}_count{_formato_etiquetas(etiquetas)} {valor.cantidad}')
+        return '\n'.join(lineas) + '\n'
+
+    def guardar(self, archivo: str):
+        """Escribe el reporte JSON en `archivo` y el texto de Prometheus junto a él (.prom)."""
+        with open(archivo, 'w', encoding='utf-8') as f:
+            json.dump(self.reporte(), f, ensure_ascii=False, indent=2)
+        with open(os.path.splitext(archivo)[0] + '.prom', 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+
+
+class ContadorComandos:
+    """Cuenta los comandos WebDriver de una etapa envolviendo el método execute de cada driver."""
+
+    def __init__(self, registro: RegistroMetricas, etapa: str):
+        self.registro = registro
+        self.etapa = etapa
+        self.total = 0
+        self.marca = 0
+
+    def instalar(self, driver):
+        """Envuelve driver.execute; un driver ya envuelto (por ejemplo, al restaurarlo) no se envuelve de nuevo."""
+        if getattr(driver, '_contador_comandos', None) is self:
+            return
+        ejecutar = driver.execute
+
+        def execute(comando, parametros=None):
+            self.total += 1
+            self.registro.incrementar('corfo_webdriver_comandos_total', etapa=self.etapa, comando=comando)
+            return ejecutar(comando, parametros)
+
+        driver.execute = execute
+        driver._contador_comandos = self
+
+    def pagina(self) -> int:
+        """Registra y retorna los comandos enviados desde la página anterior."""
+        comandos, self.marca = self.total - self.marca, self.total
+        self.registro.observar('corfo_webdriver_comandos_por_pagina', comandos, etapa=self.etapa)
+        return comandos
+
+
+# Registro compartido por todas las etapas del proceso
+METRICAS = RegistroMetricas()
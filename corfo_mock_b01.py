@@ -0,0 +1,432 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Sitio CORFO Simulado
+Versión B01 - Servidor local para pruebas de carga sin red
+
+Este módulo entrega una aplicación Flask (fábrica create_app, como app/__init__.py)
+que reemplaza a corfo.cl durante las pruebas: sirve el listado de convocatorias con
+las cajas, la paginación (getRedirectNext), los checkboxes de estado y de FILTROS y
+las funciones funcSearch/removeAllFiltros que usan los scrapers con Selenium, además
+de las fichas de detalle en los formatos antiguo y nuevo.
+
+Las convocatorias se generan de forma determinista a partir de una semilla. La
+latencia, su variación, la tasa de errores (500/502/503/429, con Retry-After) y la
+cantidad de páginas son configurables al iniciar o en caliente con POST /__mock__/config;
+si una URL falla, el fallo depende solo de la semilla, la URL y el número de intento,
+de modo que cada prueba se puede repetir. Con una capacidad (--capacidad) el sitio se
+comporta como un servidor saturable: sobre esa cantidad de requests simultáneos la
+latencia crece en proporción y sobre el doble responde 429, lo que permite probar el
+control adaptativo de concurrencia de corfo_http_b01:
+
+    python corfo_mock_b01.py --puerto 5001 --paginas 50 --latencia 0.2 --tasa-error 0.05
+    python corfo_scraper_lista_b01.py --mode http --base-url http://127.0.0.1:5001
+    python corfo_detalle_scraper_b01.py --base-url http://127.0.0.1:5001
+
+Con --grabacion el listado deja de generarse y se sirven las páginas grabadas con
+--grabar del scraper de lista (listado_NNNN.html según el parámetro page), de modo que
+las pruebas de carga usan el marcado real del sitio con la latencia y los errores simulados:
+
+    python corfo_mock_b01.py --grabacion tests/fixtures/listado --latencia 0.1
+"""
+
+import argparse
+import hashlib
+import html
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Set
+
+from flask import Flask, Response, abort, jsonify, request
+from lxml import html as lxml_html
+
+from corfo_esquema_b01 import FILTROS, inner_html
+
+logger = logging.getLogger(__name__)
+
+# Configuración por defecto
+RUTA_LISTADO = '/sites/cpp/programasyconvocatorias'
+RUTA_FICHAS = '/sites/cpp/convocatorias'
+PUERTO = 5001
+PAGINAS = 20
+POR_PAGINA = 12
+LATENCIA = 0.0  # segundos por request
+VARIACION_LATENCIA = 0.0  # fracción de variación aleatoria de la latencia
+TASA_ERROR = 0.0  # fracción de requests que responden con error
+CODIGOS_ERROR = (500, 502, 503, 429)
+RETRY_AFTER = 1  # segundos informados en Retry-After (503 y 429)
+CAPACIDAD = 0  # requests simultáneos a latencia nominal (0 = sin límite)
+SEMILLA = 1
+PROBABILIDAD_FILTRO = 0.3  # fracción de convocatorias que pertenece a cada filtro
+GRABACION = None  # directorio con páginas del listado grabadas (None = listado generado)
+
+MESES = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio', 'agosto',
+         'septiembre', 'octubre', 'noviembre', 'diciembre']
+IDS_FILTRO = [filtro_id for grupo in FILTROS.values() for filtro_id in grupo['filtros'].values()]
+
+
+def fraccion(*partes) -> float:
+    """Número en [0, 1) derivado de las partes; el mismo para las mismas partes."""
+    resumen = hashlib.sha256(':'.join(str(parte) for parte in partes).encode('utf-8')).digest()
+    return int.from_bytes(resumen[:8], 'big') / 2 ** 64
+
+
+def leer_grabacion(directorio: str, pagina: int, fragmento: bool = False) -> Optional[str]:
+    """
+    Página del listado grabada con --grabar (listado_NNNN.html), o None si no se grabó.
+    Con `fragmento` retorna solo el contenido de #listSearch, como el listado generado.
+    """
+    ruta = os.path.join(directorio, f'listado_{pagina:04d}.html')
+    if pagina < 1 or not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as f:
+        contenido = f.read()
+    if fragmento:
+        lista = lxml_html.fromstring(contenido).xpath('//*[@id="listSearch"]')
+        if lista:
+            return inner_html(lista[0])
+    return contenido
+
+
+class SitioSimulado:
+    """Convocatorias generadas a partir de una semilla y su marcado HTML."""
+
+    def __init__(self, paginas: int = PAGINAS, por_pagina: int = POR_PAGINA, semilla: int = SEMILLA):
+        self.por_pagina = por_pagina
+        self.semilla = semilla
+        self.convocatorias = [self._convocatoria(i) for i in range(paginas * por_pagina)]
+        self.por_slug = {c['slug']: c for c in self.convocatorias}
+
+    def _convocatoria(self, i: int) -> Dict:
+        dia, mes = i % 28 + 1, i % 12
+        filtros = {filtro_id for filtro_id in IDS_FILTRO
+                   if fraccion(self.semilla, i, filtro_id) < PROBABILIDAD_FILTRO}
+        return {
+            'slug': f'convocatoria-{i:05d}',
+            'nombre': f'Convocatoria Simulada {i}',
+            'apertura': None if i % 13 == 6 else
+            f'{dia} de {MESES[mes]} de 2024' if i % 7 else f'{dia:02d}/{mes + 1:02d}/2024',
+            'cierre': f'{dia} de {MESES[(mes + 2) % 12]} de 2025' if i % 11 else 'No disponible',
+            'alcance': 'Nacional' if i % 3 else 'Regional',
+            'estado': 'Cerrada' if i % 5 == 0 else 'Abierta',
+            'resumen': f'Apoyo a proyectos de innovación y emprendimiento número {i}.',
+            'monto': f'{i % 9 + 1}0.000.000' if i % 3 == 0 else None,
+            'matchmaking': i % 4 == 0,
+            'formato': 'nuevo' if i % 2 == 0 else 'antiguo',
+            'filtros': filtros
+        }
+
+    def filtrar(self, estados: Set[str], filtros: Set[str]) -> List[Dict]:
+        """Convocatorias con alguno de los estados y, si hay filtros, con alguno de ellos."""
+        return [c for c in self.convocatorias
+                if c['estado'].lower() in estados and (not filtros or c['filtros'] & filtros)]
+
+    def total_paginas(self, convocatorias: List[Dict]) -> int:
+        return max(1, -(-len(convocatorias) // self.por_pagina))
+
+    def caja(self, c: Dict) -> str:
+        e = {clave: html.escape(str(valor)) for clave, valor in c.items()}
+        # Variantes del sitio que limpia el resumen: botón de Matchmaking y monto tras '<br> " -'
+        matchmaking = ('<span style="border: 2px solid #2fca70;padding: 20px;display: inline-block;">'
+                       'Plataforma Matchmaking</span>' if c['matchmaking'] else '')
+        monto = f'<br> " - cofinanciamiento hasta $ {e["monto"]}' if c['monto'] else ''
+        apertura = f'<div class="apertura">Apertura: <span>{e["apertura"]}</span></div>' if c['apertura'] else ''
+        return (
+            f'<div class="caja-resultados_uno col-md-12">'
+            f'<h4 class="titulo-cajas_fechas">{e["nombre"]}</h4>'
+            f'{apertura}'
+            f'<div class="cierre">Cierre: <span>{e["cierre"]}</span></div>'
+            f'<p>{e["resumen"]} <a href="{RUTA_FICHAS}/{e["slug"]}#bases">Ver bases</a>{matchmaking}{monto}</p>'
+            f'<div class="etiquetas"><span>Alcance: {e["alcance"]}</span> <span>Estado: {e["estado"]}</span></div>'
+            f'<div class="foot-caja_result"><a href="{RUTA_FICHAS}/{e["slug"]}">Más Información</a></div>'
+            f'</div>'
+        )
+
+    def listado(self, convocatorias: List[Dict], pagina: int) -> str:
+        """Contenido de #listSearch: cajas de la página y enlace 'Siguiente'."""
+        total = self.total_paginas(convocatorias)
+        inicio = (pagina - 1) * self.por_pagina
+        cajas = ''.join(self.caja(c) for c in convocatorias[inicio:inicio + self.por_pagina])
+        siguiente = (f'<li class="page-item"><a class="page-link" href="javascript:getRedirectNext(\'{pagina + 1}\')">'
+                     f'Siguiente</a></li>' if pagina < total else '')
+        return (f'{cajas}<nav><ul class="pagination"><li class="page-item disabled">'
+                f'<span>Página {pagina} de {total}</span></li>{siguiente}</ul></nav>')
+
+    def pagina(self, contenido: str, estados: Set[str]) -> str:
+        """Página completa del listado con los filtros y las funciones del sitio."""
+        estado = ''.join(
+            f'<label><input type="checkbox" id="pullEstado-{valor}-checkbox" value="{valor}"'
+            f'{" checked" if valor in estados else ""}> {valor.capitalize()}s</label>'
+            for valor in ('abierta', 'cerrada')
+        )
+        grupos = ''.join(
+            f'<a href="#" data-target="#{grupo["menu_id"]}" onclick="alternar(\'{grupo["menu_id"]}\'); return false;">'
+            f'{nombre.capitalize()}</a><div id="{grupo["menu_id"]}" class="collapse">'
+            + ''.join(f'<label><input type="checkbox" id="{filtro_id}"> {columna}</label>'
+                      for columna, filtro_id in grupo['filtros'].items())
+            + '</div>'
+            for nombre, grupo in FILTROS.items()
+        )
+        return f'''<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Programas y Convocatorias | CORFO (simulado)</title>
+<style>.collapse:not(.show) {{ display: none; }}</style></head>
+<body>
+<div id="filtros">
+  <div id="heading1" onclick="alternar('collapse1')">Estado</div>
+  <div id="collapse1" class="collapse">{estado}</div>
+  {grupos}
+  <button class="btn primary2 cpp-button-search" onclick="funcSearch()">Aplicar filtros</button>
+  <button class="btn primary2 cpp-button-search" onclick="removeAllFiltros()">Limpiar filtros</button>
+</div>
+<div id="listSearch">{contenido}</div>
+<script>
+function alternar(id) {{ document.getElementById(id).classList.toggle('show'); }}
+function seleccion(pagina) {{
+  var estados = [], filtros = [];
+  document.querySelectorAll('#filtros input[type=checkbox]:checked').forEach(function(c) {{
+    if (c.id.indexOf('pullEstado-') === 0) {{ estados.push(c.value); }} else {{ filtros.push(c.id); }}
+  }});
+  return '?fragmento=1&pullEstado=' + estados.join(',') + '&filtros=' + filtros.join(',') + '&page=' + pagina;
+}}
+function cargar(pagina) {{
+  fetch('{RUTA_LISTADO}' + seleccion(pagina)).then(function(r) {{
+    if (!r.ok) {{ throw new Error('HTTP ' + r.status); }}
+    return r.text();
+  }}).then(function(contenido) {{
+    var anterior = document.getElementById('listSearch');
+    var nuevo = document.createElement('div');
+    nuevo.id = 'listSearch';
+    nuevo.innerHTML = contenido;
+    anterior.parentNode.replaceChild(nuevo, anterior);
+  }});
+}}
+function funcSearch() {{ cargar(1); }}
+function getRedirectNext(pagina) {{ cargar(parseInt(pagina, 10)); }}
+function removeAllFiltros() {{
+  document.querySelectorAll('#filtros input[type=checkbox]').forEach(function(c) {{
+    if (c.id.indexOf('pullEstado-') !== 0) {{ c.checked = false; }}
+  }});
+}}
+</script>
+</body></html>'''
+
+    def ficha(self, c: Dict) -> str:
+        """Ficha de detalle en el formato de la convocatoria."""
+        e = {clave: html.escape(str(valor)) for clave, valor in c.items()}
+        if c['formato'] == 'nuevo':
+            cuerpo = (
+                f'<div class="marcoque_fase2"><h3>¿Qué es?</h3><p>{e["resumen"]} Cofinanciamiento para '
+                f'proyectos de {e["alcance"].lower()} alcance.</p></div>'
+                f'<div class="postula_fase2-cuerpodos_fase2_bloque_q_entrega"><ul><li>Hasta $ 60.000.000</li>'
+                f'<li>Asesoría técnica</li></ul></div>'
+                f'<div class="postula_fase2-der_fase2"><p>Empresas con ventas anuales sobre UF 2.400</p></div>'
+                f'<div class="diviPuntoTexto_fase2">Prototipos validados</div>'
+                f'<div class="diviPuntoTexto_fase2">Ventas aumentadas</div>'
+            )
+        else:
+            cuerpo = (
+                f'<div class="col-sm-8"><p>¿Qué es? {e["resumen"]}</p><p>Convocatoria {e["estado"].lower()}.</p>'
+                f'<div class="beneficios">Subsidio de hasta 70% del costo total.</div>'
+                f'<div class="requisitos">Personas naturales y jurídicas.</div>'
+                f'<div class="resultados_esperados">Nuevos productos en el mercado.</div></div>'
+                f'<div class="col-sm-8"><p>Contacto</p></div>'
+            )
+        return (f'<!DOCTYPE html><html lang="es"><head><meta charset="utf-8"><title>{e["nombre"]}</title></head>'
+                f'<body><h1>{e["nombre"]}</h1>{cuerpo}</body></html>')
+
+
+def create_app(config: Optional[Dict] = None) -> Flask:
+    """Fábrica de la aplicación del sitio simulado."""
+    app = Flask(__name__)
+
+    # Configuración
+    app.config.update(
+        MOCK_PAGINAS=PAGINAS,
+        MOCK_POR_PAGINA=POR_PAGINA,
+        MOCK_LATENCIA=LATENCIA,
+        MOCK_VARIACION_LATENCIA=VARIACION_LATENCIA,
+        MOCK_TASA_ERROR=TASA_ERROR,
+        MOCK_CODIGOS_ERROR=CODIGOS_ERROR,
+        MOCK_RETRY_AFTER=RETRY_AFTER,
+        MOCK_CAPACIDAD=CAPACIDAD,
+        MOCK_SEMILLA=SEMILLA,
+        MOCK_GRABACION=GRABACION
+    )
+    if config:
+        app.config.update(config)
+
+    lock = threading.Lock()
+    estado = {'sitio': None, 'intentos': Counter(), 'solicitudes': Counter(), 'errores': Counter(), 'bytes': 0,
+              'en_vuelo': 0, 'simultaneas_max': 0}
+
+    def construir_sitio():
+        estado['sitio'] = SitioSimulado(app.config['MOCK_PAGINAS'], app.config['MOCK_POR_PAGINA'],
+                                        app.config['MOCK_SEMILLA'])
+
+    construir_sitio()
+
+    def error_simulado(codigo: int) -> Response:
+        with lock:
+            estado['errores'][codigo] += 1
+        respuesta = Response(f'Error simulado {codigo}', status=codigo)
+        if codigo in (429, 503):
+            respuesta.headers['Retry-After'] = str(app.config['MOCK_RETRY_AFTER'])
+        return respuesta
+
+    @app.before_request
+    def simular_condiciones():
+        """Latencia y errores deterministas por URL e intento; saturación según la capacidad."""
+        if request.path.startswith('/__mock__'):
+            return None
+        clave = request.full_path
+        with lock:
+            estado['intentos'][clave] += 1
+            intento = estado['intentos'][clave]
+            tipo = 'listado' if request.path == RUTA_LISTADO else \
+                'ficha' if request.path.startswith(RUTA_FICHAS) else 'otro'
+            estado['solicitudes'][tipo] += 1
+            estado['en_vuelo'] += 1
+            en_vuelo = estado['en_vuelo']
+            estado['simultaneas_max'] = max(estado['simultaneas_max'], en_vuelo)
+        request.environ['mock.en_vuelo'] = True
+        semilla = app.config['MOCK_SEMILLA']
+
+        # Servidor saturado: la latencia crece con la carga y sobre el doble de la capacidad se rechaza
+        capacidad = app.config['MOCK_CAPACIDAD']
+        carga = en_vuelo / capacidad if capacidad else 0.0
+        if carga > 2:
+            return error_simulado(429)
+
+        latencia = app.config['MOCK_LATENCIA'] * max(1.0, carga) * (
+            1 + app.config['MOCK_VARIACION_LATENCIA'] * (2 * fraccion(semilla, 'latencia', clave, intento) - 1))
+        if latencia > 0:
+            time.sleep(latencia)
+
+        if fraccion(semilla, 'error', clave, intento) < app.config['MOCK_TASA_ERROR']:
+            codigos = app.config['MOCK_CODIGOS_ERROR']
+            return error_simulado(codigos[int(fraccion(semilla, 'codigo', clave, intento) * len(codigos))])
+        return None
+
+    @app.teardown_request
+    def liberar(_error=None):
+        if request.environ.pop('mock.en_vuelo', False):
+            with lock:
+                estado['en_vuelo'] -= 1
+
+    @app.after_request
+    def contar_bytes(respuesta):
+        if not request.path.startswith('/__mock__') and not respuesta.direct_passthrough:
+            with lock:
+                estado['bytes'] += len(respuesta.get_data())
+        return respuesta
+
+    @app.route(RUTA_LISTADO)
+    def listado():
+        grabacion = app.config['MOCK_GRABACION']
+        if grabacion:
+            # Las páginas grabadas ya tienen aplicados los filtros de la grabación
+            contenido = leer_grabacion(grabacion, request.args.get('page', 1, type=int),
+                                       bool(request.args.get('fragmento')))
+            if contenido is None:
+                abort(404)
+            return contenido
+        sitio = estado['sitio']
+        parametro_estado = request.args.get('pullEstado')
+        # Sin parámetros el sitio muestra solo las abiertas
+        estados = set(filter(None, (parametro_estado or 'abierta').split(',')))
+        filtros = set(filter(None, request.args.get('filtros', '').split(',')))
+        convocatorias = sitio.filtrar(estados, filtros)
+        pagina = min(max(request.args.get('page', 1, type=int), 1), sitio.total_paginas(convocatorias))
+        contenido = sitio.listado(convocatorias, pagina)
+        if request.args.get('fragmento'):
+            return contenido
+        return sitio.pagina(contenido, estados)
+
+    @app.route(f'{RUTA_FICHAS}/<slug>')
+    def ficha(slug):
+        convocatoria = estado['sitio'].por_slug.get(slug)
+        if convocatoria is None:
+            abort(404)
+        return estado['sitio'].ficha(convocatoria)
+
+    @app.route('/__mock__/config', methods=['GET', 'POST'])
+    def configuracion():
+        """Consulta o cambia la configuración en caliente (JSON con claves MOCK_*)."""
+        if request.method == 'POST':
+            cambios = {clave: valor for clave, valor in (request.get_json(silent=True) or {}).items()
+                       if clave.startswith('MOCK_')}
+            app.config.update(cambios)
+            if {'MOCK_PAGINAS', 'MOCK_POR_PAGINA', 'MOCK_SEMILLA'} & set(cambios):
+                construir_sitio()
+        return jsonify({clave: valor for clave, valor in app.config.items() if clave.startswith('MOCK_')})
+
+    @app.route('/__mock__/estadisticas')
+    def estadisticas():
+        with lock:
+            return jsonify({
+                'solicitudes': dict(estado['solicitudes']),
+                'errores': {str(codigo): cantidad for codigo, cantidad in estado['errores'].items()},
+                'reintentos': sum(intentos - 1 for intentos in estado['intentos'].values()),
+                'bytes': estado['bytes'],
+                'simultaneas_max': estado['simultaneas_max'],
+                'convocatorias': len(estado['sitio'].convocatorias)
+            })
+
+    @app.route('/__mock__/reiniciar', methods=['POST'])
+    def reiniciar():
+        """Olvida los intentos y contadores; la siguiente prueba se repite igual."""
+        with lock:
+            estado['intentos'].clear()
+            estado['solicitudes'].clear()
+            estado['errores'].clear()
+            estado['bytes'] = 0
+            estado['simultaneas_max'] = 0
+        return jsonify({'reiniciado': True})
+
+    return app
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Lee los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description='Sitio CORFO simulado para pruebas de carga')
+    parser.add_argument('--host', default='127.0.0.1', help='Interfaz donde escuchar')
+    parser.add_argument('--puerto', type=int, default=PUERTO, help='Puerto donde escuchar')
+    parser.add_argument('--paginas', type=int, default=PAGINAS, help='Páginas del listado completo')
+    parser.add_argument('--por-pagina', type=int, default=POR_PAGINA, help='Convocatorias por página')
+    parser.add_argument('--latencia', type=float, default=LATENCIA, help='Segundos de latencia por request')
+    parser.add_argument('--variacion', type=float, default=VARIACION_LATENCIA,
+                        help='Variación de la latencia (0.5 = ±50%%)')
+    parser.add_argument('--tasa-error', type=float, default=TASA_ERROR,
+                        help='Fracción de requests que responden 500/502/503/429')
+    parser.add_argument('--capacidad', type=int, default=CAPACIDAD,
+                        help='Requests simultáneos a latencia nominal; sobre el doble responde 429 (0 = sin límite)')
+    parser.add_argument('--semilla', type=int, default=SEMILLA, help='Semilla de datos, latencias y errores')
+    parser.add_argument('--grabacion', metavar='DIR', default=GRABACION,
+                        help='Sirve el listado grabado con --grabar del scraper de lista (listado_NNNN.html)')
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    app = create_app({
+        'MOCK_PAGINAS': args.paginas,
+        'MOCK_POR_PAGINA': args.por_pagina,
+        'MOCK_LATENCIA': args.latencia,
+        'MOCK_VARIACION_LATENCIA': args.variacion,
+        'MOCK_TASA_ERROR': args.tasa_error,
+        'MOCK_CAPACIDAD': args.capacidad,
+        'MOCK_SEMILLA': args.semilla,
+        'MOCK_GRABACION': args.grabacion
+    })
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    origen = f"grabación {args.grabacion}" if args.grabacion else f"{args.paginas} páginas"
+    logger.info(f"Sitio simulado en http://{args.host}:{args.puerto}{RUTA_LISTADO} "
+                f"({origen}, latencia {args.latencia} s, errores {args.tasa_error:.0%})")
+    app.run(host=args.host, port=args.puerto, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
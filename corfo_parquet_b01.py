@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Exportación Parquet
+Versión B01 - Columnas tipadas y lectura solo de lo necesario
+
+Este módulo exporta las vistas de la base de datos (lista, enriquecido o completo) a
+Parquet en lugar de CSV sin tipos:
+
+- APERTURA y CIERRE como fechas (ver corfo_fechas_b01; las que no se pueden
+  interpretar quedan nulas)
+- ALCANCE y ESTADO codificadas con diccionario (unos pocos valores repetidos)
+- filtros como booleanos y FILTROS_BITS como entero de 16 bits
+- textos largos (RESUMEN, DETALLE...) comprimidos con zstd, "No disponible" como nulo
+
+Las filas se ordenan por ESTADO y CIERRE antes de escribirse en grupos de filas con
+estadísticas (mínimo y máximo por columna), de modo que el lector puede descartar
+grupos completos sin leerlos. leer_parquet() proyecta columnas y empuja los filtros
+al escaneo:
+
+    python corfo_parquet_b01.py --exportar completo
+    python corfo_parquet_b01.py --leer corfo_convocatorias_full.parquet \\
+        --columnas NOMBRE CIERRE URL --filtro "ESTADO = Abierta and CIERRE > hoy"
+
+Requiere pyarrow.
+"""
+
+import argparse
+import logging
+import operator
+import os
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # la exportación Parquet es opcional
+    pa = ds = pq = None
+
+from corfo_db_b01 import BaseDatos, ARCHIVO_DB, ARCHIVOS_CSV, NO_DISPONIBLE, COLUMNAS_DETALLE
+from corfo_esquema_b01 import FILTROS
+from corfo_fechas_b01 import COLUMNAS_FECHA, normalizar_fechas, parsear_fecha
+
+logger = logging.getLogger(__name__)
+
+# Configuración
+ARCHIVOS_PARQUET = {etapa: os.path.splitext(archivo)[0] + '.parquet' for etapa, archivo in ARCHIVOS_CSV.items()}
+FILAS_POR_GRUPO = 5000  # filas por grupo de filas (unidad que se descarta con las estadísticas)
+COMPRESION = 'zstd'
+COLUMNAS_CATEGORIA = ['ALCANCE', 'ESTADO']
+COLUMNAS_FILTRO = [columna for grupo in FILTROS.values() for columna in grupo['filtros']]
+ORDEN_FILAS = ['ESTADO', 'CIERRE']  # estadísticas ajustadas para los filtros más comunes
+
+OPERADORES = {
+    '>=': operator.ge, '<=': operator.le, '!=': operator.ne,
+    '=': operator.eq, '>': operator.gt, '<': operator.lt
+}
+# Una condición y su separador: el valor va entre comillas si contiene ' and ' o espacios al borde
+PATRON_CONDICION = re.compile(
+    r'\s*(\w+)\s*(>=|<=|!=|=|>|<)\s*(?:"([^"]*)"|\'([^\']*)\'|([^\'"\s].*?))(?:\s+and\s+(?=\S)|\s*$)',
+    re.IGNORECASE
+)
+
+
+def requiere_pyarrow():
+    """Falla con un mensaje claro si pyarrow no está instalado."""
+    if pa is None:
+        raise RuntimeError("La exportación Parquet requiere pyarrow (pip install pyarrow)")
+
+
+def esquema(columnas: Sequence[str]) -> 'pa.Schema':
+    """Esquema Arrow de una vista: fechas, categorías con diccionario, booleanos y texto."""
+    campos = []
+    for columna in columnas:
+        if columna == 'ID':
+            tipo = pa.int32()
+        elif columna in COLUMNAS_FECHA:
+            tipo = pa.date32()
+        elif columna in COLUMNAS_CATEGORIA:
+            tipo = pa.dictionary(pa.int8(), pa.string())
+        elif columna in COLUMNAS_FILTRO:
+            tipo = pa.bool_()
+        elif columna == 'FILTROS_BITS':
+            tipo = pa.uint16()
+        else:
+            tipo = pa.string()
+        campos.append(pa.field(columna, tipo))
+    return pa.schema(campos)
+
+
+def preparar_tabla(df: pd.DataFrame) -> 'pa.Table':
+    """Convierte una vista de la base de datos en una tabla Arrow tipada y ordenada."""
+    requiere_pyarrow()
+    df = df.copy()
+    for columna in COLUMNAS_FECHA:
+        if columna in df:
+            df[columna] = normalizar_fechas(df[columna]).dt.date
+    for columna in COLUMNAS_DETALLE + ['RESUMEN']:
+        if columna in df:
+            df[columna] = df[columna].where(df[columna] != NO_DISPONIBLE)
+    for columna in COLUMNAS_FILTRO:
+        if columna in df:
+            df[columna] = df[columna].astype(bool)
+    orden = [columna for columna in ORDEN_FILAS if columna in df]
+    if orden:
+        df = df.sort_values(orden, na_position='last', kind='stable')
+    return pa.Table.from_pandas(df, schema=esquema(df.columns), preserve_index=False)
+
+
+def escribir_parquet(tabla: 'pa.Table', archivo: str, filas_por_grupo: int = FILAS_POR_GRUPO) -> str:
+    """Escribe la tabla con estadísticas por grupo de filas; reemplaza el archivo de forma atómica."""
+    requiere_pyarrow()
+    temporal = archivo + '.tmp'
+    pq.write_table(tabla, temporal, row_group_size=filas_por_grupo, compression=COMPRESION,
+                   write_statistics=True)
+    os.replace(temporal, archivo)
+    return archivo
+
+
+def exportar_parquet(db: BaseDatos, etapa: str, archivo: Optional[str] = None,
+                     filas_por_grupo: int = FILAS_POR_GRUPO) -> str:
+    """Exporta la vista de una etapa (lista, enriquecido o completo) a Parquet."""
+    archivo = archivo or ARCHIVOS_PARQUET[etapa]
+    if etapa == 'lista':
+        df = db.leer_convocatorias()
+    elif etapa == 'enriquecido':
+        df = db.leer_enriquecido(COLUMNAS_FILTRO)
+    elif etapa == 'completo':
+        df = db.leer_completo(COLUMNAS_FILTRO)
+    else:
+        raise ValueError(f"Etapa desconocida: {etapa}")
+    tabla = preparar_tabla(df)
+    escribir_parquet(tabla, archivo, filas_por_grupo)
+    logger.info(f"Exportado {etapa} a {archivo}: {tabla.num_rows} filas, "
+                f"{pq.ParquetFile(archivo).num_row_groups} grupos de filas, "
+                f"{os.path.getsize(archivo) / 1024:.1f} KB")
+    return archivo
+
+
+def valor_condicion(columna: str, texto: str, tipos: Dict[str, 'pa.DataType']):
+    """Convierte el valor de una condición al tipo de la columna ('hoy' o 'today' es la fecha actual)."""
+    tipo = tipos.get(columna)
+    if tipo is None:
+        raise ValueError(f"Columna desconocida en el filtro: {columna}")
+    if pa.types.is_date(tipo):
+        if texto.lower() in ('hoy', 'today'):
+            return date.today()
+        try:
+            return datetime.strptime(texto, '%Y-%m-%d').date()
+        except ValueError:
+            fecha = parsear_fecha(texto)
+            if fecha is None:
+                raise ValueError(f"Fecha no válida en el filtro: {texto}")
+            return fecha.date()
+    if pa.types.is_boolean(tipo):
+        return texto.lower() in ('1', 'true', 'si', 'sí')
+    if pa.types.is_integer(tipo):
+        return int(texto)
+    return texto
+
+
+def filtro_desde_texto(texto: str, tipos: Dict[str, 'pa.DataType']) -> 'ds.Expression':
+    """
+    Traduce condiciones como "ESTADO = Abierta and CIERRE > hoy" a una expresión de
+    pyarrow.dataset. Las condiciones se unen con 'and'; operadores: = != > >= < <=. Los
+    valores que contienen ' and ' van entre comillas simples o dobles
+    (NOMBRE = 'Ciencia and Tecnología'); las comillas no forman parte del valor.
+    """
+    expresion = None
+    posicion = 0
+    while expresion is None or posicion < len(texto):
+        coincidencia = PATRON_CONDICION.match(texto, posicion)
+        if not coincidencia:
+            raise ValueError(f"Condición no válida: {texto[posicion:].strip()}")
+        columna, simbolo, doble, simple, valor = coincidencia.groups()
+        valor = next(v for v in (doble, simple, valor) if v is not None)
+        parte = OPERADORES[simbolo](ds.field(columna), valor_condicion(columna, valor, tipos))
+        expresion = parte if expresion is None else expresion & parte
+        posicion = coincidencia.end()
+    return expresion
+
+
+def abrir(archivo: str) -> 'ds.Dataset':
+    """Abre un archivo (o directorio) Parquet para escanearlo sin cargarlo."""
+    requiere_pyarrow()
+    return ds.dataset(archivo, format='parquet')
+
+
+def leer_parquet(archivo: str, columnas: Optional[List[str]] = None,
+                 filtro: Union[str, 'ds.Expression', None] = None) -> pd.DataFrame:
+    """
+    Lee solo las columnas pedidas y las filas que cumplen el filtro.
+
+    El filtro puede ser texto ("ESTADO = Abierta and CIERRE > hoy") o una expresión de
+    pyarrow.dataset; los grupos de filas cuyas estadísticas lo descartan no se leen.
+    Las fechas se entregan como datetime64 y las categorías como pandas.Categorical.
+    """
+    dataset = abrir(archivo)
+    if isinstance(filtro, str):
+        filtro = filtro_desde_texto(filtro, dict(zip(dataset.schema.names, dataset.schema.types)))
+    tabla = dataset.to_table(columns=columnas, filter=filtro)
+    return tabla.to_pandas(date_as_object=False)
+
+
+def grupos_leidos(archivo: str, filtro: Union[str, 'ds.Expression', None] = None) -> Dict[str, int]:
+    """Cuenta los grupos de filas totales y los que sobreviven a las estadísticas del filtro."""
+    dataset = abrir(archivo)
+    if isinstance(filtro, str):
+        filtro = filtro_desde_texto(filtro, dict(zip(dataset.schema.names, dataset.schema.types)))
+    total = leidos = 0
+    for fragmento in dataset.get_fragments():
+        total += fragmento.num_row_groups
+        leidos += len(fragmento.split_by_row_group(filter=filtro)) if filtro is not None else fragmento.num_row_groups
+    return {'total': total, 'leidos': leidos}
+
+
+def convocatorias_vigentes(archivo: str = ARCHIVOS_PARQUET['completo'],
+                           columnas: Optional[List[str]] = None) -> pd.DataFrame:
+    """Convocatorias abiertas cuyo cierre es posterior a hoy."""
+    return leer_parquet(archivo, columnas, (ds.field('ESTADO') == 'Abierta') &
+                        (ds.field('CIERRE') > pa.scalar(date.today(), pa.date32())))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Lee los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description='Exportación y lectura Parquet de convocatorias CORFO')
+    parser.add_argument('--db', default=ARCHIVO_DB, help='Archivo SQLite')
+    parser.add_argument('--exportar', choices=list(ARCHIVOS_PARQUET), help='Exporta una etapa a Parquet')
+    parser.add_argument('--archivo', help='Archivo Parquet de salida (por defecto según la etapa)')
+    parser.add_argument('--filas-por-grupo', type=int, default=FILAS_POR_GRUPO,
+                        help='Filas por grupo de filas del archivo Parquet')
+    parser.add_argument('--leer', metavar='ARCHIVO', help='Lee un archivo Parquet exportado')
+    parser.add_argument('--columnas', nargs='+', help='(con --leer) columnas a cargar')
+    parser.add_argument('--filtro', help='(con --leer) condiciones, por ejemplo "ESTADO = Abierta and CIERRE > hoy"')
+    parser.add_argument('--salida', help='(con --leer) guarda el resultado en CSV')
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    requiere_pyarrow()
+    if args.exportar:
+        db = BaseDatos(args.db)
+        try:
+            exportar_parquet(db, args.exportar, args.archivo, args.filas_por_grupo)
+        finally:
+            db.cerrar()
+    if args.leer:
+        df = leer_parquet(args.leer, args.columnas, args.filtro)
+        grupos = grupos_leidos(args.leer, args.filtro)
+        logger.info(f"{len(df)} filas y {len(df.columns)} columnas de {args.leer} "
+                    f"({grupos['leidos']} de {grupos['total']} grupos de filas leídos)")
+        if args.salida:
+            df.to_csv(args.salida, index=False)
+            logger.info(f"Resultado guardado en {args.salida}")
+        else:
+            print(df.to_string(max_rows=20))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Pipeline en Streaming
+Versión B01 - Detalles descargados mientras el listado sigue avanzando
+
+Este script ejecuta las etapas en paralelo en lugar de en secuencia. Cada URL nueva
+que el scraper de lista guarda en la base de datos se entrega de inmediato, a través
+de una cola acotada, a los workers de detalle; cuando la cola está llena el listado
+espera (backpressure) en vez de acumular URLs en memoria. Opcionalmente el scraper
+de filtros corre al mismo tiempo con sus propios navegadores.
+
+Las convocatorias que quedaron sin detalle en una ejecución anterior (por ejemplo, si el
+proceso se interrumpió) se encolan al comenzar, antes que las URLs nuevas del listado.
+
+Al finalizar se informa la latencia de extremo a extremo de cada fila: el tiempo entre
+el primer request del listado y el momento en que su detalle quedó guardado. Con
+--metricas se guardan además las métricas de todas las etapas (corfo_metricas_b01).
+"""
+
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from corfo_scraper_lista_b01 import CorfoScraper as ScraperLista
+from corfo_scraper_filtros_b01 import CorfoScraper as ScraperFiltros
+from corfo_detalle_scraper_b01 import (
+    procesar_respuesta, limpiar_datos, WORKERS_DESCARGA, TASA_MAXIMA,
+    ARCHIVO_CACHE, TAMANO_MAXIMO_CACHE
+)
+from corfo_http_b01 import MotorDescarga, url_listado
+from corfo_cache_b01 import CacheHTTP
+from corfo_db_b01 import BaseDatos, ARCHIVO_DB
+from corfo_metricas_b01 import METRICAS
+from corfo_reintentos_b01 import clasificar
+
+logger = logging.getLogger(__name__)
+
+# Configuración
+CAPACIDAD_COLA = 50  # URLs en espera de detalle antes de frenar el listado
+ESPERA_COLA_LLENA = 0.5  # segundos antes de registrar que la cola está llena
+
+
+class Pipeline:
+    """Conecta el scraper de lista con los workers de detalle mediante una cola acotada."""
+
+    def __init__(self, modo: str = 'http', workers: int = WORKERS_DESCARGA, tasa: float = TASA_MAXIMA,
+                 capacidad_cola: int = CAPACIDAD_COLA, usar_cache: bool = True,
+                 cache_mb: int = TAMANO_MAXIMO_CACHE, filtros_workers: int = 0, ruta_db: str = ARCHIVO_DB,
+                 completo: bool = False, base_url: Optional[str] = None, adaptativo: bool = False):
+        self.modo = modo
+        self.base_url = base_url
+        self.completo = completo
+        self.filtros_workers = filtros_workers
+        self.ruta_db = ruta_db
+        self.cola = queue.Queue(maxsize=capacidad_cola)
+        cache = CacheHTTP(ARCHIVO_CACHE, cache_mb * 1024 * 1024) if usar_cache else None
+        self.motor = MotorDescarga(workers=workers, tasa_por_host=tasa, cache=cache, base_url=base_url,
+                                   adaptativo=adaptativo)
+        # En modo adaptativo hay un hilo por cada request simultáneo que el controlador puede permitir
+        self.workers = self.motor.workers
+        self.hilos_detalle: List[threading.Thread] = []
+        self.db = None
+        self.lock = threading.Lock()
+        self.inicio = None
+        self.descubiertas: Dict[str, float] = {}  # URL -> instante en que el listado la guardó
+        self.latencias: List[float] = []  # inicio -> detalle guardado, por fila
+        self.esperas_cola: List[float] = []  # listado -> detalle guardado, por fila
+        self.bloqueos_cola = 0
+        self.sin_informacion = 0
+        self.duracion_etapas: Dict[str, float] = {}
+
+    # Productor
+
+    def encolar(self, urls: List[str]):
+        """Callback del scraper de lista: entrega las URLs nuevas a los workers de detalle."""
+        for url in urls:
+            if not str(url).startswith('http'):
+                continue
+            with self.lock:
+                if url in self.descubiertas:
+                    continue
+                self.descubiertas[url] = time.monotonic()
+            try:
+                self.cola.put(url, timeout=ESPERA_COLA_LLENA)
+            except queue.Full:
+                # Backpressure: el listado espera a que los workers liberen espacio
+                with self.lock:
+                    self.bloqueos_cola += 1
+                logger.info(f"Cola de detalles llena ({self.cola.maxsize}); el listado espera")
+                if not self.poner(url):
+                    logger.error(f"No quedan workers de detalle; {url} queda sin detalle")
+
+    def poner(self, elemento) -> bool:
+        """Encola mientras quede algún worker de detalle vivo; retorna False si no queda ninguno."""
+        while True:
+            try:
+                self.cola.put(elemento, timeout=ESPERA_COLA_LLENA)
+                return True
+            except queue.Full:
+                if not any(hilo.is_alive() for hilo in self.hilos_detalle):
+                    return False
+
+    def ejecutar_lista(self):
+        """Etapa productora: recorre el listado y encola cada URL nueva."""
+        inicio = time.monotonic()
+        scraper = ScraperLista()
+        scraper.db_filename = self.ruta_db
+        scraper.base_url = url_listado(self.base_url)
+        scraper.al_agregar = self.encolar
+        scraper.incremental = not self.completo
+        try:
+            # Una ejecución anterior pudo terminar entre el guardado de una URL y el de su detalle;
+            # el listado ya no la verá como nueva, así que se encola antes de recorrerlo
+            pendientes = self.db.urls_sin_detalle()
+            if pendientes:
+                logger.info(f"{len(pendientes)} convocatorias guardadas sin detalle; se encolan primero")
+                self.encolar(pendientes)
+            if self.modo == 'http':
+                if not scraper.run_http():
+                    logger.info("Usando Selenium como respaldo...")
+                    scraper.run()
+            else:
+                scraper.run()
+        except Exception as e:
+            logger.error(f"Error en la etapa de lista: {e}")
+        finally:
+            self.duracion_etapas['lista'] = time.monotonic() - inicio
+            # Una marca de fin por worker de detalle
+            for _ in range(self.workers):
+                if not self.poner(None):
+                    break
+
+    # Consumidores
+
+    def trabajar_detalle(self):
+        """Worker de detalle: descarga, parsea y guarda cada URL apenas llega a la cola."""
+        while True:
+            url = self.cola.get()
+            if url is None:
+                return
+            try:
+                self.procesar_detalle(url)
+            except Exception as e:
+                # Un fallo de la base de datos (por ejemplo, bloqueada) no debe terminar el worker:
+                # si todos terminaran, el listado quedaría esperando espacio en la cola
+                logger.error(f"Error registrando el resultado de {url}: {e}")
+
+    def procesar_detalle(self, url: str):
+        """Descarga, parsea y guarda el detalle de una URL, o la registra en la tabla de fallidos."""
+        info, error = self.motor.procesar_con_reintentos(url, procesar_respuesta)
+        if error is None and info:
+            try:
+                self.db.upsert_detalles({url: limpiar_datos(info)})
+            except Exception as e:
+                error = e
+        if error is not None:
+            logger.error(f"Error procesando {url}: {str(error)}")
+            categoria = clasificar(error)
+            METRICAS.incrementar('corfo_fallidos_total', etapa='detalle', categoria=categoria)
+            self.db.registrar_fallido('detalle', url, categoria, str(error), self.motor.intentos.get(url, 1))
+            return
+        self.db.quitar_fallidos('detalle', [url])
+        ahora = time.monotonic()
+        METRICAS.incrementar('corfo_fichas_total', resultado='extraida' if info else 'vacia')
+        with self.lock:
+            self.latencias.append(ahora - self.inicio)
+            self.esperas_cola.append(ahora - self.descubiertas[url])
+            if not info:
+                self.sin_informacion += 1
+            procesadas = len(self.latencias)
+        if procesadas % 10 == 0:
+            logger.info(f"Detalles guardados: {procesadas} (en cola: {self.cola.qsize()})")
+
+    def ejecutar_filtros(self):
+        """Etapa de filtros en paralelo; las URLs que aún no existían se guardan como pares sueltos."""
+        inicio = time.monotonic()
+        try:
+            scraper = ScraperFiltros()
+            scraper.db_filename = self.ruta_db
+            scraper.url_convocatorias = url_listado(self.base_url)
+            scraper.ejecutar_scraping(workers=self.filtros_workers)
+        except Exception as e:
+            logger.error(f"Error en la etapa de filtros: {e}")
+        finally:
+            self.duracion_etapas['filtros'] = time.monotonic() - inicio
+
+    # Ejecución
+
+    def ejecutar(self) -> Dict:
+        """Ejecuta todas las etapas en paralelo y retorna el reporte de la ejecución."""
+        self.db = BaseDatos(self.ruta_db)
+        self.inicio = time.monotonic()
+        self.hilos_detalle = [threading.Thread(target=self.trabajar_detalle, name=f'detalle-{i}')
+                              for i in range(self.workers)]
+        hilos = [threading.Thread(target=self.ejecutar_lista, name='lista')] + self.hilos_detalle
+        if self.filtros_workers:
+            hilos.append(threading.Thread(target=self.ejecutar_filtros, name='filtros'))
+        try:
+            for hilo in hilos:
+                hilo.start()
+            for hilo in self.hilos_detalle:
+                hilo.join()
+            self.duracion_etapas['detalle'] = time.monotonic() - self.inicio
+            for hilo in hilos:
+                hilo.join()
+        finally:
+            self.motor.cerrar()
+            self.db.cerrar()
+        return self.reporte()
+
+    def reporte(self) -> Dict:
+        """Latencia de extremo a extremo por fila y duración de cada etapa."""
+        total = time.monotonic() - self.inicio
+        latencias = np.array(self.latencias)
+        esperas = np.array(self.esperas_cola)
+        stats = self.motor.estadisticas()
+
+        def percentiles(valores: np.ndarray) -> Dict[str, Optional[float]]:
+            if not len(valores):
+                return {'p50': None, 'p95': None, 'max': None}
+            return {
+                'p50': round(float(np.percentile(valores, 50)), 3),
+                'p95': round(float(np.percentile(valores, 95)), 3),
+                'max': round(float(valores.max()), 3)
+            }
+
+        return {
+            'filas_enriquecidas': len(latencias),
+            'sin_informacion': self.sin_informacion,
+            'errores_detalle': stats['errores'],
+            'reintentos_detalle': stats['reintentos'],
+            'bloqueos_cola': self.bloqueos_cola,
+            'primera_fila_s': round(float(latencias.min()), 3) if len(latencias) else None,
+            'latencia_extremo_a_extremo_s': percentiles(latencias),
+            'latencia_desde_listado_s': percentiles(esperas),
+            'etapas_s': {etapa: round(segundos, 3) for etapa, segundos in self.duracion_etapas.items()},
+            'total_s': round(total, 3)
+        }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Lee los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description='Pipeline en streaming de convocatorias CORFO')
+    parser.add_argument('--mode', choices=['selenium', 'http'], default='http',
+                        help='Modo del scraper de lista')
+    parser.add_argument('--full', action='store_true',
+                        help='Recorre el listado completo en lugar de detenerse al no encontrar novedades')
+    parser.add_argument('--workers', type=int, default=WORKERS_DESCARGA,
+                        help='Workers de detalle')
+    parser.add_argument('--tasa', type=float, default=TASA_MAXIMA,
+                        help='Máximo de requests por segundo hacia corfo.cl para los detalles')
+    parser.add_argument('--adaptativo', action='store_true',
+                        help='Ajusta concurrencia y tasa de los detalles según la respuesta del sitio (AIMD)')
+    parser.add_argument('--cola', type=int, default=CAPACIDAD_COLA,
+                        help='Capacidad de la cola entre listado y detalles')
+    parser.add_argument('--sin-cache', action='store_true',
+                        help='Descarga y parsea todas las fichas sin usar el cache HTTP')
+    parser.add_argument('--cache-mb', type=int, default=TAMANO_MAXIMO_CACHE,
+                        help='Tamaño máximo del cache HTTP en MB')
+    parser.add_argument('--filtros', type=int, default=0, metavar='N',
+                        help='Ejecuta el scraper de filtros en paralelo con N navegadores')
+    parser.add_argument('--base-url', metavar='URL',
+                        help='Sitio alternativo a https://corfo.cl (por ejemplo, corfo_mock_b01.py)')
+    parser.add_argument('--reporte', metavar='ARCHIVO',
+                        help='Guarda el reporte de latencias en formato JSON')
+    parser.add_argument('--metricas', metavar='ARCHIVO',
+                        help='Guarda el reporte de métricas en ARCHIVO (JSON) y en formato Prometheus (.prom)')
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    pipeline = Pipeline(modo=args.mode, workers=args.workers, tasa=args.tasa,
+                        capacidad_cola=args.cola, usar_cache=not args.sin_cache,
+                        cache_mb=args.cache_mb, filtros_workers=args.filtros, completo=args.full,
+                        base_url=args.base_url, adaptativo=args.adaptativo)
+    reporte = pipeline.ejecutar()
+
+    logger.info(f"Pipeline completado en {reporte['total_s']} s; etapas: {reporte['etapas_s']}")
+    logger.info(f"Filas enriquecidas: {reporte['filas_enriquecidas']} "
+                f"(primera a los {reporte['primera_fila_s']} s)")
+    logger.info(f"Latencia de extremo a extremo: {reporte['latencia_extremo_a_extremo_s']}")
+    logger.info(f"Latencia desde el listado: {reporte['latencia_desde_listado_s']}")
+    if args.reporte:
+        with open(args.reporte, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+    if args.metricas:
+        METRICAS.guardar(args.metricas)
+        logger.info(f"Métricas guardadas en {args.metricas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CORFO Web Scraper - Reintentos y Cortacircuito
+Versión B01 - Fallos clasificados, backoff con jitter y pausa cuando el sitio cae
+
+Este módulo reemplaza los reintentos fijos (tres intentos con time.sleep(5) y un
+reinicio de Chrome ante cualquier mensaje con "timeout") por tres piezas:
+
+- clasificar(): separa los fallos en red transitoria, error del servidor, fallo de
+  parseo y caída del driver, para decidir si conviene reintentar y si hace falta
+  un navegador nuevo
+- PoliticaReintentos: backoff exponencial con jitter completo por ítem
+- Cortacircuito: tras varios fallos seguidos de red o del servidor pausa todas las
+  descargas de la etapa, con una pausa que se duplica mientras el sitio siga caído
+
+Los ítems que agotan sus reintentos se guardan en la tabla `fallidos` de la base de
+datos (ver corfo_db_b01) y se pueden volver a ejecutar solos con --reintentar-fallidos.
+"""
+
+import logging
+import random
+import socket
+import threading
+import time
+from typing import Iterable, Optional
+
+import requests
+
+from corfo_metricas_b01 import METRICAS
+
+logger = logging.getLogger(__name__)
+
+# Categorías de fallo
+RED = 'red'  # conexión, timeouts, respuestas cortadas
+SERVIDOR = 'servidor'  # respuestas HTTP de error
+PARSEO = 'parseo'  # contenido inesperado o elementos ausentes
+DRIVER = 'driver'  # Chrome o chromedriver dejaron de responder
+CATEGORIAS = (RED, SERVIDOR, PARSEO, DRIVER)
+
+# Configuración por defecto
+INTENTOS = 4
+BACKOFF_BASE = 1.0  # segundos
+BACKOFF_MAXIMO = 60.0  # segundos
+UMBRAL_CORTACIRCUITO = 5  # fallos seguidos de red o servidor antes de pausar
+PAUSA_CORTACIRCUITO = 30.0  # segundos de la primera pausa
+PAUSA_MAXIMA_CORTACIRCUITO = 300.0  # segundos
+ESTADOS_REINTENTABLES = (408, 425, 429, 500, 502, 503, 504)
+
+# Mensajes de WebDriverException que indican un navegador caído
+MENSAJES_DRIVER = ('chrome not reachable', 'session deleted', 'invalid session id', 'no such session',
+                   'disconnected', 'tab crashed', 'target window already closed', 'connection refused',
+                   'max retries exceeded')
+
+
+def estado_http(error: BaseException) -> Optional[int]:
+    """Código de estado de un HTTPError de requests, o None."""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None) if isinstance(error, requests.HTTPError) else None
+
+
+def _clasificar_selenium(error: BaseException) -> str:
+    """Categoría de una excepción de Selenium (ya importado, porque la excepción existe)."""
+    from selenium.common.exceptions import (InvalidSessionIdException, NoSuchElementException,
+                                            NoSuchWindowException, StaleElementReferenceException,
+                                            TimeoutException, WebDriverException)
+
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return DRIVER
+    if isinstance(error, TimeoutException):
+        return RED  # la página o el listado no cargaron a tiempo
+    if isinstance(error, (NoSuchElementException, StaleElementReferenceException)):
+        return PARSEO
+    if isinstance(error, WebDriverException):
+        mensaje = str(error).lower()
+        if any(texto in mensaje for texto in MENSAJES_DRIVER):
+            return DRIVER
+        return RED if 'timeout' in mensaje or 'timed out' in mensaje else PARSEO
+    return PARSEO
+
+
+def clasificar(error: BaseException) -> str:
+    """Categoría de un fallo: RED, SERVIDOR, PARSEO o DRIVER."""
+    if isinstance(error, requests.HTTPError):
+        return SERVIDOR
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                          socket.timeout, ConnectionError, TimeoutError)):
+        return RED
+    # Selenium se importa solo si el fallo viene de él: las descargas HTTP no lo cargan
+    if any(tipo.__module__.startswith('selenium.') for tipo in type(error).__mro__):
+        return _clasificar_selenium(error)
+    if isinstance(error, OSError):
+        return RED
+    return PARSEO
+
+
+def sitio_caido(error: BaseException) -> bool:
+    """Indica si el fallo sugiere que el sitio no está respondiendo (red, 429 o 5xx)."""
+    categoria = clasificar(error)
+    return categoria == RED or (categoria == SERVIDOR and estado_http(error) in ESTADOS_REINTENTABLES)
+
+
+class PoliticaReintentos:
+    """Decide si reintentar un fallo y cuánto esperar (backoff exponencial con jitter completo)."""
+
+    def __init__(self, intentos: int = INTENTOS, base: float = BACKOFF_BASE, maximo: float = BACKOFF_MAXIMO,
+                 reintentables: Iterable[str] = (RED, SERVIDOR, DRIVER), semilla: Optional[int] = None):
+        self.intentos = intentos
+        self.base = base
+        self.maximo = maximo
+        self.reintentables = frozenset(reintentables)
+        self.azar = random.Random(semilla)
+
+    def reintentar(self, error: BaseException, intento: int) -> bool:
+        """Indica si corresponde otro intento después del intento número `intento` (desde 1)."""
+        if intento >= self.intentos or clasificar(error) not in self.reintentables:
+            return False
+        estado = estado_http(error)
+        return estado is None or estado in ESTADOS_REINTENTABLES
+
+    def espera(self, intento: int) -> float:
+        """Segundos antes del siguiente intento: uniforme entre 0 y base * 2^(intento - 1), acotado."""
+        return self.azar.uniform(0, min(self.maximo, self.base * 2 ** (intento - 1)))
+
+
+class Cortacircuito:
+    """
+    Pausa una etapa completa mientras el sitio no responde.
+
+    Cerrado: los requests pasan. Tras `umbral` fallos seguidos de red o del servidor
+    se abre y todos los workers esperan `pausa` segundos; luego pasa a semiabierto y
+    deja pasar un solo request de prueba. Si la prueba funciona se cierra; si falla se
+    vuelve a abrir con el doble de pausa, hasta `pausa_maxima`.
+    """
+
+    def __init__(self, umbral: int = UMBRAL_CORTACIRCUITO, pausa: float = PAUSA_CORTACIRCUITO,
+                 pausa_maxima: float = PAUSA_MAXIMA_CORTACIRCUITO, etapa: str = 'detalle'):
+        self.umbral = umbral
+        self.pausa_inicial = pausa
+        self.pausa = pausa
+        self.pausa_maxima = pausa_maxima
+        self.etapa = etapa
+        self.estado = 'cerrado'
+        self.fallos_seguidos = 0
+        self.abierto_hasta = 0.0
+        self.prueba_en_curso = False
+        self.condicion = threading.Condition()
+        METRICAS.fijar('corfo_cortacircuito_abierto', 0, etapa=etapa)
+
+    def esperar(self):
+        """Bloquea mientras el circuito esté abierto o haya una prueba en curso."""
+        esperado = 0.0
+        with self.condicion:
+            while True:
+                ahora = time.monotonic()
+                if self.estado == 'cerrado':
+                    break
+                if self.estado == 'abierto' and ahora >= self.abierto_hasta:
+                    self.estado = 'semiabierto'
+                if self.estado == 'semiabierto' and not self.prueba_en_curso:
+                    self.prueba_en_curso = True
+                    break
+                espera = max(self.abierto_hasta - ahora, 0.1) if self.estado == 'abierto' else 0.5
+                self.condicion.wait(espera)
+                esperado += time.monotonic() - ahora
+        if esperado:
+            METRICAS.incrementar('corfo_dormido_segundos_total', esperado, motivo='cortacircuito')
+
+    def exito(self):
+        """Registra una respuesta exitosa; cierra el circuito si estaba en prueba."""
+        with self.condicion:
+            if self.estado != 'cerrado':
+                logger.info(f"Cortacircuito de {self.etapa} cerrado: el sitio volvió a responder")
+                METRICAS.fijar('corfo_cortacircuito_abierto', 0, etapa=self.etapa)
+            self.estado = 'cerrado'
+            self.fallos_seguidos = 0
+            self.pausa = self.pausa_inicial
+            self.prueba_en_curso = False
+            self.condicion.notify_all()
+
+    def fallo(self, error: BaseException):
+        """Registra un fallo; solo los de red y los 429/5xx cuentan para abrir el circuito."""
+        with self.condicion:
+            if not sitio_caido(error):
+                # El sitio respondió: un 404 o un fallo de parseo o del driver no indica que esté caído
+                if self.estado == 'semiabierto':
+                    self.prueba_en_curso = False
+                    self.estado = 'cerrado'
+                    METRICAS.fijar('corfo_cortacircuito_abierto', 0, etapa=self.etapa)
+                self.fallos_seguidos = 0
+                self.condicion.notify_all()
+                return
+            self.fallos_seguidos += 1
+            if self.estado == 'semiabierto':
+                self.pausa = min(self.pausa * 2, self.pausa_maxima)
+                self._abrir('la prueba falló')
+            elif self.estado == 'cerrado' and self.fallos_seguidos >= self.umbral:
+                self._abrir(f'{self.fallos_seguidos} fallos seguidos')
+            self.condicion.notify_all()
+
+    def _abrir(self, motivo: str):
+        self.estado = 'abierto'
+        self.prueba_en_curso = False
+        self.abierto_hasta = time.monotonic() + self.pausa
+        logger.warning(f"Cortacircuito de {self.etapa} abierto ({motivo}): pausa de {self.pausa:.1f} s")
+        METRICAS.fijar('corfo_cortacircuito_abierto', 1, etapa=self.etapa)
+        METRICAS.incrementar('corfo_cortacircuito_aperturas_total', etapa=self.etapa)
@@ -1,4 +1,4 @@
-import pandas as pd
+import numpy as np
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -7,92 +7,151 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
+import argparse
+import queue
+import threading
 import time
 
+from corfo_esperas_b01 import EsperaListado, RegistroEsperas
+from corfo_driver_b01 import (PERFIL_BLOQUEO, RESERVAS, MAX_PAGINAS, MAX_RSS_MB, GestorDrivers,
+                              MedidorPaginas, aplicar_bloqueo, configurar_opciones, directorio_perfil,
+                              leer_perfiles)
+from corfo_db_b01 import BaseDatos, ARCHIVO_DB, canonizar_url
+from corfo_http_b01 import url_listado
+from corfo_esquema_b01 import FILTROS, LISTADO  # mapeo de filtros y selectores del listado
+from corfo_metricas_b01 import METRICAS, ContadorComandos
+
 # Constantes
 URL_BASE = "https://corfo.cl"
-URL_CONVOCATORIAS = "https://corfo.cl/sites/cpp/programasyconvocatorias"
+URL_CONVOCATORIAS = url_listado()
 TIEMPO_ESPERA = 20
-
-# Mapeo de filtros
-FILTROS = {
-    'perfil': {
-        'menu_id': 'collapse5',
-        'menu_button': '//a[@data-target="#collapse5"]',
-        'filtros': {
-            'PERSONA': 'asPerfilQuienSoy-persona-checkbox',
-            'EMPRESA': 'asPerfilQuienSoy-empresa-checkbox',
-            'ORGANIZACIÓN': 'asPerfilQuienSoy-organizacion-checkbox',
-            'INTERMEDIARIO': 'asPerfilQuienSoy-intermediario-checkbox',
-            'INSTITUCION': 'asPerfilQuienSoy-institucion-checkbox',
-            'EXTRANJERO': 'asPerfilQuienSoy-extranjero-checkbox'
-        }
-    },
-    'etapa': {
-        'menu_id': 'collapse4',
-        'menu_button': '//a[@data-target="#collapse4"]',
-        'filtros': {
-            'EMPRENDER': 'asEtapaQueBusco-emprender-checkbox',
-            'IDEA': 'asEtapaQueBusco-ideaNegocio-checkbox',
-            'VENTAS': 'asEtapaQueBusco-aumentarVentas-checkbox',
-            'ESCALAR': 'asEtapaQueBusco-escalar-checkbox',
-            'INNOVAR': 'asEtapaQueBusco-innovar-checkbox',
-            'I+D': 'asEtapaQueBusco-desarrollandoID-checkbox',
-            'SERVICIOS': 'asEtapaQueBusco-entregarServicios-checkbox',
-            'ECOSISTEMA': 'asEtapaQueBusco-fortalecerEcosistema-checkbox'
-        }
-    },
-    'genero': {
-        'menu_id': 'collapse3',
-        'menu_button': '//a[@data-target="#collapse3"]',
-        'filtros': {
-            'GENERO': 'asQueNecesito-incentivoMujeres-checkbox'
-        }
-    }
-}
+WORKERS = 1  # navegadores en paralelo
+INTERVALO_CHECKPOINT = 60  # segundos entre guardados del CSV enriquecido
+_LOCK_INSTALACION = threading.Lock()  # ChromeDriverManager no es seguro entre hilos
 
 class CorfoScraper:
     def __init__(self):
         self.driver = None
+        self.url_convocatorias = URL_CONVOCATORIAS  # --base-url apunta a otro sitio (pruebas de carga)
         self.df = None
+        self.db = None
+        self.db_filename = ARCHIVO_DB
+        self.registro_esperas = RegistroEsperas()
+        self.espera_listado = None
+        self.bloqueo = list(PERFIL_BLOQUEO)  # perfiles de recursos bloqueados por DevTools
+        self.perfil_chrome = 'filtros_0'  # subdirectorio del perfil liviano, uno por worker
+        self.medidor = MedidorPaginas()
+        self.comandos = ContadorComandos(METRICAS, 'filtros')  # comandos WebDriver por página
+        self.gestor = None  # navegadores del worker: activo, reservas y reciclaje
+        self.reservas = None  # None: RESERVAS con un solo worker, 0 con varios
+        self.max_paginas_driver = MAX_PAGINAS
+        self.max_rss_mb = MAX_RSS_MB
+        self.columnas_filtro = [
+            columna for grupo in FILTROS.values() for columna in grupo['filtros']
+        ]
+        self.posicion_columna = {columna: j for j, columna in enumerate(self.columnas_filtro)}
+        self.indice_url = {}  # URL -> posiciones de fila en el DataFrame
+        self.matriz = None  # pertenencia filas x filtros, compartida entre workers
+        self.pares_sin_indice = []  # (URL, FILTRO) de URLs que no estaban al preparar la matriz
+        self.menus_abiertos = set()
+        # Cursores por filtro: FILTRO -> (última página completada, su última URL, completado),
+        # compartidos entre workers y guardados junto con la matriz en cada checkpoint
+        self.cursores = {}
+        self.reanudar = False
+        self.ultimas_urls = []  # URLs canónicas de la última página procesada
         
+    def crear_driver(self, ranura=0):
+        """Crea un driver de Chrome en modo headless; la ranura elige el directorio de perfil"""
+        # Configurar opciones de Chrome
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")  # Modo headless
+        chrome_options.add_argument("--disable-gpu")  # Deshabilitar GPU
+        chrome_options.add_argument("--no-sandbox")  # Necesario para algunos sistemas
+        chrome_options.add_argument("--disable-dev-shm-usage")  # Necesario para algunos sistemas
+        chrome_options.add_argument("--window-size=1920,1080")  # Tamaño de ventana fijo
+        perfil_dir = directorio_perfil(f"{self.perfil_chrome}_{ranura}") if self.perfil_chrome else None
+        configurar_opciones(chrome_options, perfil_dir, self.bloqueo)
+        
+        # Inicializar el driver con las opciones
+        with _LOCK_INSTALACION:
+            service = Service(ChromeDriverManager().install())
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        aplicar_bloqueo(driver, self.bloqueo)
+        return driver
+
     def inicializar_driver(self):
-        """Inicializa el driver de Chrome en modo headless"""
+        """Inicializa el driver de Chrome en modo headless, tomado del gestor de navegadores"""
         try:
-            # Configurar opciones de Chrome
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")  # Modo headless
-            chrome_options.add_argument("--disable-gpu")  # Deshabilitar GPU
-            chrome_options.add_argument("--no-sandbox")  # Necesario para algunos sistemas
-            chrome_options.add_argument("--disable-dev-shm-usage")  # Necesario para algunos sistemas
-            chrome_options.add_argument("--window-size=1920,1080")  # Tamaño de ventana fijo
-            
-            # Inicializar el driver con las opciones
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            if self.gestor is None:
+                reservas = RESERVAS if self.reservas is None else self.reservas
+                self.gestor = GestorDrivers(self.crear_driver, reservas,
+                                            self.max_paginas_driver, self.max_rss_mb)
+            self.usar_driver(self.gestor.obtener())
             return True
         except Exception as e:
             print(f"Error al inicializar driver: {e}")
             return False
 
+    def usar_driver(self, driver):
+        """Asocia las esperas al driver activo; un navegador nuevo empieza con los menús cerrados"""
+        self.driver = driver
+        self.comandos.instalar(driver)
+        self.espera_listado = EsperaListado(self.driver, self.registro_esperas, TIEMPO_ESPERA)
+        self.menus_abiertos = set()
+
+    def reciclar_driver(self, motivo, menu_button, filtro_id, pagina):
+        """Cambia a un navegador de reserva y restaura el filtro y la página actuales"""
+        print(f"Reciclando navegador ({motivo}); se restaura la página {pagina}")
+        self.usar_driver(self.gestor.reciclar(motivo))
+        if not self.navegar_a_convocatorias() or not self.abrir_menu(menu_button):
+            return False
+        self.menus_abiertos.add(menu_button)
+        if not self.limpiar_filtros() or not self.aplicar_filtro(filtro_id):
+            return False
+        return self.ir_a_pagina(pagina)
+
+    def ir_a_pagina(self, pagina):
+        """Salta a una página del listado filtrado sin recorrer las anteriores"""
+        if pagina <= 1:
+            return True
+        try:
+            self.espera_listado.preparar()
+            self.driver.execute_script("getRedirectNext(arguments[0]);", pagina)
+            return self.espera_listado.esperar('restaurar_pagina')
+        except Exception as e:
+            print(f"Error al ir a la página {pagina}: {e}")
+            return False
+
+    def existe_siguiente_pagina(self):
+        """Indica si hay enlace a la página siguiente, sin hacer clic"""
+        return bool(self.driver.find_elements(By.CSS_SELECTOR, "a.page-link[href*='getRedirectNext']"))
+
     def preparar_dataframe(self):
-        """Prepara el DataFrame inicial copiando el CSV de entrada y agregando columnas nuevas"""
+        """Prepara el DataFrame inicial desde la base de datos y agrega las columnas de filtros"""
         try:
-            # Leer CSV original
-            self.df = pd.read_csv('corfo_convocatorias.csv')
+            # Leer convocatorias; al retomar se conserva la pertenencia y los cursores guardados,
+            # si no se descarta la de una ejecución anterior
+            self.db = BaseDatos(self.db_filename)
+            self.df = self.db.leer_convocatorias()
+            if self.reanudar:
+                self.cursores = {
+                    filtro: (cursor['PAGINA'], cursor['ULTIMA_URL'], cursor['COMPLETADO'])
+                    for filtro, cursor in self.db.leer_cursores('filtros').items()
+                }
+            else:
+                self.db.limpiar_filtros()
+                self.db.borrar_cursores('filtros')
+                self.cursores = {}
             
             # Crear nuevas columnas con valor 0
-            nuevas_columnas = [
-                'PERSONA', 'EMPRESA', 'ORGANIZACIÓN', 'INTERMEDIARIO', 'INSTITUCION', 
-                'EXTRANJERO', 'EMPRENDER', 'IDEA', 'VENTAS', 'ESCALAR', 'INNOVAR', 
-                'I+D', 'SERVICIOS', 'ECOSISTEMA', 'GENERO'
-            ]
-            
-            for columna in nuevas_columnas:
+            for columna in self.columnas_filtro:
                 self.df[columna] = 0
-                
-            # Guardar DataFrame inicial
-            self.df.to_csv('corfo_convocatorias_enriched.csv', index=False)
+
+            # Índice URL -> filas y matriz de pertenencia en memoria
+            self.indice_url = {}
+            for posicion, url in enumerate(self.df['URL'].tolist()):
+                self.indice_url.setdefault(url, []).append(posicion)
+            self.matriz = np.zeros((len(self.df), len(self.columnas_filtro)), dtype=np.int8)
             return True
         except Exception as e:
             print(f"Error al preparar DataFrame: {e}")
@@ -101,7 +160,7 @@ class CorfoScraper:
     def navegar_a_convocatorias(self):
         """Navega a la página de convocatorias"""
         try:
-            self.driver.get(URL_CONVOCATORIAS)
+            self.driver.get(self.url_convocatorias)
             return True
         except Exception as e:
             print(f"Error al navegar: {e}")
@@ -145,50 +204,62 @@ class CorfoScraper:
             boton_aplicar = WebDriverWait(self.driver, TIEMPO_ESPERA).until(
                 EC.element_to_be_clickable((By.CSS_SELECTOR, "button.btn.primary2.cpp-button-search[onclick*='funcSearch']"))
             )
+            self.espera_listado.preparar()
             self.driver.execute_script("arguments[0].click();", boton_aplicar)
             
             # Esperar a que se actualice el listado
-            time.sleep(3)
+            self.espera_listado.esperar('aplicar_filtro')
             return True
         except Exception as e:
             print(f"Error al aplicar filtro: {e}")
             return False
 
     def procesar_pagina(self, columna_filtro):
-        """Procesa una página de resultados y actualiza el DataFrame"""
+        """Procesa una página de resultados y marca las filas encontradas en la matriz de pertenencia"""
+        inicio = time.perf_counter()
         try:
             # Esperar a que se cargue el listado
             WebDriverWait(self.driver, TIEMPO_ESPERA).until(
                 EC.presence_of_element_located((By.ID, "listSearch"))
             )
-            time.sleep(2)  # Espera adicional para asegurar carga completa del listado
 
-            # Obtener todos los enlaces "Más Información"
-            enlaces = self.driver.find_elements(By.CSS_SELECTOR, "div.foot-caja_result a")
+            # Obtener todos los enlaces "Más Información" con una sola captura del listado
+            listado = self.driver.find_element(By.ID, "listSearch").get_attribute('outerHTML')
+            j = self.posicion_columna[columna_filtro]
+            with METRICAS.cronometrar('corfo_parseo_segundos', etapa='filtros'):
+                urls = LISTADO.urls_enlaces(LISTADO.documento(listado))
+            self.ultimas_urls = [canonizar_url(url) for url in urls]
             
-            for enlace in enlaces:
-                url_relativa = enlace.get_attribute('href')
-                if url_relativa:
-                    url_completa = URL_BASE + url_relativa if not url_relativa.startswith('http') else url_relativa
-                    
-                    # Buscar coincidencia en el DataFrame
-                    mascara = self.df['URL'] == url_completa
-                    if mascara.any():
-                        self.df.loc[mascara, columna_filtro] = 1
-                        
-            # Guardar cambios
-            self.df.to_csv('corfo_convocatorias_enriched.csv', index=False)
+            for url_canonica in self.ultimas_urls:
+                # Buscar coincidencia en el índice
+                posiciones = self.indice_url.get(url_canonica)
+                if posiciones:
+                    self.matriz[posiciones, j] = 1
+                else:
+                    # Convocatoria agregada por el listado después de preparar la matriz
+                    self.pares_sin_indice.append((url_canonica, columna_filtro))
+
+            medicion = self.medidor.medir(self.driver, columna_filtro)
+            if medicion:
+                print(f"  {columna_filtro}: {medicion['kb']} KB en {medicion['recursos']} recursos, "
+                      f"{medicion['ms']} ms")
+                METRICAS.incrementar('corfo_bytes_total', medicion['kb'] * 1024, etapa='filtros')
+            METRICAS.observar('corfo_pagina_segundos', time.perf_counter() - inicio, etapa='filtros')
+            METRICAS.incrementar('corfo_paginas_total', etapa='filtros')
+            self.comandos.pagina()
             return True
         except Exception as e:
             print(f"Error al procesar página: {e}")
+            METRICAS.incrementar('corfo_errores_total', etapa='filtros', tipo=type(e).__name__)
             return False
 
     def hay_siguiente_pagina(self):
         """Verifica si hay una página siguiente y navega a ella"""
         try:
             siguiente = self.driver.find_element(By.CSS_SELECTOR, "a.page-link[href*='getRedirectNext']")
+            self.espera_listado.preparar()
             self.driver.execute_script("arguments[0].click();", siguiente)
-            time.sleep(3)  # Espera necesaria para la carga del nuevo listado
+            self.espera_listado.esperar('siguiente_pagina')
             return True
         except NoSuchElementException:
             return False
@@ -196,58 +267,168 @@ class CorfoScraper:
             print(f"Error al verificar página siguiente: {e}")
             return False
 
-    def procesar_grupo_filtros(self, grupo_config):
-        """Procesa un grupo completo de filtros"""
-        # Abrir menú del grupo
-        if not self.abrir_menu(grupo_config['menu_button']):
+    def registrar_cursor(self, columna, pagina, completado=False):
+        """Anota la página completada del filtro; se persiste en el próximo checkpoint"""
+        self.cursores[columna] = (pagina, self.ultimas_urls[-1] if self.ultimas_urls else None, completado)
+
+    def procesar_filtro(self, menu_button, columna, filtro_id):
+        """Aplica un filtro y recorre todas sus páginas de resultados"""
+        print(f"\nProcesando filtro: {columna}")
+        pagina, ultima_url, _ = self.cursores.get(columna, (1, None, False))
+        if pagina > 1:
+            print(f"Retomando el filtro {columna} en la página {pagina}")
+
+        # Abrir el menú del grupo (el clic lo alterna, por lo que solo se abre una vez)
+        if menu_button not in self.menus_abiertos:
+            if not self.abrir_menu(menu_button):
+                return False
+            self.menus_abiertos.add(menu_button)
+
+        # Limpiar filtros anteriores
+        if not self.limpiar_filtros():
             return False
 
-        # Procesar cada filtro del grupo
-        for columna, filtro_id in grupo_config['filtros'].items():
-            print(f"\nProcesando filtro: {columna}")
-            
-            # Limpiar filtros anteriores
-            if not self.limpiar_filtros():
-                continue
+        # Aplicar el filtro actual y, al retomar, saltar a la última página completada
+        if not self.aplicar_filtro(filtro_id) or not self.ir_a_pagina(pagina):
+            return False
 
-            # Aplicar el filtro actual
-            if not self.aplicar_filtro(filtro_id):
+        # Procesar todas las páginas para este filtro
+        while True:
+            if not self.procesar_pagina(columna):
+                return False
+            self.gestor.pagina_procesada()
+            self.registrar_cursor(columna, pagina)
+
+            # Al retomar: si la última URL del cursor ya no está en la página, el listado se
+            # desplazó desde la interrupción y se relee la página anterior
+            if ultima_url and pagina > 1 and ultima_url not in self.ultimas_urls:
+                print(f"El listado del filtro {columna} cambió; se relee desde la página {pagina - 1}")
+                pagina -= 1
+                ultima_url = None
+                if not self.ir_a_pagina(pagina):
+                    return False
                 continue
+            ultima_url = None
 
-            # Procesar todas las páginas para este filtro
-            while True:
-                if not self.procesar_pagina(columna):
+            # Reciclaje preventivo: el navegador nuevo abre directamente la página siguiente
+            motivo = self.gestor.motivo_reciclaje()
+            if motivo:
+                if not self.existe_siguiente_pagina():
                     break
-                    
-                if not self.hay_siguiente_pagina():
-                    break
-
-            time.sleep(2)
+                pagina += 1
+                if not self.reciclar_driver(motivo, menu_button, filtro_id, pagina):
+                    return False
+                continue
+                
+            if not self.hay_siguiente_pagina():
+                break
+            pagina += 1
 
+        self.registrar_cursor(columna, pagina, completado=True)
         return True
 
-    def ejecutar_scraping(self):
-        """Ejecuta el proceso completo de scraping"""
+    def trabajar(self, cola):
+        """Toma filtros de la cola compartida hasta vaciarla, usando un navegador propio"""
         try:
-            # Inicializar
-            if not self.inicializar_driver():
-                return False
+            if not self.inicializar_driver() or not self.navegar_a_convocatorias():
+                return
+            while True:
+                try:
+                    menu_button, columna, filtro_id = cola.get_nowait()
+                except queue.Empty:
+                    return
+                if not self.procesar_filtro(menu_button, columna, filtro_id):
+                    print(f"Error al procesar filtro {columna}")
+        except Exception as e:
+            print(f"Error en worker: {e}")
+        finally:
+            if self.gestor:
+                print(f"Navegadores del worker: {self.gestor.estadisticas()}")
+                self.gestor.cerrar()
+
+    def guardar_checkpoint(self):
+        """Registra en la base de datos la pertenencia marcada en la matriz y los cursores"""
+        # Los cursores se copian antes de leer la matriz y los pares: nunca apuntan a páginas sin guardar
+        cursores = dict(self.cursores)
+        pares = list(self.pares_sin_indice)
+        self.db.guardar_matriz_filtros(self.df['URL'].tolist(), self.columnas_filtro, self.matriz,
+                                       cursores, pares)
 
+    def exportar_csv(self):
+        """Exporta corfo_convocatorias_enriched.csv desde la base de datos"""
+        self.db.exportar_csv('enriquecido', 'corfo_convocatorias_enriched.csv', self.columnas_filtro)
+
+    def ejecutar_scraping(self, workers=WORKERS, exportar_csv=False):
+        """Ejecuta el proceso completo de scraping con un pool de navegadores"""
+        try:
             # Preparar DataFrame
             if not self.preparar_dataframe():
                 return False
 
-            # Navegar a la página
-            if not self.navegar_a_convocatorias():
+            # Cola compartida con los filtros de todos los grupos (al retomar, los no terminados)
+            cola = queue.Queue()
+            for grupo_nombre, grupo_config in FILTROS.items():
+                for columna, filtro_id in grupo_config['filtros'].items():
+                    if self.cursores.get(columna, (1, None, False))[2]:
+                        continue
+                    cola.put((grupo_config['menu_button'], columna, filtro_id))
+            if self.reanudar:
+                print(f"Retomando: {len(self.columnas_filtro) - cola.qsize()} filtros ya completos")
+            if cola.empty():
+                print("No quedan filtros por procesar")
+
+            # Cada worker usa su propio driver
+            n_workers = min(max(1, workers), cola.qsize())
+            # Las reservas son por worker: con N workers y una reserva cada uno habría 2N Chromes
+            reservas = self.reservas if self.reservas is not None else (RESERVAS if n_workers == 1 else 0)
+            print(f"\nProcesando {cola.qsize()} filtros con {n_workers} navegadores")
+            trabajadores = []
+            for i in range(n_workers):
+                trabajador = CorfoScraper()
+                trabajador.registro_esperas = self.registro_esperas
+                trabajador.medidor = self.medidor
+                trabajador.bloqueo = self.bloqueo
+                trabajador.url_convocatorias = self.url_convocatorias
+                trabajador.perfil_chrome = f'filtros_{i}'
+                trabajador.reservas = reservas
+                trabajador.max_paginas_driver = self.max_paginas_driver
+                trabajador.max_rss_mb = self.max_rss_mb
+                trabajador.indice_url = self.indice_url
+                trabajador.matriz = self.matriz
+                trabajador.pares_sin_indice = self.pares_sin_indice
+                trabajador.cursores = self.cursores
+                hilo = threading.Thread(target=trabajador.trabajar, args=(cola,))
+                hilo.start()
+                trabajadores.append((trabajador, hilo))
+
+            # Guardar la matriz periódicamente mientras los workers avanzan
+            for _, hilo in trabajadores:
+                while hilo.is_alive():
+                    hilo.join(INTERVALO_CHECKPOINT)
+                    if hilo.is_alive():
+                        self.guardar_checkpoint()
+            self.guardar_checkpoint()
+
+            if not cola.empty():
+                print(f"Quedaron {cola.qsize()} filtros sin procesar; use --resume para continuar")
                 return False
+            pendientes = [c for c in self.columnas_filtro if not self.cursores.get(c, (1, None, False))[2]]
+            if pendientes:
+                print(f"Filtros incompletos: {', '.join(pendientes)}; use --resume para continuar")
+                return False
+            self.db.borrar_cursores('filtros')  # todos los filtros terminaron
 
-            # Procesar cada grupo de filtros
-            for grupo_nombre, grupo_config in FILTROS.items():
-                print(f"\nProcesando grupo de filtros: {grupo_nombre}")
-                if not self.procesar_grupo_filtros(grupo_config):
-                    print(f"Error al procesar grupo {grupo_nombre}")
+            if exportar_csv:
+                self.exportar_csv()
 
             print("\nProceso de scraping completado")
+            for nombre, datos in self.registro_esperas.resumen().items():
+                print(f"Espera '{nombre}': {datos['cantidad']} veces, total {datos['total']} s, "
+                      f"promedio {datos['promedio']} s, máximo {datos['maximo']} s")
+            transferencia = self.medidor.resumen()
+            if transferencia['paginas']:
+                print(f"Transferencia: {transferencia['kb_total']} KB en {transferencia['paginas']} páginas "
+                      f"(promedio {transferencia['kb_promedio']} KB, {transferencia['ms_promedio']} ms por página)")
             return True
 
         except Exception as e:
@@ -255,9 +436,44 @@ class CorfoScraper:
             return False
 
         finally:
-            if self.driver:
-                self.driver.quit()
+            if self.db:
+                self.db.cerrar()
+
+def parse_args(argv=None):
+    """Lee los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description='Enriquecimiento de convocatorias CORFO con filtros')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help='Número de navegadores headless en paralelo')
+    parser.add_argument('--exportar-csv', action='store_true',
+                        help='Exporta corfo_convocatorias_enriched.csv desde la base de datos al finalizar')
+    parser.add_argument('--bloqueo', default=','.join(PERFIL_BLOQUEO), metavar='PERFILES',
+                        help='Recursos a bloquear: imagenes,media,fuentes,terceros,estilos o "ninguno"')
+    parser.add_argument('--max-paginas-driver', type=int, default=MAX_PAGINAS, metavar='N',
+                        help='Páginas por navegador antes de reciclarlo')
+    parser.add_argument('--max-rss-mb', type=int, default=MAX_RSS_MB, metavar='MB',
+                        help='Memoria de Chrome antes de reciclarlo (requiere psutil)')
+    parser.add_argument('--reservas', type=int, default=None,
+                        help=f'Navegadores de reserva por worker, iniciados de antemano; cada uno es un Chrome '
+                             f'más por worker (por defecto {RESERVAS} con un worker y 0 con varios)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Retoma una ejecución interrumpida: conserva la pertenencia guardada y sigue '
+                             'cada filtro desde su última página')
+    parser.add_argument('--base-url', metavar='URL',
+                        help='Sitio alternativo a https://corfo.cl (por ejemplo, corfo_mock_b01.py)')
+    parser.add_argument('--metricas', metavar='ARCHIVO',
+                        help='Guarda el reporte de métricas en ARCHIVO (JSON) y en formato Prometheus (.prom)')
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
+    args = parse_args()
     scraper = CorfoScraper()
-    scraper.ejecutar_scraping()
+    scraper.bloqueo = leer_perfiles(args.bloqueo)
+    scraper.max_paginas_driver = args.max_paginas_driver
+    scraper.max_rss_mb = args.max_rss_mb
+    scraper.reservas = args.reservas
+    scraper.url_convocatorias = url_listado(args.base_url)
+    scraper.reanudar = args.resume
+    scraper.ejecutar_scraping(workers=args.workers, exportar_csv=args.exportar_csv)
+    if args.metricas:
+        METRICAS.guardar(args.metricas)
+        print(f"Métricas guardadas en {args.metricas}")
@@ -3,13 +3,26 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup
+from lxml import html as lxml_html
 import pandas as pd
+import argparse
 import time
 import os
+import re
+import sys
 import logging
 from datetime import datetime
 
+from corfo_http_b01 import crear_sesion, LimitadorPorHost, leer_retry_after, registrar_request, url_listado
+from corfo_esperas_b01 import EsperaListado, RegistroEsperas, esperar
+from corfo_driver_b01 import (PERFIL_BLOQUEO, RESERVAS, MAX_PAGINAS, MAX_RSS_MB, GestorDrivers,
+                              MedidorPaginas, aplicar_bloqueo, configurar_opciones, directorio_perfil,
+                              leer_perfiles)
+from corfo_db_b01 import BaseDatos, ARCHIVO_DB, canonizar_url, hash_fila
+from corfo_esquema_b01 import LISTADO, limpiar_resumen
+from corfo_metricas_b01 import METRICAS, ContadorComandos
+from corfo_reintentos_b01 import CATEGORIAS, DRIVER, INTENTOS, Cortacircuito, PoliticaReintentos, clasificar
+
 # Configuración del logging
 logging.basicConfig(
     level=logging.INFO,
@@ -18,19 +31,59 @@ logging.basicConfig(
 
 class CorfoScraper:
     def __init__(self):
-        self.base_url = "https://corfo.cl/sites/cpp/programasyconvocatorias"
+        self.base_url = url_listado()
         self.driver = None
         self.wait = None
-        self.csv_filename = "corfo_convocatorias.csv"
-        self.df_existing = None
+        self.csv_filename = "corfo_convocatorias.csv"  # exportación bajo demanda y migración
+        self.db_filename = ARCHIVO_DB
+        self.db = None
+        self.urls_existentes = set()  # URLs ya guardadas, se carga una vez por ejecución
+        self.hashes_existentes = {}  # URL -> HASH del contenido guardado
+        self.ultimo_id = 0  # contador de IDs asignados
         self.current_page_convocatorias = []
         self.total_nuevas = 0
-        self.max_retries = 3
+        self.total_actualizadas = 0
+        # Modo incremental: se detiene tras K páginas seguidas sin URLs nuevas ni cambios
+        self.incremental = True
+        self.paginas_sin_cambios = 3
+        self.pagina_sin_cambios = False  # resultado de la última página procesada
+        # Reintentos por página: backoff con jitter según el tipo de fallo y pausa si el sitio cae
+        self.politica = PoliticaReintentos(intentos=INTENTOS, base=2.0, reintentables=CATEGORIAS)
+        self.cortacircuito = Cortacircuito(etapa='lista')
+        self.intentos_ultimo = 0  # intentos usados por la última llamada a retry_on_failure
+        self.ultimo_fallo = None  # última excepción ya contada por retry_on_failure en el cortacircuito
+        self.max_paginas_fallidas = 3  # páginas seguidas en la tabla de fallidos antes de detenerse
+        self.paginas_fallidas_seguidas = 0
         self.page_load_timeout = 180
         self.script_timeout = 180
+        self.registro_esperas = RegistroEsperas()
+        self.espera_listado = None
+        self.bloqueo = list(PERFIL_BLOQUEO)  # perfiles de recursos bloqueados por DevTools
+        self.perfil_chrome = 'lista'  # subdirectorio del perfil liviano; None usa un perfil temporal
+        self.medidor = MedidorPaginas()
+        self.comandos = ContadorComandos(METRICAS, 'lista')  # comandos WebDriver por página
+        # Navegadores administrados: reservas iniciadas de antemano y reciclaje preventivo
+        self.gestor_drivers = None
+        self.reservas_driver = RESERVAS
+        self.max_paginas_driver = MAX_PAGINAS
+        self.max_rss_mb = MAX_RSS_MB
+        self.pagina_actual = 1  # página que se restaura al cambiar de navegador
+        # Modo HTTP: reproduce las llamadas de funcSearch/getRedirectNext sin navegador
+        self.listado_params = {'pullEstado': 'abierta,cerrada'}
+        self.page_param = 'page'
+        self.requests_por_segundo = 1.0
+        self.session = None
+        self.limitador = None
+        self.record_dir = None  # directorio donde grabar las respuestas del listado
+        self.replay_dir = None  # directorio con respuestas grabadas para ejecutar sin red
+        self.al_agregar = None  # callback(urls) con las URLs nuevas de cada página (pipeline)
+        # Cursor del recorrido: última página completada y su última convocatoria (--resume)
+        self.resume = False
+        self.urls_pagina = []  # URLs canónicas de la última página guardada
+        self.ultima_url_cursor = None  # última convocatoria del cursor, se verifica al retomar
 
-    def setup_driver(self):
-        """Configura el driver de Selenium con Chrome"""
+    def create_driver(self, ranura=0):
+        """Crea un driver de Selenium con Chrome; la ranura elige el directorio de perfil"""
         options = webdriver.ChromeOptions()
         options.add_argument('--headless')
         options.add_argument('--disable-gpu')
@@ -40,38 +93,135 @@ class CorfoScraper:
         options.add_argument('--disable-features=NetworkService')  # Ayuda con problemas de timeout
         options.add_argument('--disable-features=VizDisplayCompositor')
         options.page_load_strategy = 'eager'  # Carga más rápida
+        perfil_dir = directorio_perfil(f"{self.perfil_chrome}_{ranura}") if self.perfil_chrome else None
+        configurar_opciones(options, perfil_dir, self.bloqueo)
         
-        self.driver = webdriver.Chrome(options=options)
-        self.driver.set_page_load_timeout(self.page_load_timeout)
-        self.driver.set_script_timeout(self.script_timeout)
+        driver = webdriver.Chrome(options=options)
+        aplicar_bloqueo(driver, self.bloqueo)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        driver.set_script_timeout(self.script_timeout)
+        driver.implicitly_wait(10)
+        return driver
+
+    def setup_driver(self):
+        """Configura el driver de Selenium con Chrome, tomado del gestor de navegadores"""
+        if self.gestor_drivers is None:
+            self.gestor_drivers = GestorDrivers(self.create_driver, self.reservas_driver,
+                                                self.max_paginas_driver, self.max_rss_mb)
+        self.use_driver(self.gestor_drivers.obtener())
+
+    def use_driver(self, driver):
+        """Asocia las esperas al driver activo"""
+        self.driver = driver
+        self.comandos.instalar(driver)
         self.wait = WebDriverWait(self.driver, 20)
-        self.driver.implicitly_wait(10)
+        self.espera_listado = EsperaListado(self.driver, self.registro_esperas)
 
-    def retry_on_timeout(self, func, *args, **kwargs):
-        """Reintenta una función en caso de timeout"""
-        for attempt in range(self.max_retries):
+    def retry_on_failure(self, func, *args, **kwargs):
+        """Reintenta una función según el tipo de fallo, con backoff exponencial y jitter"""
+        intento = 0
+        recuperar = None  # categoría del último fallo: antes de reintentar se recupera el navegador
+        while True:
+            intento += 1
+            self.intentos_ultimo = intento
+            self.cortacircuito.esperar()
             try:
-                return func(*args, **kwargs)
+                if recuperar:
+                    # Si el navegador no vuelve a la página, el intento falla: nunca se lee otra página
+                    self.recover(recuperar)
+                resultado = func(*args, **kwargs)
+                self.cortacircuito.exito()
+                return resultado
             except Exception as e:
-                if attempt == self.max_retries - 1:  # Si es el último intento
-                    raise e
-                logging.warning(f"Intento {attempt + 1} falló: {str(e)}. Reintentando...")
-                time.sleep(5)  # Esperar antes de reintentar
-                
-                # Si es un error de timeout, reiniciar el driver
-                if "timeout" in str(e).lower():
-                    logging.info("Reiniciando el driver debido a timeout...")
-                    self.restart_driver()
-
-    def restart_driver(self):
-        """Reinicia el driver en caso de problemas"""
-        try:
-            if self.driver:
-                self.driver.quit()
-        except:
-            pass
-        finally:
+                self.cortacircuito.fallo(e)
+                self.ultimo_fallo = e
+                if not self.politica.reintentar(e, intento):
+                    raise
+                categoria = clasificar(e)
+                espera = self.politica.espera(intento)
+                logging.warning(f"Intento {intento} falló ({categoria}): {str(e)}. "
+                                f"Reintentando en {espera:.1f} s...")
+                METRICAS.incrementar('corfo_reintentos_total', etapa='lista', tipo=categoria)
+                METRICAS.dormir(espera, 'reintento')
+                recuperar = categoria
+
+    def registrar_fallo(self, error):
+        """Cuenta un fallo en el cortacircuito salvo que retry_on_failure ya lo haya contado"""
+        if error is not self.ultimo_fallo:
+            self.cortacircuito.fallo(error)
+
+    def recover(self, categoria):
+        """Recupera el navegador tras un fallo: solo se reinicia Chrome si se cayó"""
+        if self.driver is None:
+            return
+        if categoria != DRIVER:
+            # Una página que no cargó o no se pudo leer basta con volver a abrirla
+            try:
+                if self.restore_position(self.pagina_actual):
+                    return
+            except Exception as e:
+                categoria = clasificar(e)
+                logging.warning(f"No se pudo restaurar la página {self.pagina_actual}: {e}")
+        logging.info(f"Reiniciando el driver ({categoria})...")
+        self.restart_driver(categoria)
+
+    def register_failed_page(self, pagina, error):
+        """Guarda una página que agotó sus reintentos en la tabla de fallidos"""
+        categoria = clasificar(error)
+        logging.error(f"Página {pagina} enviada a la tabla de fallidos ({categoria}): {error}")
+        METRICAS.incrementar('corfo_errores_total', etapa='lista', tipo=categoria)
+        METRICAS.incrementar('corfo_fallidos_total', etapa='lista', categoria=categoria)
+        self.paginas_fallidas_seguidas += 1
+        if self.db is not None:
+            self.db.registrar_fallido('lista', str(pagina), categoria, str(error), self.intentos_ultimo)
+
+    def register_page_ok(self, pagina):
+        """Quita de la tabla de fallidos una página que se procesó bien"""
+        self.paginas_fallidas_seguidas = 0
+        if self.db is not None:
+            self.db.quitar_fallidos('lista', [pagina])
+
+    def skip_failed_page(self):
+        """Indica si se puede seguir con la página siguiente tras una página fallida"""
+        if self.paginas_fallidas_seguidas >= self.max_paginas_fallidas:
+            logging.error(f"{self.paginas_fallidas_seguidas} páginas seguidas fallaron; se detiene el recorrido")
+            return False
+        return True
+
+    def restart_driver(self, motivo='error'):
+        """Cambia a un driver de reserva y restaura la página actual del listado; lanza si no lo logra"""
+        if self.gestor_drivers is None:
             self.setup_driver()
+            return
+        self.use_driver(self.gestor_drivers.reciclar(motivo))
+        self.open_page(self.pagina_actual)
+
+    def open_page(self, pagina):
+        """Restaura la página indicada; lanza TimeoutException si el listado no llegó a ella"""
+        if not self.restore_position(pagina):
+            raise TimeoutException(f"No se pudo abrir la página {pagina} del listado")
+
+    def restore_position(self, pagina):
+        """Lleva el driver a la página indicada del listado con los filtros de estado aplicados"""
+        self.driver.get(self.base_url)
+        if pagina <= 1:
+            return True  # scrape_page aplica los filtros en la primera página
+        WebDriverWait(self.driver, 20).until(
+            EC.presence_of_element_located((By.ID, "listSearch"))
+        )
+        if not self.apply_filters():
+            return False
+        self.espera_listado.preparar()
+        self.driver.execute_script("getRedirectNext(arguments[0]);", pagina)
+        logging.info(f"Posición restaurada en la página {pagina}")
+        return self.espera_listado.esperar('restaurar_pagina')
+
+    def next_page_exists(self):
+        """Indica si el listado tiene enlace 'Siguiente', sin hacer clic ni esperar"""
+        return bool(self.driver.execute_script(
+            "return Array.prototype.some.call(document.querySelectorAll('a.page-link'),"
+            " function(a) { return a.textContent.indexOf('Siguiente') >= 0; });"
+        ))
 
     def wait_for_element(self, by, value, timeout=20):
         """Espera a que un elemento esté presente y visible"""
@@ -80,7 +230,6 @@ class CorfoScraper:
                 EC.presence_of_element_located((by, value))
             )
             self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-            time.sleep(1)
             return element
         except TimeoutException:
             logging.error(f"Timeout esperando elemento {value}")
@@ -88,23 +237,7 @@ class CorfoScraper:
 
     def clean_resumen(self, html_content):
         """Limpia el contenido del resumen según las reglas especificadas"""
-        if not html_content:
-            return "No disponible"
-            
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        for span in soup.find_all('span', style="border: 2px solid #2fca70;padding: 20px;display: inline-block;"):
-            if "Plataforma Matchmaking" in span.text:
-                span.decompose()
-        
-        for a in soup.find_all('a'):
-            a.decompose()
-        
-        text = soup.get_text()
-        text = text.replace('<br> " -', '')
-        text = text.replace('" -', '')
-        
-        return text.strip() or "No disponible"
+        return limpiar_resumen(html_content)
 
     def get_existing_data(self):
         """Lee el archivo CSV existente si existe"""
@@ -116,67 +249,61 @@ class CorfoScraper:
                 return pd.DataFrame()
         return pd.DataFrame()
 
+    def open_db(self):
+        """Abre la base de datos; si está vacía, importa el CSV de una versión anterior"""
+        if self.db is not None:
+            return
+        self.db = BaseDatos(self.db_filename)
+        if self.db.ultimo_id() == 0 and os.path.exists(self.csv_filename):
+            df = self.get_existing_data()
+            if not df.empty:
+                self.db.upsert_convocatorias(df.astype(object).where(df.notna(), None).to_dict('records'))
+                logging.info(f"Importadas {len(df)} convocatorias desde {self.csv_filename}")
+
+    def close_db(self):
+        """Cierra la base de datos"""
+        if self.db is not None:
+            self.db.cerrar()
+            self.db = None
+
+    def load_existing_state(self):
+        """Carga una sola vez las URLs existentes, sus hashes y el último ID desde la base de datos"""
+        self.open_db()
+        self.hashes_existentes = self.db.hashes_convocatorias()
+        self.urls_existentes = set(self.hashes_existentes)
+        self.ultimo_id = self.db.ultimo_id()
+        logging.info(f"Convocatorias existentes: {len(self.urls_existentes)} (último ID: {self.ultimo_id})")
+
     def parse_convocatoria(self, caja):
-        """Extrae la información de una convocatoria individual"""
+        """Extrae la información de una convocatoria individual (WebElement) con una sola llamada al driver"""
         try:
-            data = {
-                'NOMBRE': '',
-                'APERTURA': '',
-                'CIERRE': '',
-                'ALCANCE': 'No especificado',
-                'ESTADO': 'No especificado',
-                'RESUMEN': 'No disponible',
-                'URL': 'No disponible'
-            }
-            
-            data['NOMBRE'] = caja.find_element(By.CLASS_NAME, "titulo-cajas_fechas").text.strip()
-            
-            # Obtener fechas directamente del span
-            try:
-                apertura_span = caja.find_element(By.CSS_SELECTOR, ".apertura span")
-                data['APERTURA'] = apertura_span.text.strip()
-            except NoSuchElementException:
-                logging.debug(f"No se encontró fecha de apertura para {data['NOMBRE']}")
-                data['APERTURA'] = "No disponible"
-            
-            try:
-                cierre_span = caja.find_element(By.CSS_SELECTOR, ".cierre span")
-                data['CIERRE'] = cierre_span.text.strip()
-            except NoSuchElementException:
-                logging.debug(f"No se encontró fecha de cierre para {data['NOMBRE']}")
-                data['CIERRE'] = "No disponible"
-            
-            try:
-                alcance_elem = caja.find_element(By.XPATH, ".//*[contains(text(), 'Alcance:')]")
-                data['ALCANCE'] = alcance_elem.text.replace("Alcance:", "").strip()
-            except NoSuchElementException:
-                logging.debug(f"No se encontró alcance para {data['NOMBRE']}")
-            
-            try:
-                estado_elem = caja.find_element(By.XPATH, ".//*[contains(text(), 'Estado:')]")
-                data['ESTADO'] = estado_elem.text.replace("Estado:", "").strip()
-            except NoSuchElementException:
-                logging.debug(f"No se encontró estado para {data['NOMBRE']}")
-            
-            try:
-                resumen_elem = caja.find_element(By.TAG_NAME, "p")
-                data['RESUMEN'] = self.clean_resumen(resumen_elem.get_attribute('innerHTML'))
-            except NoSuchElementException:
-                logging.debug(f"No se encontró resumen para {data['NOMBRE']}")
-            
-            try:
-                url_elem = caja.find_element(By.CSS_SELECTOR, ".foot-caja_result a")
-                url = url_elem.get_attribute("href")
-                data['URL'] = f"https://corfo.cl{url}" if not url.startswith("https://corfo.cl") else url
-            except NoSuchElementException:
-                logging.debug(f"No se encontró URL para {data['NOMBRE']}")
-            
+            return self.parse_convocatoria_html(lxml_html.fromstring(caja.get_attribute('outerHTML')))
+        except Exception as e:
+            logging.error(f"Error parseando convocatoria: {e}")
+            return None
+
+    def parse_convocatoria_html(self, caja):
+        """Extrae la información de una convocatoria desde un nodo lxml, según ESQUEMA_LISTADO"""
+        try:
+            data = LISTADO.extraer(caja)
+            if data is None:
+                logging.error("Error parseando convocatoria: caja sin título")
             return data
 
         except Exception as e:
             logging.error(f"Error parseando convocatoria: {e}")
             return None
 
+    def parse_listado_html(self, contenido):
+        """Extrae todas las convocatorias de un HTML de listado (página completa o fragmento)"""
+        documento = LISTADO.documento(contenido)
+        convocatorias = []
+        for caja in LISTADO.cajas(documento):
+            convocatoria = self.parse_convocatoria_html(caja)
+            if convocatoria:
+                convocatorias.append(convocatoria)
+        return convocatorias
+
     def check_next_page(self):
         """Verifica si existe el botón 'Siguiente' y hace clic en él"""
         try:
@@ -188,9 +315,9 @@ class CorfoScraper:
             )
             
             self.driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
-            time.sleep(1)
+            self.espera_listado.preparar()
             next_button.click()
-            time.sleep(2)
+            self.espera_listado.esperar('siguiente_pagina')
             return True
         except (NoSuchElementException, TimeoutException):
             return False
@@ -204,7 +331,8 @@ class CorfoScraper:
                 # Click en el encabezado para expandir
                 heading = self.driver.find_element(By.ID, "heading1")
                 heading.click()
-                time.sleep(1)
+                esperar(self.driver, lambda d: "show" in accordion.get_attribute("class"),
+                        'acordeon_filtros', self.registro_esperas, timeout=10)
             return True
         except Exception as e:
             logging.error(f"Error asegurando visibilidad del filtro: {e}")
@@ -226,10 +354,8 @@ class CorfoScraper:
             )
             if not checkbox_abierta.is_selected():
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", checkbox_abierta)
-                time.sleep(1)
                 self.driver.execute_script("arguments[0].click();", checkbox_abierta)
                 logging.info("Checkbox 'Abiertas' marcado")
-                time.sleep(1)
 
             # Marcar 'Cerradas'
             checkbox_cerrada = WebDriverWait(self.driver, 10).until(
@@ -237,10 +363,8 @@ class CorfoScraper:
             )
             if not checkbox_cerrada.is_selected():
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", checkbox_cerrada)
-                time.sleep(1)
                 self.driver.execute_script("arguments[0].click();", checkbox_cerrada)
                 logging.info("Checkbox 'Cerradas' marcado")
-                time.sleep(1)
 
             # Hacer click en el botón "Aplicar filtros"
             logging.info("Aplicando filtros...")
@@ -249,9 +373,11 @@ class CorfoScraper:
                 apply_button = WebDriverWait(self.driver, 10).until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, "button.cpp-button-search"))
                 )
+                self.espera_listado.preparar()
                 self.driver.execute_script("arguments[0].click();", apply_button)
+                # Esperar a que se apliquen los filtros y se carguen los resultados
+                self.espera_listado.esperar('aplicar_filtros')
                 logging.info("Filtros aplicados exitosamente")
-                time.sleep(3)  # Esperar a que se apliquen los filtros y se carguen los resultados
                 return True
             except NoSuchElementException:
                 logging.error("No se pudo encontrar el botón 'Aplicar filtros'")
@@ -261,35 +387,48 @@ class CorfoScraper:
             logging.error(f"Error aplicando filtros: {e}")
             return False
 
-    def update_csv_with_page_data(self, pagina):
-        """Actualiza el CSV con los datos de la página actual"""
+    def update_db_with_page_data(self, pagina):
+        """Guarda en la base de datos las convocatorias nuevas o modificadas de la página actual"""
+        self.pagina_sin_cambios = False
+        self.urls_pagina = []
         if not self.current_page_convocatorias:
             logging.info("No se encontraron convocatorias en esta página")
             return 0
         
         # Crear DataFrame con convocatorias de la página actual
         df_page = pd.DataFrame(self.current_page_convocatorias)
-        nuevas_convocatorias = len(df_page)
+        df_page['URL'] = df_page['URL'].map(canonizar_url)
+        self.urls_pagina = df_page['URL'].tolist()
+        df_page['HASH'] = [hash_fila(fila) for fila in self.current_page_convocatorias]
+        
+        # Convocatorias ya guardadas cuyo contenido cambió (por ejemplo ESTADO o CIERRE); una
+        # fila guardada sin HASH cuenta como cambiada
+        anteriores = df_page['URL'].map(self.hashes_existentes)
+        df_cambios = df_page[df_page['URL'].isin(self.urls_existentes) & (anteriores != df_page['HASH'])]
+        if len(df_cambios) > 0:
+            self.db.upsert_convocatorias(df_cambios.drop(columns=['HASH']).to_dict('records'))
+            self.hashes_existentes.update(zip(df_cambios['URL'], df_cambios['HASH']))
+            self.total_actualizadas += len(df_cambios)
+            logging.info(f"Página {pagina}: {len(df_cambios)} convocatorias actualizadas")
+            for _, conv in df_cambios.iterrows():
+                logging.info(f"- {conv['NOMBRE']} (Estado: {conv['ESTADO']}, Cierre: {conv['CIERRE']})")
         
-        if not self.df_existing.empty:
-            # Verificar duplicados basados en URL
-            existing_urls = set(self.df_existing['URL'].tolist())
-            df_page = df_page[~df_page['URL'].isin(existing_urls)]
-            nuevas_convocatorias = len(df_page)
+        # Verificar duplicados basados en URL contra el conjunto persistente
+        df_page = df_page[~df_page['URL'].isin(self.urls_existentes)]
+        nuevas_convocatorias = len(df_page)
+        self.pagina_sin_cambios = nuevas_convocatorias == 0 and len(df_cambios) == 0
         
         if nuevas_convocatorias > 0:
-            # Agregar IDs a las nuevas convocatorias
-            last_id = 0 if self.df_existing.empty else self.df_existing['ID'].max()
-            df_page.insert(0, 'ID', range(last_id + 1, last_id + 1 + len(df_page)))
-            
-            # Concatenar con las convocatorias existentes (nuevas al final)
-            if self.df_existing.empty:
-                self.df_existing = df_page
-            else:
-                self.df_existing = pd.concat([self.df_existing, df_page], ignore_index=True)
+            # Agregar IDs a las nuevas convocatorias desde el contador
+            df_page.insert(0, 'ID', range(self.ultimo_id + 1, self.ultimo_id + 1 + len(df_page)))
             
-            # Guardar el DataFrame actualizado
-            self.df_existing.to_csv(self.csv_filename, index=False, encoding='utf-8-sig')
+            # Guardar solo las filas nuevas
+            self.db.upsert_convocatorias(df_page.drop(columns=['HASH']).to_dict('records'))
+            self.ultimo_id += len(df_page)
+            self.urls_existentes.update(df_page['URL'])
+            self.hashes_existentes.update(zip(df_page['URL'], df_page['HASH']))
+            if self.al_agregar:
+                self.al_agregar(df_page['URL'].tolist())
             
             # Reportar nuevas convocatorias
             logging.info(f"\nPágina {pagina}: Se agregaron {nuevas_convocatorias} nuevas convocatorias:")
@@ -304,6 +443,49 @@ class CorfoScraper:
         self.current_page_convocatorias = []
         return nuevas_convocatorias
 
+    def resume_page(self):
+        """Página desde la que empieza el recorrido: la del cursor con --resume, o la primera"""
+        if not self.resume:
+            self.db.borrar_cursores('lista')
+            return 1
+        cursor = self.db.leer_cursores('lista').get('')
+        if not cursor:
+            logging.info("No hay un recorrido interrumpido que retomar; se empieza desde la página 1")
+            return 1
+        self.ultima_url_cursor = cursor['ULTIMA_URL']
+        logging.info(f"Retomando el listado en la página {cursor['PAGINA']} "
+                     f"(última convocatoria guardada: {cursor['ULTIMA_URL']})")
+        return cursor['PAGINA']
+
+    def save_cursor(self, pagina):
+        """Registra la página recién guardada y su última convocatoria como punto de retorno"""
+        self.db.guardar_cursor('lista', pagina, self.urls_pagina[-1] if self.urls_pagina else None)
+
+    def verify_resume(self, pagina):
+        """
+        Tras retomar, verifica que la última convocatoria del cursor siga en la página; si el
+        listado se desplazó desde la interrupción, retorna la página anterior para releerla
+        """
+        ultima_url, self.ultima_url_cursor = self.ultima_url_cursor, None
+        if not ultima_url or pagina <= 1 or ultima_url in self.urls_pagina:
+            return None
+        logging.warning(f"La última convocatoria del cursor ya no está en la página {pagina}; "
+                        f"el listado cambió y se relee desde la página {pagina - 1}")
+        return pagina - 1
+
+    def debe_detenerse(self, sin_cambios_seguidas):
+        """En modo incremental, indica si ya se recorrieron K páginas seguidas sin novedades"""
+        if not self.incremental or sin_cambios_seguidas < self.paginas_sin_cambios:
+            return False
+        logging.info(f"{sin_cambios_seguidas} páginas seguidas sin convocatorias nuevas ni cambios; "
+                     f"se detiene el recorrido incremental (use --full para recorrer todo el listado)")
+        return True
+
+    def log_resultado(self):
+        """Escribe en el log el total de convocatorias nuevas y actualizadas"""
+        logging.info(f"\nProceso completado. Total de nuevas convocatorias agregadas: {self.total_nuevas}")
+        logging.info(f"Total de convocatorias actualizadas: {self.total_actualizadas}")
+
     def scrape_page(self, pagina):
         """Realiza el scraping de la página actual"""
         def _scrape():
@@ -318,32 +500,151 @@ class CorfoScraper:
                     return False
 
             logging.info("Esperando que se carguen las cajas de resultados...")
-            cajas = WebDriverWait(self.driver, 20).until(
+            WebDriverWait(self.driver, 20).until(
                 EC.presence_of_all_elements_located((By.CLASS_NAME, "caja-resultados_uno"))
             )
             
-            logging.info(f"Procesando {len(cajas)} convocatorias encontradas...")
-            self.current_page_convocatorias = []
-            for caja in cajas:
-                convocatoria = self.parse_convocatoria(caja)
-                if convocatoria:
-                    self.current_page_convocatorias.append(convocatoria)
+            # Una sola captura del listado; las cajas se extraen con lxml sin más llamadas al driver
+            listado = self.driver.find_element(By.ID, "listSearch").get_attribute('outerHTML')
+            with METRICAS.cronometrar('corfo_parseo_segundos', etapa='lista'):
+                self.current_page_convocatorias = self.parse_listado_html(listado)
+            logging.info(f"Procesando {len(self.current_page_convocatorias)} convocatorias encontradas...")
+            medicion = self.medidor.medir(self.driver, f"página {pagina}")
+            if medicion:
+                METRICAS.incrementar('corfo_bytes_total', medicion['kb'] * 1024, etapa='lista')
             
             # Actualizar CSV con los datos de esta página
-            nuevas = self.update_csv_with_page_data(pagina)
+            nuevas = self.update_db_with_page_data(pagina)
             self.total_nuevas += nuevas
             
             return True
 
+        inicio = time.perf_counter()
         try:
-            return self.retry_on_timeout(_scrape)
+            resultado = self.retry_on_failure(_scrape)
         except Exception as e:
-            logging.error(f"Error en scrape_page: {e}")
-            return False
+            self.register_failed_page(pagina, e)
+            resultado = False
+        METRICAS.observar('corfo_pagina_segundos', time.perf_counter() - inicio, etapa='lista')
+        if resultado:
+            METRICAS.incrementar('corfo_paginas_total', etapa='lista')
+            self.comandos.pagina()
+            self.register_page_ok(pagina)
+        return resultado
+
+    def fetch_listado_http(self, pagina):
+        """Obtiene el HTML de una página del listado replicando la búsqueda del sitio"""
+        archivo = f"listado_{pagina:04d}.html"
+        if self.replay_dir:
+            with open(os.path.join(self.replay_dir, archivo), encoding='utf-8') as f:
+                return f.read()
+
+        params = dict(self.listado_params)
+        if pagina > 1:
+            params[self.page_param] = pagina
+        self.limitador.esperar(self.base_url)
+        inicio = time.perf_counter()
+        response = self.session.get(self.base_url, params=params, timeout=30)
+        registrar_request('lista', response, time.perf_counter() - inicio)
+        espera = leer_retry_after(response.headers.get('Retry-After'))
+        if espera and response.status_code in (429, 503):
+            self.limitador.pausar(self.base_url, espera)  # el reintento espera lo indicado por el sitio
+        response.raise_for_status()
+
+        if self.record_dir:
+            os.makedirs(self.record_dir, exist_ok=True)
+            with open(os.path.join(self.record_dir, archivo), 'w', encoding='utf-8') as f:
+                f.write(response.text)
+        return response.text
+
+    def get_next_page_number(self, contenido, pagina):
+        """
+        Retorna el número de la página siguiente según el enlace 'Siguiente', o None. Lanza
+        ValueError si el enlace no avanza (el sitio ignoró el parámetro de página)
+        """
+        enlaces = LISTADO.siguiente(LISTADO.documento(contenido))
+        if not enlaces:
+            return None
+        match = re.search(r"getRedirectNext\(\s*['\"]?(\d+)", enlaces[0].get('href', '') + enlaces[0].get('onclick', ''))
+        siguiente = int(match.group(1)) if match else pagina + 1
+        if siguiente <= pagina:
+            raise ValueError(f"el enlace 'Siguiente' de la página {pagina} apunta a la página {siguiente}")
+        return siguiente
+
+    def scrape_page_http(self, pagina):
+        """Realiza el scraping de una página del listado sin navegador; retorna el HTML o None"""
+        inicio = time.perf_counter()
+        try:
+            contenido = self.retry_on_failure(self.fetch_listado_http, pagina)
+        except Exception as e:
+            self.register_failed_page(pagina, e)
+            return None
+
+        with METRICAS.cronometrar('corfo_parseo_segundos', etapa='lista'):
+            self.current_page_convocatorias = self.parse_listado_html(contenido)
+        logging.info(f"Procesando {len(self.current_page_convocatorias)} convocatorias encontradas...")
+        if not self.current_page_convocatorias:
+            return None
+
+        nuevas = self.update_db_with_page_data(pagina)
+        self.total_nuevas += nuevas
+        METRICAS.observar('corfo_pagina_segundos', time.perf_counter() - inicio, etapa='lista')
+        METRICAS.incrementar('corfo_paginas_total', etapa='lista')
+        self.register_page_ok(pagina)
+        return contenido
+
+    def run_http(self):
+        """Ejecuta el scraping del listado por HTTP; retorna False si hay que usar Selenium"""
+        self.session = crear_sesion(1)
+        self.limitador = LimitadorPorHost(self.requests_por_segundo, 1)
+        try:
+            self.load_existing_state()
+            pagina = self.resume_page()
+            sin_cambios_seguidas = 0
+            urls_anteriores = None
+            while pagina:
+                logging.info(f"\nProcesando página {pagina} (HTTP)...")
+                contenido = self.scrape_page_http(pagina)
+                if contenido is None:
+                    if pagina == 1:
+                        logging.warning("El modo HTTP no obtuvo convocatorias en la primera página")
+                        return False
+                    if self.paginas_fallidas_seguidas and self.skip_failed_page():
+                        pagina += 1  # la página fallida queda para --reintentar-fallidos
+                        continue
+                    break
+                # Si el sitio ignora el parámetro de página, todas las respuestas son la primera
+                # página y el recorrido no terminaría: se corta y se usa Selenium
+                if self.urls_pagina == urls_anteriores:
+                    logging.warning(f"La página {pagina} repite las convocatorias de la anterior; "
+                                    f"el modo HTTP no avanza en el listado")
+                    return False
+                urls_anteriores = self.urls_pagina
+                self.save_cursor(pagina)
+                anterior = self.verify_resume(pagina)
+                if anterior:
+                    pagina = anterior
+                    continue
+                sin_cambios_seguidas = sin_cambios_seguidas + 1 if self.pagina_sin_cambios else 0
+                if self.debe_detenerse(sin_cambios_seguidas):
+                    break
+                try:
+                    pagina = self.get_next_page_number(contenido, pagina)
+                except ValueError as e:
+                    logging.warning(f"El modo HTTP no avanza en el listado: {e}")
+                    return False
+
+            if not self.paginas_fallidas_seguidas:
+                self.db.borrar_cursores('lista')  # recorrido terminado: no queda nada que retomar
+            self.log_resultado()
+            return True
+        finally:
+            self.session.close()
+            self.close_db()
 
     def check_duplicates(self):
         """Verifica si hay duplicados potenciales"""
-        if not os.path.exists(self.csv_filename):
+        if self.db.ultimo_id() == 0:
             return False
             
         try:
@@ -357,9 +658,8 @@ class CorfoScraper:
                 By.CLASS_NAME, "titulo-cajas_fechas"
             ).text.strip()
             
-            # Verificar si existe en el CSV
-            df = pd.read_csv(self.csv_filename)
-            return primera_convocatoria in df['NOMBRE'].values
+            # Verificar si existe en la base de datos
+            return self.db.existe_nombre(primera_convocatoria)
             
         except Exception as e:
             logging.error(f"Error verificando duplicados: {e}")
@@ -369,52 +669,220 @@ class CorfoScraper:
         """Ejecuta el proceso completo de scraping"""
         try:
             self.setup_driver()
+            self.open_db()
             
-            # Verificar duplicados solo si existe el archivo
-            if self.check_duplicates():
-                respuesta = input("Se encontraron convocatorias que ya existen en la base de datos. ¿Desea continuar? (s/n): ")
-                if respuesta.lower() != 's':
-                    logging.info("Operación cancelada por el usuario")
-                    return
+            # Verificar duplicados solo al recorrer el listado completo con datos guardados; al
+            # retomar o sin terminal se continúa sin preguntar (el upsert por URL evita duplicados)
+            if not self.incremental and not self.resume and self.check_duplicates():
+                if not sys.stdin.isatty():
+                    logging.warning("Se encontraron convocatorias que ya existen en la base de datos; "
+                                    "se continúa sin confirmación")
+                else:
+                    respuesta = input("Se encontraron convocatorias que ya existen en la base de datos. ¿Desea continuar? (s/n): ")
+                    if respuesta.lower() != 's':
+                        logging.info("Operación cancelada por el usuario")
+                        return
             
             # Cargar datos existentes
-            self.df_existing = self.get_existing_data()
+            self.load_existing_state()
             
-            # Iniciar scraping
-            self.driver.get(self.base_url)
-            pagina = 1
+            # Iniciar scraping en la primera página o en la del cursor
+            pagina = self.resume_page()
+            self.pagina_actual = pagina
+            if pagina > 1:
+                try:
+                    self.retry_on_failure(self.open_page, pagina)
+                except Exception as e:
+                    logging.error(f"No se pudo volver a la página {pagina}: {e}")
+                    return
+            else:
+                self.driver.get(self.base_url)
+            sin_cambios_seguidas = 0
             
+            errores_seguidos = 0
+            recuperar = None  # tras un error, el navegador se recupera antes de leer la página
+            completo = False
             while True:
+                self.pagina_actual = pagina
                 logging.info(f"\nProcesando página {pagina}...")
                 try:
+                    if recuperar:
+                        self.recover(recuperar)
+                        recuperar = None
                     if not self.scrape_page(pagina):
+                        # La página quedó en la tabla de fallidos; se sigue con la siguiente si existe
+                        if not self.paginas_fallidas_seguidas or not self.skip_failed_page():
+                            break
+                        if not self.next_page_exists():
+                            logging.info("No hay más páginas para procesar")
+                            completo = True
+                            break
+                        pagina += 1
+                        self.pagina_actual = pagina
+                        self.retry_on_failure(self.open_page, pagina)
+                        continue
+                    self.gestor_drivers.pagina_procesada()
+                    self.save_cursor(pagina)
+                    anterior = self.verify_resume(pagina)
+                    if anterior:
+                        pagina = anterior
+                        self.pagina_actual = pagina
+                        self.retry_on_failure(self.open_page, pagina)
+                        continue
+                    
+                    sin_cambios_seguidas = sin_cambios_seguidas + 1 if self.pagina_sin_cambios else 0
+                    if self.debe_detenerse(sin_cambios_seguidas):
+                        completo = True
                         break
                     
+                    # Reciclaje preventivo: el driver nuevo abre directamente la página siguiente
+                    motivo = self.gestor_drivers.motivo_reciclaje()
+                    if motivo:
+                        if not self.next_page_exists():
+                            logging.info("No hay más páginas para procesar")
+                            completo = True
+                            break
+                        pagina += 1
+                        self.pagina_actual = pagina
+                        self.restart_driver(motivo)
+                        continue
+                    
                     if not self.check_next_page():
                         logging.info("No hay más páginas para procesar")
+                        completo = True
                         break
                         
                     pagina += 1
+                    errores_seguidos = 0
                 except Exception as e:
-                    logging.error(f"Error procesando página {pagina}: {e}")
-                    if "timeout" in str(e).lower():
-                        logging.info("Intentando reiniciar el driver y continuar...")
-                        self.restart_driver()
-                        self.driver.get(self.base_url)
+                    categoria = clasificar(e)
+                    logging.error(f"Error procesando página {pagina} ({categoria}): {e}")
+                    self.registrar_fallo(e)
+                    errores_seguidos += 1
+                    if errores_seguidos < self.politica.intentos:
+                        logging.info("Intentando recuperar el navegador y continuar...")
+                        recuperar = categoria
                         continue
                     break
             
-            logging.info(f"\nProceso completado. Total de nuevas convocatorias agregadas: {self.total_nuevas}")
+            if completo and not self.paginas_fallidas_seguidas:
+                self.db.borrar_cursores('lista')  # recorrido terminado: no queda nada que retomar
+            self.log_resultado()
+            self.registro_esperas.log_resumen()
+            self.medidor.log_resumen()
+            logging.info(f"Navegadores: {self.gestor_drivers.estadisticas()}")
             
         except Exception as e:
             logging.error(f"Error durante la ejecución: {e}")
         finally:
-            if self.driver:
-                self.driver.quit()
+            if self.gestor_drivers:
+                self.gestor_drivers.cerrar()
+            self.close_db()
+
+    def retry_failed_pages(self, use_http=True):
+        """Vuelve a procesar solo las páginas de la tabla de fallidos"""
+        try:
+            self.load_existing_state()
+            paginas = sorted(int(clave) for clave in self.db.leer_fallidos('lista')['CLAVE'])
+            logging.info(f"Reintentando {len(paginas)} páginas de la tabla de fallidos: {paginas}")
+            if not paginas:
+                return
+            if use_http:
+                self.session = crear_sesion(1)
+                self.limitador = LimitadorPorHost(self.requests_por_segundo, 1)
+            else:
+                self.setup_driver()
+            for pagina in paginas:
+                self.pagina_actual = pagina
+                logging.info(f"\nProcesando página {pagina} desde la tabla de fallidos...")
+                if use_http:
+                    self.scrape_page_http(pagina)
+                    continue
+                try:
+                    self.retry_on_failure(self.open_page, pagina)
+                except Exception as e:
+                    self.register_failed_page(pagina, e)
+                    continue
+                self.scrape_page(pagina)
+            self.log_resultado()
+        finally:
+            if self.session is not None:
+                self.session.close()
+            if self.gestor_drivers:
+                self.gestor_drivers.cerrar()
+            self.close_db()
+
+    def export_csv(self):
+        """Exporta las convocatorias de la base de datos a corfo_convocatorias.csv"""
+        self.open_db()
+        try:
+            self.db.exportar_csv('lista', self.csv_filename)
+        finally:
+            self.close_db()
+
+def parse_args(argv=None):
+    """Lee los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description='Scraper del listado de convocatorias CORFO')
+    parser.add_argument('--mode', choices=['selenium', 'http'], default='selenium',
+                        help='selenium: navegador headless; http: llamadas directas al listado')
+    parser.add_argument('--grabar', metavar='DIR',
+                        help='(modo http) guarda las respuestas del listado en DIR')
+    parser.add_argument('--fixtures', metavar='DIR',
+                        help='(modo http) reproduce respuestas grabadas en DIR, sin red')
+    parser.add_argument('--exportar-csv', action='store_true',
+                        help='Exporta corfo_convocatorias.csv desde la base de datos al finalizar')
+    parser.add_argument('--bloqueo', default=','.join(PERFIL_BLOQUEO), metavar='PERFILES',
+                        help='(modo selenium) recursos a bloquear: imagenes,media,fuentes,terceros,estilos '
+                             'o "ninguno"')
+    parser.add_argument('--max-paginas-driver', type=int, default=MAX_PAGINAS, metavar='N',
+                        help='(modo selenium) páginas por navegador antes de reciclarlo')
+    parser.add_argument('--max-rss-mb', type=int, default=MAX_RSS_MB, metavar='MB',
+                        help='(modo selenium) memoria de Chrome antes de reciclarlo (requiere psutil)')
+    parser.add_argument('--reservas', type=int, default=RESERVAS,
+                        help='(modo selenium) navegadores de reserva iniciados de antemano')
+    parser.add_argument('--full', action='store_true',
+                        help='Recorre el listado completo en lugar de detenerse al no encontrar novedades')
+    parser.add_argument('--paginas-sin-cambios', type=int, default=3, metavar='K',
+                        help='(modo incremental) páginas seguidas sin novedades antes de detenerse')
+    parser.add_argument('--resume', action='store_true',
+                        help='Retoma un recorrido interrumpido desde la última página guardada')
+    parser.add_argument('--intentos', type=int, default=INTENTOS,
+                        help='Intentos por página antes de enviarla a la tabla de fallidos')
+    parser.add_argument('--reintentar-fallidos', action='store_true',
+                        help='Procesa solo las páginas de la tabla de fallidos')
+    parser.add_argument('--base-url', metavar='URL',
+                        help='Sitio alternativo a https://corfo.cl (por ejemplo, corfo_mock_b01.py)')
+    parser.add_argument('--metricas', metavar='ARCHIVO',
+                        help='Guarda el reporte de métricas en ARCHIVO (JSON) y en formato Prometheus (.prom)')
+    return parser.parse_args(argv)
 
 def main():
+    args = parse_args()
     scraper = CorfoScraper()
-    scraper.run()
+    scraper.incremental = not args.full
+    scraper.paginas_sin_cambios = args.paginas_sin_cambios
+    scraper.bloqueo = leer_perfiles(args.bloqueo)
+    scraper.max_paginas_driver = args.max_paginas_driver
+    scraper.max_rss_mb = args.max_rss_mb
+    scraper.reservas_driver = args.reservas
+    scraper.base_url = url_listado(args.base_url)
+    scraper.politica.intentos = args.intentos
+    scraper.resume = args.resume
+    if args.reintentar_fallidos:
+        scraper.retry_failed_pages(use_http=args.mode == 'http')
+    elif args.mode == 'http':
+        scraper.record_dir = args.grabar
+        scraper.replay_dir = args.fixtures
+        if not scraper.run_http() and not args.fixtures:
+            logging.info("Usando Selenium como respaldo...")
+            scraper.run()
+    else:
+        scraper.run()
+    if args.exportar_csv:
+        scraper.export_csv()
+    if args.metricas:
+        METRICAS.guardar(args.metricas)
+        logging.info(f"Métricas guardadas en {args.metricas}")
 
 if __name__ == "__main__":
     main()
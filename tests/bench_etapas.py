@@ -0,0 +1,41 @@
+"""
+Benchmark de las etapas sobre el corpus grabado de tests/fixtures (pytest-benchmark).
+
+No forma parte de la suite por defecto; se ejecuta con:
+
+    python -m pytest tests/bench_etapas.py
+"""
+import json
+import os
+
+import pytest
+
+from corfo_benchmark_b01 import ETAPAS, REPETICIONES_MINIMAS, Corpus, comparar, ejecutar
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+BASELINE = os.path.join(FIXTURES, 'benchmark_baseline.json')
+
+
+def leer_baseline():
+    with open(BASELINE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    baseline = leer_baseline()
+    return Corpus.cargar(FIXTURES, convocatorias=baseline['convocatorias'], fichas=baseline['fichas'])
+
+
+@pytest.mark.parametrize('nombre', list(ETAPAS))
+def test_etapa(benchmark, corpus, nombre):
+    elementos = benchmark.pedantic(ETAPAS[nombre], args=(corpus,), rounds=REPETICIONES_MINIMAS,
+                                   warmup_rounds=1)
+    assert elementos > 0
+
+
+def test_sin_regresiones_respecto_de_la_baseline(corpus):
+    baseline = leer_baseline()
+    reporte = ejecutar(corpus, repeticiones=max(baseline['repeticiones'], REPETICIONES_MINIMAS))
+    assert reporte['convocatorias'] == baseline['convocatorias']
+    assert comparar(reporte, baseline) == []
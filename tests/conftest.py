@@ -0,0 +1,11 @@
+import os
+
+import pytest
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+@pytest.fixture
+def fixtures():
+    """Directorio de los corpus grabados."""
+    return FIXTURES
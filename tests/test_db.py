@@ -0,0 +1,47 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from corfo_db_b01 import BaseDatos, hash_fila
+
+
+def test_migracion_calcula_el_hash_de_filas_anteriores(tmp_path):
+    ruta = str(tmp_path / 'anterior.sqlite')
+    # Esquema de una versión anterior, sin la columna HASH
+    conn = sqlite3.connect(ruta)
+    conn.execute("CREATE TABLE convocatorias (URL TEXT PRIMARY KEY, ID INTEGER UNIQUE, NOMBRE TEXT, APERTURA TEXT, "
+                 "CIERRE TEXT, ALCANCE TEXT, ESTADO TEXT, RESUMEN TEXT, ACTUALIZADO TEXT)")
+    fila = {'NOMBRE': 'Convocatoria', 'APERTURA': '1 de marzo de 2024', 'CIERRE': '30 de abril de 2024',
+            'ALCANCE': 'Nacional', 'ESTADO': 'Abierta', 'RESUMEN': 'Resumen'}
+    conn.execute("INSERT INTO convocatorias VALUES ('https://corfo.cl/c', 1, ?, ?, ?, ?, ?, ?, NULL)",
+                 tuple(fila.values()))
+    conn.commit()
+    conn.close()
+
+    db = BaseDatos(ruta)
+    assert db.hashes_convocatorias() == {'https://corfo.cl/c': hash_fila(fila)}
+    db.cerrar()
+
+
+def filtros_guardados(db):
+    return set(db.conn.execute("SELECT URL, FILTRO FROM filtros").fetchall())
+
+
+def test_guardar_matriz_filtros_guarda_pares_y_cursores_juntos(tmp_path):
+    db = BaseDatos(str(tmp_path / 'corfo.sqlite'))
+    urls, columnas = ['https://corfo.cl/a', 'https://corfo.cl/b'], ['FILTRO_1', 'FILTRO_2']
+    matriz = np.array([[1, 0], [0, 1]], dtype=np.uint8)
+    db.guardar_matriz_filtros(urls, columnas, matriz, {'FILTRO_1': (2, 'https://corfo.cl/c', False)},
+                              [('https://corfo.cl/c', 'FILTRO_1')])
+    assert filtros_guardados(db) == {('https://corfo.cl/a', 'FILTRO_1'), ('https://corfo.cl/b', 'FILTRO_2'),
+                                     ('https://corfo.cl/c', 'FILTRO_1')}
+    assert db.leer_cursores('filtros')['FILTRO_1']['PAGINA'] == 2
+
+    # Si los pares fallan no queda nada de la transacción: ni la matriz ni el cursor avanzado
+    with pytest.raises(sqlite3.Error):
+        db.guardar_matriz_filtros(urls, columnas, np.ones((2, 2), dtype=np.uint8),
+                                  {'FILTRO_1': (3, 'https://corfo.cl/d', False)}, [('https://corfo.cl/d',)])
+    assert ('https://corfo.cl/a', 'FILTRO_2') not in filtros_guardados(db)
+    assert db.leer_cursores('filtros')['FILTRO_1']['PAGINA'] == 2
+    db.cerrar()
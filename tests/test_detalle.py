@@ -0,0 +1,55 @@
+import json
+import os
+
+import pytest
+
+from corfo_detalle_lxml_b01 import corpus_directorio, extraer_detalle, parsear_documento
+from corfo_detalle_scraper_b01 import extraer_info_bs4
+
+
+@pytest.fixture
+def fichas(fixtures):
+    return os.path.join(fixtures, 'fichas')
+
+
+def leer_esperado(fichas):
+    with open(os.path.join(fichas, 'esperado.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def leer_corpus(fichas):
+    # newline='' conserva los \r\n, igual que response.text
+    paginas = []
+    for archivo in sorted(os.listdir(fichas)):
+        if archivo.endswith('.html'):
+            with open(os.path.join(fichas, archivo), encoding='utf-8', newline='') as f:
+                paginas.append((archivo, f.read()))
+    return paginas
+
+
+def test_corpus_completo(fichas):
+    assert [archivo for archivo, _ in leer_corpus(fichas)] == sorted(leer_esperado(fichas))
+    assert len(corpus_directorio(fichas)) == len(leer_esperado(fichas))
+
+
+def test_extraer_detalle_igual_a_extractores_originales(fichas):
+    esperado = leer_esperado(fichas)
+    for archivo, texto in leer_corpus(fichas):
+        assert extraer_detalle(texto, respaldo=extraer_info_bs4) == esperado[archivo], archivo
+
+
+def test_extraer_info_bs4_igual_a_extractores_originales(fichas):
+    esperado = leer_esperado(fichas)
+    for archivo, texto in leer_corpus(fichas):
+        assert extraer_info_bs4(texto) == esperado[archivo], archivo
+
+
+def test_cdata_se_conserva_como_texto():
+    assert extraer_detalle('<div class="marcoque_fase2"><![CDATA[x]]>y</div>') == {'DETALLE': 'xy'}
+
+
+def test_solo_las_fichas_ambiguas_van_al_respaldo(fichas):
+    ambiguas = {'mal_cerrada.html', 'p_implicito.html', 'div_en_p.html', 'entidad_desconocida.html', 'textarea.html'}
+    for archivo, texto in leer_corpus(fichas):
+        if texto.strip() and archivo != 'ninguno_vacio.html':
+            assert parsear_documento(texto)[1] == (archivo in ambiguas), archivo
@@ -0,0 +1,71 @@
+import time
+
+from corfo_driver_b01 import GestorDrivers, configurar_opciones, leer_perfiles
+
+
+class Opciones:
+    """Sustituto de ChromeOptions que registra argumentos y preferencias."""
+
+    def __init__(self):
+        self.argumentos = []
+        self.preferencias = {}
+
+    def add_argument(self, argumento):
+        self.argumentos.append(argumento)
+
+    def add_experimental_option(self, nombre, valor):
+        self.preferencias[nombre] = valor
+
+
+def test_imagenes_desactivadas_solo_con_el_perfil_imagenes():
+    sin_bloqueo = configurar_opciones(Opciones(), perfiles=leer_perfiles('ninguno'))
+    assert '--blink-settings=imagesEnabled=false' not in sin_bloqueo.argumentos
+    assert 'profile.managed_default_content_settings.images' not in sin_bloqueo.preferencias['prefs']
+
+    con_fuentes = configurar_opciones(Opciones(), perfiles=leer_perfiles('fuentes,terceros'))
+    assert '--blink-settings=imagesEnabled=false' not in con_fuentes.argumentos
+
+    con_imagenes = configurar_opciones(Opciones(), perfiles=leer_perfiles('imagenes,fuentes'))
+    assert '--blink-settings=imagesEnabled=false' in con_imagenes.argumentos
+    assert con_imagenes.preferencias['prefs']['profile.managed_default_content_settings.images'] == 2
+    assert '--disable-extensions' in con_imagenes.argumentos
+
+
+class DriverLento:
+    """Navegador falso cuyo quit() tarda, como un Chrome que se cierra lentamente."""
+
+    def __init__(self, demora=0.3):
+        self.demora = demora
+        self.cerrado = False
+
+    def execute_script(self, script):
+        return 'complete'
+
+    def quit(self):
+        time.sleep(self.demora)
+        self.cerrado = True
+
+
+def test_cerrar_espera_a_los_navegadores_reciclados():
+    drivers = []
+
+    def fabrica(ranura):
+        drivers.append(DriverLento())
+        return drivers[-1]
+
+    gestor = GestorDrivers(fabrica, reservas=0, max_rss_mb=None)
+    gestor.obtener()
+    gestor.reciclar('paginas')
+    gestor.cerrar()
+    assert len(drivers) == 2
+    assert all(driver.cerrado for driver in drivers)
+
+
+def test_cerrar_respeta_la_espera_maxima():
+    gestor = GestorDrivers(lambda ranura: DriverLento(demora=2), reservas=0, max_rss_mb=None)
+    gestor.obtener()
+    gestor.reciclar('paginas')
+    gestor.activo = None  # solo queda el navegador reciclado
+    inicio = time.monotonic()
+    gestor.cerrar(espera=0.2)
+    assert time.monotonic() - inicio < 1
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+from corfo_fechas_b01 import normalizar_fechas, parsear_fecha
+
+TEXTOS = [
+    '15 de marzo de 2025', '15 de marzo de 2025, 15:00 hrs', '03/04/2025', '2025-04-03', '2025-04-03 09:30',
+    '31 de diciembre de 2024, 23:59 hrs', '31 de diciembre de 2024, 24:00 hrs', '1 de enero de 2025, 25:99 hrs',
+    '10/05/2025 12:60', '30 de febrero de 2025', 'No disponible', None,
+    '1 de enero de 1500', '15/03/2999', '31 de diciembre de 2262', '11/04/2262', '12/04/2262', '22/09/1677'
+]
+
+
+@pytest.mark.parametrize('texto', TEXTOS)
+def test_normalizar_fechas_igual_a_parsear_fecha(texto):
+    resultado = normalizar_fechas(pd.Series([texto], dtype=object), memo={})[0]
+    esperado = parsear_fecha(texto)
+    if esperado is not None and not pd.Timestamp.min <= esperado <= pd.Timestamp.max:
+        esperado = None  # datetime64[ns] no la representa: NaT
+    assert (pd.isna(resultado) and esperado is None) or resultado == pd.Timestamp(esperado)
+
+
+def test_horas_fuera_de_rango_son_nat():
+    resultado = normalizar_fechas(['31 de diciembre de 2024, 24:00 hrs', '1 de enero de 2025, 25:99 hrs',
+                                   '31 de diciembre de 2024, 23:59 hrs'], memo={})
+    assert resultado.isna().tolist() == [True, True, False]
+    assert resultado[2] == pd.Timestamp('2024-12-31 23:59')
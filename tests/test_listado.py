@@ -0,0 +1,104 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from corfo_scraper_lista_b01 import CorfoScraper
+
+
+def leer(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def listado(fixtures):
+    return os.path.join(fixtures, 'listado')
+
+
+@pytest.fixture
+def scraper(tmp_path):
+    scraper = CorfoScraper()
+    scraper.db_filename = str(tmp_path / 'corfo.sqlite')
+    scraper.csv_filename = str(tmp_path / 'corfo_convocatorias.csv')
+    scraper.incremental = False
+    return scraper
+
+
+def test_parse_listado_html_igual_a_parse_convocatoria(listado):
+    esperado = json.loads(leer(os.path.join(listado, 'esperado.json')))
+    scraper = CorfoScraper()
+    for archivo, filas in esperado.items():
+        assert scraper.parse_listado_html(leer(os.path.join(listado, archivo))) == filas, archivo
+
+
+def test_run_http_reproduce_el_corpus_grabado(listado, scraper):
+    scraper.replay_dir = listado
+    assert scraper.run_http()
+    assert scraper.total_nuevas == 36
+    scraper.open_db()
+    assert scraper.db.leer_cursores('lista') == {}  # recorrido completo: sin cursor pendiente
+    scraper.close_db()
+
+
+def test_run_http_se_detiene_si_el_sitio_ignora_la_pagina(listado, scraper, tmp_path):
+    # Un servidor que ignora el parámetro de página responde siempre la primera página
+    repetido = tmp_path / 'repetido'
+    repetido.mkdir()
+    for pagina in (1, 2, 3):
+        shutil.copy(os.path.join(listado, 'listado_0001.html'), repetido / f'listado_{pagina:04d}.html')
+    scraper.replay_dir = str(repetido)
+    assert scraper.run_http() is False
+    assert scraper.total_nuevas == 12
+
+
+def test_get_next_page_number_exige_avanzar(listado):
+    scraper = CorfoScraper()
+    contenido = leer(os.path.join(listado, 'listado_0001.html'))
+    assert scraper.get_next_page_number(contenido, 1) == 2
+    with pytest.raises(ValueError):
+        scraper.get_next_page_number(contenido, 2)
+    assert scraper.get_next_page_number(leer(os.path.join(listado, 'listado_0003.html')), 3) is None
+
+
+def test_fila_sin_hash_cuenta_como_cambiada(listado, scraper):
+    scraper.open_db()
+    filas = scraper.parse_listado_html(leer(os.path.join(listado, 'listado_0001.html')))
+    url = filas[0]['URL']
+    scraper.urls_existentes = {url}
+    scraper.hashes_existentes = {url: None}  # guardada por una versión sin HASH
+    scraper.current_page_convocatorias = filas
+    scraper.update_db_with_page_data(1)
+    assert scraper.total_actualizadas == 1
+    assert not scraper.pagina_sin_cambios
+    scraper.close_db()
+
+
+def test_no_se_lee_la_pagina_si_el_driver_nuevo_no_la_restaura(scraper, monkeypatch):
+    from selenium.common.exceptions import InvalidSessionIdException, TimeoutException
+    from corfo_reintentos_b01 import PoliticaReintentos
+
+    class Gestor:
+        def reciclar(self, motivo):
+            return object()
+
+    scraper.driver = object()
+    scraper.gestor_drivers = Gestor()
+    scraper.pagina_actual = 5
+    scraper.politica = PoliticaReintentos(intentos=3, base=0.0)
+    monkeypatch.setattr(scraper, 'use_driver', lambda driver: None)
+    monkeypatch.setattr(scraper, 'restore_position', lambda pagina: False)  # getRedirectNext no llegó
+
+    with pytest.raises(TimeoutException):
+        scraper.restart_driver('rss')
+
+    lecturas = []
+
+    def leer_pagina():
+        lecturas.append(scraper.pagina_actual)
+        raise InvalidSessionIdException('invalid session id')
+
+    with pytest.raises(TimeoutException):
+        scraper.retry_on_failure(leer_pagina)
+    assert lecturas == [5]  # tras el fallo del driver no se volvió a leer una página sin restaurar
@@ -0,0 +1,36 @@
+import json
+import os
+
+import pytest
+
+from corfo_mock_b01 import RUTA_LISTADO, create_app
+from corfo_scraper_lista_b01 import CorfoScraper
+
+
+@pytest.fixture
+def listado(fixtures):
+    return os.path.join(fixtures, 'listado')
+
+
+@pytest.fixture
+def cliente(listado):
+    return create_app({'MOCK_GRABACION': listado}).test_client()
+
+
+def test_grabacion_sirve_la_pagina_pedida(cliente, listado):
+    for pagina in (1, 2, 3):
+        with open(os.path.join(listado, f'listado_{pagina:04d}.html'), encoding='utf-8') as f:
+            grabada = f.read()
+        params = {'pullEstado': 'abierta,cerrada', 'page': pagina} if pagina > 1 else {}
+        respuesta = cliente.get(RUTA_LISTADO, query_string=params)
+        assert respuesta.status_code == 200
+        assert respuesta.get_data(as_text=True) == grabada
+
+
+def test_grabacion_fragmento_y_pagina_inexistente(cliente, listado):
+    with open(os.path.join(listado, 'esperado.json'), encoding='utf-8') as f:
+        esperado = json.load(f)
+    fragmento = cliente.get(RUTA_LISTADO, query_string={'fragmento': 1, 'page': 2}).get_data(as_text=True)
+    assert 'id="listSearch"' not in fragmento
+    assert CorfoScraper().parse_listado_html(fragmento) == esperado['listado_0002.html']
+    assert cliente.get(RUTA_LISTADO, query_string={'page': 4}).status_code == 404
@@ -0,0 +1,39 @@
+from datetime import date
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+ds = pytest.importorskip('pyarrow.dataset')
+pq = pytest.importorskip('pyarrow.parquet')
+
+from corfo_parquet_b01 import filtro_desde_texto, leer_parquet  # noqa: E402
+
+TIPOS = {'NOMBRE': pa.string(), 'ESTADO': pa.string(), 'CIERRE': pa.date32(), 'ID': pa.int64()}
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ("NOMBRE = 'Ciencia and Tecnología' and ESTADO = Abierta",
+     (ds.field('NOMBRE') == 'Ciencia and Tecnología') & (ds.field('ESTADO') == 'Abierta')),
+    ('NOMBRE = Innovación y Desarrollo', ds.field('NOMBRE') == 'Innovación y Desarrollo'),
+    ('NOMBRE = "O\'Higgins"', ds.field('NOMBRE') == "O'Higgins"),
+    ("ID>=3 AND ESTADO != ' Cerrada '", (ds.field('ID') >= 3) & (ds.field('ESTADO') != ' Cerrada ')),
+    ('CIERRE < 2025-03-01', ds.field('CIERRE') < date(2025, 3, 1)),
+])
+def test_filtro_desde_texto(texto, esperado):
+    assert filtro_desde_texto(texto, TIPOS).equals(esperado)
+
+
+@pytest.mark.parametrize('texto', ['', "ESTADO = 'Abierta' extra", 'ESTADO = Abierta and and ID = 3', 'OTRA = 1'])
+def test_filtro_desde_texto_no_valido(texto):
+    with pytest.raises(ValueError):
+        filtro_desde_texto(texto, TIPOS)
+
+
+def test_leer_parquet_con_valor_entre_comillas(tmp_path):
+    archivo = str(tmp_path / 'convocatorias.parquet')
+    pq.write_table(pa.table({'NOMBRE': ['Ciencia and Tecnología', 'Ciencia', 'Innovación y Desarrollo'],
+                             'ESTADO': ['Abierta', 'Abierta', 'Cerrada']}), archivo)
+    df = leer_parquet(archivo, ['NOMBRE'], "NOMBRE = 'Ciencia and Tecnología' and ESTADO = Abierta")
+    assert df['NOMBRE'].tolist() == ['Ciencia and Tecnología']
+    df = leer_parquet(archivo, ['NOMBRE'], 'NOMBRE = Innovación y Desarrollo')
+    assert df['NOMBRE'].tolist() == ['Innovación y Desarrollo']
@@ -0,0 +1,61 @@
+import sqlite3
+import threading
+
+import corfo_pipeline_b01
+from corfo_db_b01 import BaseDatos
+from corfo_pipeline_b01 import Pipeline
+
+
+class BaseBloqueada:
+    """Base de datos que falla en cada escritura, como una base bloqueada por otro proceso."""
+
+    def __getattr__(self, nombre):
+        def fallar(*args, **kwargs):
+            raise sqlite3.OperationalError('database is locked')
+        return fallar
+
+
+def test_workers_sobreviven_a_una_base_bloqueada():
+    pipeline = Pipeline(workers=2, capacidad_cola=2, usar_cache=False)
+    pipeline.db = BaseBloqueada()
+    pipeline.motor.procesar_con_reintentos = lambda url, procesar: (None, RuntimeError('HTTP 500'))
+    pipeline.hilos_detalle = [threading.Thread(target=pipeline.trabajar_detalle) for _ in range(pipeline.workers)]
+    for hilo in pipeline.hilos_detalle:
+        hilo.start()
+
+    pipeline.encolar([f'https://corfo.cl/sites/cpp/convocatorias/c{i}' for i in range(20)])
+    for _ in range(pipeline.workers):
+        assert pipeline.poner(None)
+    for hilo in pipeline.hilos_detalle:
+        hilo.join(timeout=10)
+        assert not hilo.is_alive()
+    pipeline.motor.cerrar()
+
+
+def test_poner_no_bloquea_sin_workers():
+    pipeline = Pipeline(workers=1, capacidad_cola=1, usar_cache=False)
+    assert pipeline.poner('https://corfo.cl/sites/cpp/convocatorias/c0')
+    assert not pipeline.poner(None)  # cola llena y ningún worker que la vacíe
+    pipeline.motor.cerrar()
+
+
+def test_encola_convocatorias_sin_detalle_de_una_ejecucion_anterior(tmp_path, monkeypatch):
+    ruta = str(tmp_path / 'corfo.sqlite')
+    db = BaseDatos(ruta)
+    urls = [f'https://corfo.cl/sites/cpp/convocatorias/c{i}' for i in range(3)]
+    db.upsert_convocatorias({'ID': i + 1, 'NOMBRE': f'C{i}', 'URL': url} for i, url in enumerate(urls))
+    db.upsert_detalles({urls[1]: {'DETALLE': 'Guardado'}})
+    assert db.urls_sin_detalle() == [urls[0], urls[2]]
+
+    class ListaSinNovedades:
+        def run_http(self):
+            return True
+
+    monkeypatch.setattr(corfo_pipeline_b01, 'ScraperLista', ListaSinNovedades)
+    pipeline = Pipeline(workers=1, capacidad_cola=10, usar_cache=False, ruta_db=ruta)
+    pipeline.db = db
+    pipeline.ejecutar_lista()
+    encoladas = [pipeline.cola.get_nowait() for _ in range(pipeline.cola.qsize())]
+    assert encoladas == [urls[0], urls[2], None]
+    pipeline.motor.cerrar()
+    db.cerrar()
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+import requests
+
+from corfo_reintentos_b01 import DRIVER, PARSEO, RED, SERVIDOR, clasificar
+
+
+def test_descargas_http_no_cargan_selenium():
+    codigo = ("import sys, requests, corfo_http_b01, corfo_reintentos_b01 as r; "
+              "assert r.clasificar(requests.ConnectionError()) == r.RED; "
+              "assert r.clasificar(ValueError()) == r.PARSEO; "
+              "print(sorted(m for m in sys.modules if m.split('.')[0] == 'selenium'))")
+    salida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert salida.stdout.strip() == '[]'
+
+
+def test_clasificar_excepciones_de_selenium():
+    from selenium.common.exceptions import (InvalidSessionIdException, NoSuchElementException,
+                                            TimeoutException, WebDriverException)
+
+    class FalloPropio(WebDriverException):
+        pass
+
+    assert clasificar(requests.HTTPError()) == SERVIDOR
+    assert clasificar(TimeoutException()) == RED
+    assert clasificar(InvalidSessionIdException()) == DRIVER
+    assert clasificar(NoSuchElementException()) == PARSEO
+    assert clasificar(WebDriverException('chrome not reachable')) == DRIVER
+    assert clasificar(WebDriverException('read timed out')) == RED
+    assert clasificar(FalloPropio('tab crashed')) == DRIVER
+
+
+def test_lista_cuenta_cada_fallo_una_vez():
+    from corfo_reintentos_b01 import Cortacircuito, PoliticaReintentos
+    from corfo_scraper_lista_b01 import CorfoScraper
+
+    scraper = CorfoScraper()
+    scraper.politica = PoliticaReintentos(intentos=1)
+    scraper.cortacircuito = Cortacircuito(umbral=2, etapa='lista')
+
+    def caida():
+        raise requests.ConnectionError('sitio caído')
+
+    try:
+        scraper.retry_on_failure(caida)
+    except requests.ConnectionError as e:
+        scraper.registrar_fallo(e)  # el except de run() recibe la misma excepción
+    assert scraper.cortacircuito.fallos_seguidos == 1
+    assert scraper.cortacircuito.estado == 'cerrado'
+
+    scraper.registrar_fallo(requests.ConnectionError('fallo fuera de los reintentos'))
+    assert scraper.cortacircuito.estado == 'abierto'